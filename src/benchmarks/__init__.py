@@ -0,0 +1,91 @@
+"""
+Benchmarks for the event-log pipeline.
+
+Every module is runnable on its own from ``src/``, e.g.
+``python -m benchmarks.relay_insert --rows 100000``.
+"""
+import os
+import sys
+import time
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from typing import Any, NamedTuple
+
+
+class BenchResult(NamedTuple):
+    name: str
+    rows: int
+    wall_seconds: float
+    cpu_seconds: float
+    extra: dict[str, Any] = {}
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.wall_seconds if self.wall_seconds else float('inf')
+
+    @property
+    def cpu_us_per_row(self) -> float:
+        return self.cpu_seconds / self.rows * 1_000_000 if self.rows else 0.0
+
+
+def setup_django() -> None:
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+    import django
+
+    django.setup()
+
+
+@contextmanager
+def test_database() -> Iterator[None]:
+    """
+    Point Django at a throwaway test database for the duration of the block.
+
+    Benchmarks that write empty their tables between runs, which must never
+    happen to the configured database: its outbox may hold events that have
+    not been relayed yet.
+    """
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(name, verbosity=0)
+        teardown_test_environment()
+
+
+def measure(name: str, rows: int, fn: Callable[[], Any], repeat: int = 5) -> BenchResult:
+    """
+    Run ``fn`` ``repeat`` times and keep the fastest run.
+
+    ``fn`` may return a dict of extra figures to show next to the timings.
+    """
+    best = None
+    for _ in range(repeat):
+        wall_started, cpu_started = time.perf_counter(), time.process_time()
+        extra = fn()
+        result = BenchResult(
+            name=name,
+            rows=rows,
+            wall_seconds=time.perf_counter() - wall_started,
+            cpu_seconds=time.process_time() - cpu_started,
+            extra=extra if isinstance(extra, dict) else {},
+        )
+        if best is None or result.wall_seconds < best.wall_seconds:
+            best = result
+
+    return best
+
+
+def report(results: Iterable[BenchResult]) -> None:
+    sys.stdout.write(f'{"benchmark":<36} {"rows":>10} {"rows/s":>14} {"cpu us/row":>12}  extra\n')
+    for result in results:
+        extra = ' '.join(f'{key}={value}' for key, value in result.extra.items())
+        sys.stdout.write(
+            f'{result.name:<36} {result.rows:>10} {result.rows_per_second:>14,.0f} '
+            f'{result.cpu_us_per_row:>12.2f}  {extra}\n',
+        )
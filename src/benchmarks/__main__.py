@@ -0,0 +1,22 @@
+"""
+Run the offline benchmark suite: ``python -m benchmarks`` from ``src/``.
+
+Writes to a throwaway test database and needs no ClickHouse server; run the
+modules one by one for their options and the live ClickHouse variants.
+"""
+from benchmarks import event_serialization, outbox, relay_insert, report, setup_django, test_database, users
+
+
+def main() -> None:
+    setup_django()
+    with test_database():
+        report([
+            *event_serialization.run(count=100_000),
+            *relay_insert.run(rows=100_000, compression='lz4', clickhouse=False),
+            *outbox.run(events=10_000, batch_size=1_000),
+            *users.run(users=10_000, chunk_size=1_000),
+        ])
+
+
+if __name__ == '__main__':
+    main()
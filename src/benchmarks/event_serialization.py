@@ -0,0 +1,66 @@
+"""
+Per-event cost of turning event models into event_log columns.
+
+    python -m benchmarks.event_serialization [--events N]
+
+``legacy`` is the conversion EventLogClient used to do for every event (two
+regex substitutions, a ``timezone.now()`` call and ``model_dump_json``);
+``batch`` is ``core.event_serializer.serialize_events``.
+"""
+import argparse
+import re
+
+from benchmarks import BenchResult, measure, report, setup_django
+
+
+def _legacy_convert(events: list) -> list[tuple]:
+    from django.conf import settings
+    from django.utils import timezone
+
+    def to_snake_case(event_name: str) -> str:
+        result = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', event_name)
+        return re.sub('([a-z0-9])([A-Z])', r'\1_\2', result).lower()
+
+    return [
+        (
+            to_snake_case(event.__class__.__name__),
+            timezone.now(),
+            settings.ENVIRONMENT,
+            event.model_dump_json(),
+        )
+        for event in events
+    ]
+
+
+def run(count: int) -> list[BenchResult]:
+    from core.event_serializer import serialize_events
+    from users.use_cases import UserCreated
+
+    events = [
+        UserCreated(email=f'user_{i}@email.com', first_name='Test', last_name='Testovich')
+        for i in range(count)
+    ]
+
+    def legacy() -> None:
+        _legacy_convert(events)
+
+    def batch() -> None:
+        serialize_events(events)
+
+    return [
+        measure('legacy per-event conversion', count, legacy),
+        measure('batch serialize_events', count, batch),
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=100_000)
+    args = parser.parse_args()
+
+    setup_django()
+    report(run(args.events))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Outbox writes and relay batches against a throwaway test database.
+
+    python -m benchmarks.outbox [--events N] [--batch-size N]
+
+Writes compare one ``LogService.log_event`` per transaction with the same
+events buffered by ``LogService.atomic``. Relay batches are delivered to the
+in-process ``MemorySink``, so no ClickHouse server is needed. Every run
+starts from an empty outbox table in a test database created for the run,
+see ``benchmarks.test_database``.
+"""
+import argparse
+import uuid
+
+from benchmarks import BenchResult, measure, report, setup_django, test_database
+
+
+def _event_data() -> dict:
+    from django.utils import timezone
+
+    return {
+        'id': uuid.uuid4(),
+        'type': 'benchmark_event',
+        'timestamp': timezone.now(),
+        'env': 'benchmark',
+        'context': {'email': 'benchmark@email.com', 'first_name': 'Bench', 'last_name': 'Mark'},
+        'version': 1,
+    }
+
+
+def _single_writes(events: int) -> None:
+    from logs.models import EventLogOutbox
+    from logs.services import LogService
+
+    EventLogOutbox.objects.all().delete()
+    for _ in range(events):
+        LogService.log_event(_event_data())
+
+
+def _buffered_writes(events: int) -> None:
+    from logs.models import EventLogOutbox
+    from logs.services import LogService
+
+    EventLogOutbox.objects.all().delete()
+    with LogService.atomic():
+        for _ in range(events):
+            LogService.log_event(_event_data())
+
+
+def _relay(batch_size: int) -> dict:
+    from logs.relay import OutboxRelay
+    from logs.sinks import MemorySink
+
+    sink = MemorySink()
+    relay = OutboxRelay(batch_size=batch_size, sink=sink)
+    while relay.relay_batch():
+        pass
+    return {'batches': sink.batches}
+
+
+def run(events: int, batch_size: int) -> list[BenchResult]:
+    return [
+        measure('outbox write, one per transaction', events, lambda: _single_writes(events), repeat=1),
+        measure('outbox write, LogService.atomic', events, lambda: _buffered_writes(events), repeat=1),
+        measure(f'relay batches of {batch_size}', events, lambda: _relay(batch_size), repeat=1),
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=10_000)
+    parser.add_argument('--batch-size', type=int, default=1_000)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        report(run(args.events, args.batch_size))
+
+
+if __name__ == '__main__':
+    main()
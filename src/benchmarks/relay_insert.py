@@ -0,0 +1,156 @@
+"""
+Row-tuple vs. columnar inserts for the outbox relay.
+
+    python -m benchmarks.relay_insert [--rows N] [--compression lz4|zstd|none] [--clickhouse]
+
+Offline, each path converts synthetic outbox rows and encodes them into the
+compressed Native payload clickhouse_connect would send, which is the part
+of an insert that costs relay CPU. With ``--clickhouse`` the payload is also
+sent to a scratch copy of the event_log table through the shared pool.
+"""
+import argparse
+import datetime as dt
+import json
+import uuid
+
+from benchmarks import BenchResult, measure, report, setup_django
+
+
+def _outbox_rows(count: int) -> list[dict]:
+    now = dt.datetime.now(tz=dt.UTC)
+    return [
+        {
+            'id': uuid.uuid4(),
+            'event_type': 'user_created',
+            'event_date_time': now,
+            'environment': 'Local',
+            'event_context': {
+                'email': f'{uuid.uuid4()}@email.com', 'first_name': 'Test', 'last_name': f'Testovich {i}',
+            },
+            'metadata_version': 1,
+        }
+        for i in range(count)
+    ]
+
+
+def _as_tuples(rows: list[dict]) -> list[tuple]:
+    return [
+        (
+            row['event_type'],
+            row['event_date_time'],
+            row['environment'],
+            json.dumps(row['event_context']),
+            row['metadata_version'],
+        )
+        for row in rows
+    ]
+
+
+def _as_columns(rows: list[dict]) -> list[list]:
+    return [
+        [row['event_type'] for row in rows],
+        [row['event_date_time'] for row in rows],
+        [row['environment'] for row in rows],
+        [json.dumps(row['event_context']) for row in rows],
+        [row['metadata_version'] for row in rows],
+    ]
+
+
+def _encode(data: list, columns: list[str], column_oriented: bool, compression: str | None) -> int:
+    from clickhouse_connect.datatypes.registry import get_from_name
+    from clickhouse_connect.driver.insert import InsertContext
+    from clickhouse_connect.driver.transform import NativeTransform
+
+    from core.event_log_client import EVENT_LOG_COLUMN_TYPES
+
+    context = InsertContext(
+        table='event_log',
+        column_names=columns,
+        column_types=[get_from_name(EVENT_LOG_COLUMN_TYPES[name]) for name in columns],
+        data=data,
+        column_oriented=column_oriented,
+        compression=compression,
+    )
+    return sum(len(chunk) for chunk in NativeTransform.build_insert(context))
+
+
+def _insert(data: list, columns: list[str], column_oriented: bool) -> None:
+    from django.conf import settings
+
+    from core.clickhouse_pool import get_pool
+    from core.event_log_client import EVENT_LOG_COLUMN_TYPES
+
+    with get_pool().connection() as client:
+        client.insert(
+            table=f'{settings.CLICKHOUSE_EVENT_LOG_TABLE_NAME}_benchmark',
+            data=data,
+            column_names=columns,
+            column_type_names=[EVENT_LOG_COLUMN_TYPES[name] for name in columns],
+            column_oriented=column_oriented,
+        )
+
+
+COLUMNS = ['event_type', 'event_date_time', 'environment', 'event_context', 'metadata_version']
+
+VARIANTS = (
+    ('tuples', _as_tuples, False),
+    ('columnar', _as_columns, True),
+)
+
+
+def run(rows: int, compression: str | None, clickhouse: bool) -> list[BenchResult]:
+    outbox_rows = _outbox_rows(rows)
+    results = []
+
+    for name, convert, column_oriented in VARIANTS:
+        results.append(measure(
+            f'{name} encode ({compression or "none"})',
+            rows,
+            lambda convert=convert, column_oriented=column_oriented: {
+                'bytes/row': round(_encode(convert(outbox_rows), COLUMNS, column_oriented, compression) / rows, 1),
+            },
+        ))
+
+    if clickhouse:
+        results.extend(
+            measure(
+                f'{name} insert',
+                rows,
+                lambda convert=convert, column_oriented=column_oriented: _insert(
+                    convert(outbox_rows), COLUMNS, column_oriented,
+                ),
+            )
+            for name, convert, column_oriented in VARIANTS
+        )
+
+    return results
+
+
+def _prepare_scratch_table() -> None:
+    from django.conf import settings
+
+    from core.clickhouse_pool import get_pool
+
+    table = settings.CLICKHOUSE_EVENT_LOG_TABLE_NAME
+    with get_pool().connection() as client:
+        client.command(f'CREATE TABLE IF NOT EXISTS {table}_benchmark AS {table}')
+        client.command(f'TRUNCATE TABLE {table}_benchmark')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--compression', default='lz4', choices=['lz4', 'zstd', 'none'])
+    parser.add_argument('--clickhouse', action='store_true', help='also insert into a live ClickHouse')
+    args = parser.parse_args()
+
+    setup_django()
+    if args.clickhouse:
+        _prepare_scratch_table()
+
+    compression = None if args.compression == 'none' else args.compression
+    report(run(args.rows, compression, args.clickhouse))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Start-up import time of manage.py and Celery worker processes.
+
+    python -m benchmarks.startup [--repeat N] [--check]
+
+Each target runs in a fresh interpreter under ``python -X importtime``, and
+the fastest of ``--repeat`` runs is reported. ``--check`` exits non-zero
+when a target goes over its budget in ``BUDGET_MS``, or when it imports one
+of ``LAZY_MODULES``: those are loaded on first use, never at start-up.
+"""
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import NamedTuple
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+
+# Both run Django's system checks, which load every URLconf and view, as the real processes do.
+TARGETS = {
+    'manage.py': (
+        'from django.core.management import execute_from_command_line; '
+        "execute_from_command_line(['manage.py', 'check'])"
+    ),
+    'celery worker': (
+        'import django; django.setup(); '
+        'from core.celery import app; app.loader.import_default_modules(); '
+        'from django.core.checks import run_checks; run_checks()'
+    ),
+}
+BUDGET_MS = {
+    'manage.py': 800,
+    'celery worker': 900,
+}
+LAZY_MODULES = ('clickhouse_connect', 'clickhouse_driver', 'sentry_sdk', 'pydantic', 'httpx')
+
+
+class ImportTime(NamedTuple):
+    module: str
+    cumulative_us: int
+    nested: bool
+
+
+class StartupResult(NamedTuple):
+    target: str
+    import_ms: float
+    lazy_imports: list[str]
+
+    @property
+    def within_budget(self) -> bool:
+        return self.import_ms <= BUDGET_MS[self.target] and not self.lazy_imports
+
+
+def import_times(code: str) -> list[ImportTime]:
+    """Every module ``code`` imports, in ``-X importtime`` order."""
+    env = {'DJANGO_SETTINGS_MODULE': 'core.settings', **os.environ}
+    completed = subprocess.run(  # noqa: S603
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=SRC_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    times = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        # Modules imported by another one are indented below it.
+        times.append(ImportTime(name.strip(), int(cumulative), nested=name.startswith('  ')))
+    return times
+
+
+def measure_startup(target: str, repeat: int = 3) -> StartupResult:
+    best, times = None, []
+    for _ in range(repeat):
+        times = import_times(TARGETS[target])
+        total = sum(time.cumulative_us for time in times if not time.nested)
+        best = total if best is None else min(best, total)
+
+    lazy = sorted({time.module for time in times if time.module in LAZY_MODULES})
+    return StartupResult(target=target, import_ms=best / 1000, lazy_imports=lazy)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--check', action='store_true', help='Exit non-zero when a target is over budget.')
+    args = parser.parse_args()
+
+    results = [measure_startup(target, args.repeat) for target in TARGETS]
+    sys.stdout.write(f'{"target":<16} {"import ms":>10} {"budget ms":>10}  lazy modules imported\n')
+    for result in results:
+        sys.stdout.write(
+            f'{result.target:<16} {result.import_ms:>10.0f} {BUDGET_MS[result.target]:>10}  '
+            f'{", ".join(result.lazy_imports) or "-"}\n',
+        )
+
+    if args.check and not all(result.within_budget for result in results):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+User imports against a throwaway test database.
+
+    python -m benchmarks.users [--users N] [--chunk-size N]
+
+Compares ``CreateUser`` once per user with the chunked ``CreateUsers``, both
+writing their ``UserCreated`` events to the outbox. Every run starts from
+empty user and outbox tables in a test database created for the run, see
+``benchmarks.test_database``; half of the bulk run's emails are repeated to
+measure duplicate handling too.
+"""
+import argparse
+
+from benchmarks import BenchResult, measure, report, setup_django, test_database
+
+
+def _reset() -> None:
+    from logs.models import EventLogOutbox
+    from users.models import User
+
+    User.objects.all().delete()
+    EventLogOutbox.objects.all().delete()
+
+
+def _requests(users: int, prefix: str) -> list:
+    from users.use_cases import CreateUserRequest
+
+    return [
+        CreateUserRequest(email=f'{prefix}_{i}@email.com', first_name='Bench', last_name='Mark')
+        for i in range(users)
+    ]
+
+
+def _single(users: int) -> None:
+    from users.use_cases import CreateUser
+
+    _reset()
+    use_case = CreateUser()
+    for request in _requests(users, 'single'):
+        use_case.execute(request)
+
+
+def _bulk(users: int, chunk_size: int, duplicates: bool) -> dict:
+    from users.use_cases import CreateUsers, CreateUsersRequest
+
+    _reset()
+    requests = _requests(users, 'bulk')
+    if duplicates:
+        CreateUsers().execute(CreateUsersRequest(users=requests[::2], chunk_size=chunk_size))
+    response = CreateUsers().execute(CreateUsersRequest(users=requests, chunk_size=chunk_size))
+    return {'created': sum(result.created for result in response.result)}
+
+
+def run(users: int, chunk_size: int) -> list[BenchResult]:
+    return [
+        measure('users, CreateUser per user', users, lambda: _single(users), repeat=1),
+        measure(f'users, CreateUsers chunks of {chunk_size}', users, lambda: _bulk(users, chunk_size, False), repeat=1),
+        # Counts the rows of both calls: the first inserts every other user, the second all of them.
+        measure(
+            'users, CreateUsers half duplicates', users + (users + 1) // 2,
+            lambda: _bulk(users, chunk_size, True), repeat=1,
+        ),
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=10_000)
+    parser.add_argument('--chunk-size', type=int, default=1_000)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        report(run(args.users, args.chunk_size))
+
+
+if __name__ == '__main__':
+    main()
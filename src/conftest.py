@@ -4,11 +4,19 @@ import clickhouse_connect
 import pytest
 from clickhouse_connect.driver import Client
 
-from src.logs.models import EventLogOutbox
+from core.clickhouse_migrations import ClickHouseMigrator
+from logs.models import EventLogOutbox
+
+
+@pytest.fixture(scope='session')
+def f_ch_schema() -> None:
+    client = clickhouse_connect.get_client(host='clickhouse')
+    ClickHouseMigrator(client).migrate()
+    client.close()
 
 
 @pytest.fixture(scope='module')
-def f_ch_client() -> Client:
+def f_ch_client(f_ch_schema: None) -> Client:  # noqa: ARG001
     client = clickhouse_connect.get_client(host='clickhouse')
     yield client
     client.close()
@@ -46,6 +54,6 @@ def test_outbox_processing(settings):
     process_outbox_batch.delay().get()
 
     # Verify ClickHouse
-    client = Client(host=settings.CLICKHOUSE_HOST, port=settings.CLICKHOUSE_PORT)
-    result = client.execute("SELECT count() FROM event_logs")
+    client = clickhouse_connect.get_client(host=settings.CLICKHOUSE_HOST, port=settings.CLICKHOUSE_PORT)
+    result = client.query(f"SELECT count() FROM {settings.CLICKHOUSE_EVENT_LOG_TABLE_NAME}").result_rows  # noqa: S608
     assert result[0][0] == 1
\ No newline at end of file
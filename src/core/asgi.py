@@ -11,6 +11,9 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from core.sentry import init_sentry
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 application = get_asgi_application()
+init_sentry()
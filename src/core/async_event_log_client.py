@@ -0,0 +1,145 @@
+import asyncio
+import os
+import weakref
+from collections.abc import AsyncGenerator, Sequence
+from contextlib import asynccontextmanager
+from typing import Any
+
+import httpx
+import structlog
+from clickhouse_connect.datatypes.registry import get_from_name
+from clickhouse_connect.driver.ctypes import RespBuffCls
+from clickhouse_connect.driver.insert import InsertContext
+from clickhouse_connect.driver.query import QueryContext
+from clickhouse_connect.driver.transform import NativeTransform
+from django.conf import settings
+
+from core.base_model import Model
+from core.event_log_client import EVENT_LOG_COLUMN_TYPES
+from core.event_serializer import serialize_events
+from core.metrics import clickhouse_request
+
+logger = structlog.get_logger(__name__)
+
+
+class AsyncEventLogClient:
+    """
+    Non-blocking counterpart of ``EventLogClient`` for async views and use cases.
+
+    Requests go straight to ClickHouse's HTTP interface through an
+    ``httpx.AsyncClient`` kept per event loop, so publishing never leaves the
+    loop for a worker thread. Inserts are encoded by clickhouse_connect into
+    the same compressed Native payload the sync client sends, and query
+    results are decoded by its Native parser into the same Python types.
+    """
+
+    def __init__(self, http: httpx.AsyncClient) -> None:
+        self._http = http
+
+    @classmethod
+    @asynccontextmanager
+    async def init(cls) -> AsyncGenerator['AsyncEventLogClient']:
+        try:
+            yield cls(get_http_client())
+        except Exception as e:
+            logger.error('error while executing clickhouse query', error=str(e))
+
+    async def insert(self, data: list[Model]) -> None:
+        try:
+            await self.insert_columns(serialize_events(data))
+        except httpx.HTTPError as e:
+            logger.error('unable to insert data to clickhouse', error=str(e))
+
+    async def insert_columns(self, columns: dict[str, Sequence[Any]]) -> None:
+        context = InsertContext(
+            table=f'{settings.CLICKHOUSE_SCHEMA}.{settings.CLICKHOUSE_EVENT_LOG_TABLE_NAME}',
+            column_names=list(columns),
+            column_types=[get_from_name(EVENT_LOG_COLUMN_TYPES[name]) for name in columns],
+            data=list(columns.values()),
+            column_oriented=True,
+            compression=settings.CLICKHOUSE_COMPRESSION,
+        )
+        headers = {'Content-Type': 'application/octet-stream'}
+        if settings.CLICKHOUSE_COMPRESSION:
+            headers['Content-Encoding'] = settings.CLICKHOUSE_COMPRESSION
+
+        with clickhouse_request('insert'):
+            response = await self._http.post(
+                '/',
+                params={'database': settings.CLICKHOUSE_SCHEMA},
+                content=b''.join(NativeTransform.build_insert(context)),
+                headers=headers,
+            )
+            response.raise_for_status()
+
+    async def query(self, query: str, parameters: dict[str, Any] | None = None) -> list[tuple] | None:
+        """
+        Run a query and return its rows typed like ``EventLogClient.query``
+        returns them, e.g. ``datetime`` for DateTime64 and ``UUID`` for UUID.
+
+        Parameters are bound server-side, ``{name:Type}`` placeholders in the
+        query are filled from ``parameters``.
+        """
+        logger.debug('executing clickhouse query', query=query)
+
+        params = {f'param_{name}': value for name, value in (parameters or {}).items()}
+        params.update(database=settings.CLICKHOUSE_SCHEMA, default_format='Native')
+        try:
+            with clickhouse_request('query'):
+                response = await self._http.post('/', params=params, content=query)
+                response.raise_for_status()
+        except httpx.HTTPError as e:
+            logger.error('failed to execute clickhouse query', error=str(e))
+            return
+
+        return _parse_native(response)
+
+
+class _BodySource:
+    """A response body read in full, in the shape clickhouse_connect's response buffers read from."""
+
+    def __init__(self, body: bytes) -> None:
+        self.gen = iter((body,))
+
+    def close(self) -> None:
+        pass
+
+
+def _parse_native(response: httpx.Response) -> list[tuple]:
+    # The sync client applies the server's timezone the same way, so both return naive UTC datetimes by default.
+    context = QueryContext(query_tz=response.headers.get('X-ClickHouse-Timezone'), apply_server_tz=True)
+    return NativeTransform.parse_response(RespBuffCls(_BodySource(response.content)), context).result_rows
+
+
+_http_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = weakref.WeakKeyDictionary()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """The pooled HTTP client of the running event loop, created on first use."""
+    loop = asyncio.get_running_loop()
+    client = _http_clients.get(loop)
+    if client is None or client.is_closed:
+        client = _http_clients[loop] = httpx.AsyncClient(
+            base_url=f'{settings.CLICKHOUSE_PROTOCOL}://{settings.CLICKHOUSE_HOST}:{settings.CLICKHOUSE_PORT}',
+            auth=(settings.CLICKHOUSE_USER, settings.CLICKHOUSE_PASSWORD) if settings.CLICKHOUSE_USER else None,
+            limits=httpx.Limits(
+                max_connections=settings.CLICKHOUSE_POOL_SIZE,
+                keepalive_expiry=settings.CLICKHOUSE_POOL_IDLE_TIMEOUT,
+            ),
+            timeout=httpx.Timeout(
+                settings.CLICKHOUSE_SEND_RECEIVE_TIMEOUT,
+                connect=settings.CLICKHOUSE_CONNECT_TIMEOUT,
+                pool=settings.CLICKHOUSE_POOL_CHECKOUT_TIMEOUT,
+            ),
+        )
+
+    return client
+
+
+def _forget_http_clients_after_fork() -> None:
+    global _http_clients
+
+    _http_clients = weakref.WeakKeyDictionary()
+
+
+os.register_at_fork(after_in_child=_forget_http_clients_after_fork)
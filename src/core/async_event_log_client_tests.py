@@ -0,0 +1,83 @@
+import asyncio
+import datetime as dt
+import uuid
+from collections.abc import Generator
+from typing import Any
+
+import httpx
+import pytest
+from clickhouse_connect.datatypes.registry import get_from_name
+from clickhouse_connect.driver import Client
+from clickhouse_connect.driver.insert import InsertContext
+from clickhouse_connect.driver.transform import NativeTransform
+from django.conf import settings
+
+from core.async_event_log_client import AsyncEventLogClient
+from core.event_log_client import EVENT_LOG_COLUMN_TYPES
+from users.use_cases import UserCreated
+
+
+@pytest.fixture()
+def f_clean_up_event_log(f_ch_client: Client) -> Generator:
+    f_ch_client.query(f'TRUNCATE TABLE {settings.CLICKHOUSE_EVENT_LOG_TABLE_NAME}')
+    yield
+
+
+def _native_body(columns: dict[str, list[Any]]) -> bytes:
+    """A Native format response, encoded like an insert minus the INSERT statement in front of it."""
+    context = InsertContext(
+        table='event_log',
+        column_names=list(columns),
+        column_types=[get_from_name(EVENT_LOG_COLUMN_TYPES[name]) for name in columns],
+        data=list(columns.values()),
+        column_oriented=True,
+    )
+    _, _, block = b''.join(NativeTransform.build_insert(context)).partition(b'FORMAT Native\n')
+    return block
+
+
+def test_query_returns_typed_rows() -> None:
+    event_id = uuid.uuid4()
+    published_at = dt.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=dt.UTC)
+    requests = []
+
+    def respond(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        body = _native_body({'id': [event_id], 'event_date_time': [published_at], 'metadata_version': [1]})
+        return httpx.Response(200, content=body, headers={'X-ClickHouse-Timezone': 'UTC'})
+
+    async def read() -> list[tuple] | None:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(respond), base_url='http://clickhouse') as http:
+            return await AsyncEventLogClient(http).query('SELECT id, event_date_time, metadata_version FROM event_log')
+
+    # Naive UTC, as the sync client returns DateTime64 values.
+    assert asyncio.run(read()) == [(event_id, published_at.replace(tzinfo=None), 1)]
+    assert requests[0].url.params['default_format'] == 'Native'
+
+
+def test_query_of_no_rows_is_empty() -> None:
+    async def read() -> list[tuple] | None:
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, content=b''))  # noqa: ARG005
+        async with httpx.AsyncClient(transport=transport, base_url='http://clickhouse') as http:
+            return await AsyncEventLogClient(http).query('SELECT id FROM event_log')
+
+    assert asyncio.run(read()) == []
+
+
+@pytest.mark.usefixtures('f_clean_up_event_log')
+def test_insert_and_query() -> None:
+    email = f'test_{uuid.uuid4()}@email.com'
+    event = UserCreated(email=email, first_name='Test', last_name='Testovich')
+
+    async def publish_and_read() -> list[tuple] | None:
+        async with AsyncEventLogClient.init() as client:
+            await client.insert([event])
+            return await client.query(
+                f'SELECT event_type, event_context, event_date_time FROM {settings.CLICKHOUSE_EVENT_LOG_TABLE_NAME} '  # noqa: S608
+                'WHERE event_type = {event_type:String}',
+                {'event_type': 'user_created'},
+            )
+
+    [(event_type, event_context, published_at)] = asyncio.run(publish_and_read())
+    assert (event_type, event_context) == ('user_created', event.model_dump_json())
+    assert isinstance(published_at, dt.datetime)
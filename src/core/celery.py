@@ -0,0 +1,36 @@
+import os
+
+from celery import Celery
+from celery.signals import worker_init, worker_process_shutdown
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+app = Celery('core')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks(related_name='task')
+
+
+@worker_init.connect
+def init_worker_sentry(**kwargs) -> None:  # noqa: ANN003, ARG001
+    from core.sentry import init_sentry
+
+    init_sentry()
+
+
+@worker_init.connect
+def start_metrics_exporter(**kwargs) -> None:  # noqa: ANN003, ARG001
+    from django.conf import settings
+    from prometheus_client import start_http_server
+
+    from core.metrics import exposition_registry
+
+    if settings.METRICS_PORT:
+        start_http_server(settings.METRICS_PORT, registry=exposition_registry())
+
+
+@worker_process_shutdown.connect
+def forget_worker_metrics(pid: int, **kwargs) -> None:  # noqa: ANN003, ARG001
+    from prometheus_client import multiprocess
+
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,85 @@
+-- The event log as the last docker/clickhouse/init.sql created it, before
+-- these migrations replaced that file. Databases set up from it record this
+-- version without any change. Tables from an older init.sql are kept as they
+-- are, with the former (event_date_time, event_type) sort key and without a
+-- dedup window, until 0002 rebuilds event_log; the missing rollups are added.
+CREATE TABLE IF NOT EXISTS event_log
+(
+    `id` UUID,
+    `event_type` String,
+    `event_date_time` DateTime64(6),
+    `environment` String,
+    `event_context` String,
+    `metadata_version` Int32 DEFAULT 1,
+)
+ENGINE = ReplacingMergeTree()
+PARTITION BY toYYYYMM(event_date_time)
+ORDER BY (event_type, event_date_time, id)
+SETTINGS index_granularity = 8192, non_replicated_deduplication_window = 1000;
+
+-- Event counts per time bucket, event type and environment. Each rollup is
+-- filled by a materialized view on every insert into event_log, so counting
+-- reads a few rows per bucket instead of scanning the raw events. Buckets
+-- are UTC.
+CREATE TABLE IF NOT EXISTS event_log_counts_minute
+(
+    `bucket` DateTime('UTC'),
+    `event_type` LowCardinality(String),
+    `environment` LowCardinality(String),
+    `events` SimpleAggregateFunction(sum, UInt64)
+)
+ENGINE = AggregatingMergeTree()
+PARTITION BY toYYYYMM(bucket)
+ORDER BY (event_type, environment, bucket)
+SETTINGS non_replicated_deduplication_window = 1000;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS event_log_counts_minute_mv TO event_log_counts_minute AS
+SELECT
+    toStartOfMinute(event_date_time, 'UTC') AS bucket,
+    event_type,
+    environment,
+    count() AS events
+FROM event_log
+GROUP BY bucket, event_type, environment;
+
+CREATE TABLE IF NOT EXISTS event_log_counts_hour
+(
+    `bucket` DateTime('UTC'),
+    `event_type` LowCardinality(String),
+    `environment` LowCardinality(String),
+    `events` SimpleAggregateFunction(sum, UInt64)
+)
+ENGINE = AggregatingMergeTree()
+PARTITION BY toYYYYMM(bucket)
+ORDER BY (event_type, environment, bucket)
+SETTINGS non_replicated_deduplication_window = 1000;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS event_log_counts_hour_mv TO event_log_counts_hour AS
+SELECT
+    toStartOfHour(event_date_time, 'UTC') AS bucket,
+    event_type,
+    environment,
+    count() AS events
+FROM event_log
+GROUP BY bucket, event_type, environment;
+
+CREATE TABLE IF NOT EXISTS event_log_counts_day
+(
+    `bucket` DateTime('UTC'),
+    `event_type` LowCardinality(String),
+    `environment` LowCardinality(String),
+    `events` SimpleAggregateFunction(sum, UInt64)
+)
+ENGINE = AggregatingMergeTree()
+PARTITION BY toYear(bucket)
+ORDER BY (event_type, environment, bucket)
+SETTINGS non_replicated_deduplication_window = 1000;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS event_log_counts_day_mv TO event_log_counts_day AS
+SELECT
+    toStartOfDay(event_date_time, 'UTC') AS bucket,
+    event_type,
+    environment,
+    count() AS events
+FROM event_log
+GROUP BY bucket, event_type, environment;
@@ -0,0 +1,84 @@
+"""
+Versioned schema migrations for the ClickHouse event log.
+
+Each migration is a ``NNNN_name.sql`` file in this directory holding
+statements separated by a ``;`` at the end of a line. ``${name}``
+placeholders are filled from ``migration_context()``. Applied versions are
+recorded in the ``clickhouse_migrations`` table, so every migration runs
+once per database, in version order. ClickHouse has no transactional DDL:
+a migration that fails part way is not recorded and is run again from its
+first statement, so each migration must be safe to re-run from the start.
+"""
+import re
+import string
+from pathlib import Path
+from typing import NamedTuple
+
+import structlog
+from clickhouse_connect.driver import Client
+from django.conf import settings
+
+logger = structlog.get_logger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).parent
+MIGRATIONS_TABLE = 'clickhouse_migrations'
+STATEMENT_SEPARATOR = re.compile(r';\s*$', re.MULTILINE)
+
+
+class Migration(NamedTuple):
+    version: str
+    name: str
+    path: Path
+
+    @classmethod
+    def from_path(cls, path: Path) -> 'Migration':
+        version, _, name = path.stem.partition('_')
+        return cls(version, name, path)
+
+    def statements(self, context: dict[str, object]) -> list[str]:
+        sql = string.Template(self.path.read_text()).substitute(context)
+        return [statement.strip() for statement in STATEMENT_SEPARATOR.split(sql) if _has_code(statement)]
+
+
+class ClickHouseMigrator:
+    def __init__(self, client: Client, migrations_dir: Path = MIGRATIONS_DIR) -> None:
+        self._client = client
+        self._migrations_dir = migrations_dir
+
+    def migrations(self) -> list[Migration]:
+        return sorted(map(Migration.from_path, self._migrations_dir.glob('[0-9]*_*.sql')))
+
+    def applied(self) -> set[str]:
+        self._client.command(
+            f'CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} '
+            '(version String, name String, applied_at DateTime DEFAULT now()) '
+            'ENGINE = MergeTree ORDER BY version',
+        )
+        return {row[0] for row in self._client.query(f'SELECT version FROM {MIGRATIONS_TABLE}').result_rows}  # noqa: S608
+
+    def pending(self) -> list[Migration]:
+        applied = self.applied()
+        return [migration for migration in self.migrations() if migration.version not in applied]
+
+    def migrate(self, target: str | None = None) -> list[Migration]:
+        """Apply pending migrations up to and including ``target``, or all of them."""
+        migrations = [migration for migration in self.pending() if target is None or migration.version <= target]
+        for migration in migrations:
+            self._apply(migration)
+        return migrations
+
+    def _apply(self, migration: Migration) -> None:
+        logger.info('applying clickhouse migration', version=migration.version, migration=migration.name)
+        for statement in migration.statements(migration_context()):
+            self._client.command(statement)
+        self._client.insert(MIGRATIONS_TABLE, [[migration.version, migration.name]], column_names=['version', 'name'])
+
+
+def migration_context() -> dict[str, object]:
+    return {
+        'retention_days': settings.CLICKHOUSE_EVENT_LOG_RETENTION_DAYS,
+    }
+
+
+def _has_code(statement: str) -> bool:
+    return any(line.strip() and not line.strip().startswith('--') for line in statement.splitlines())
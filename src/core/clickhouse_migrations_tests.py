@@ -0,0 +1,65 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from core.clickhouse_migrations import MIGRATIONS_DIR, MIGRATIONS_TABLE, ClickHouseMigrator, Migration
+
+
+class FakeClient:
+    def __init__(self) -> None:
+        self.commands: list[str] = []
+        self.versions: list[str] = []
+
+    def command(self, statement: str) -> None:
+        self.commands.append(statement)
+
+    def query(self, query: str) -> SimpleNamespace:  # noqa: ARG002
+        return SimpleNamespace(result_rows=[(version,) for version in self.versions])
+
+    def insert(self, table: str, data: list[list[str]], column_names: list[str]) -> None:  # noqa: ARG002
+        self.versions.extend(row[0] for row in data)
+
+
+@pytest.fixture()
+def f_migrations_dir(tmp_path: Path) -> Path:
+    (tmp_path / '0002_second.sql').write_text('ALTER TABLE t MODIFY TTL d + INTERVAL ${retention_days} DAY;\n')
+    (tmp_path / '0001_first.sql').write_text(
+        '-- creates t; and more\nCREATE TABLE t (d Date)\nENGINE = MergeTree ORDER BY d;\n\n'
+        "INSERT INTO t VALUES ('2024-01-01');\n",
+    )
+    return tmp_path
+
+
+def test_migrations_apply_in_order_once(f_migrations_dir: Path, settings) -> None:  # noqa: ANN001
+    settings.CLICKHOUSE_EVENT_LOG_RETENTION_DAYS = 30
+    client = FakeClient()
+    migrator = ClickHouseMigrator(client, f_migrations_dir)
+
+    applied = migrator.migrate()
+    applied_again = migrator.migrate()
+
+    assert [migration.version for migration in applied] == ['0001', '0002']
+    assert applied_again == []
+    assert [command for command in client.commands if MIGRATIONS_TABLE not in command] == [
+        '-- creates t; and more\nCREATE TABLE t (d Date)\nENGINE = MergeTree ORDER BY d',
+        "INSERT INTO t VALUES ('2024-01-01')",
+        'ALTER TABLE t MODIFY TTL d + INTERVAL 30 DAY',
+    ]
+
+
+def test_migrate_stops_at_target(f_migrations_dir: Path) -> None:
+    client = FakeClient()
+
+    applied = ClickHouseMigrator(client, f_migrations_dir).migrate('0001')
+
+    assert [migration.version for migration in applied] == ['0001']
+    assert client.versions == ['0001']
+
+
+@pytest.mark.parametrize('path', sorted(MIGRATIONS_DIR.glob('*.sql')), ids=lambda path: path.stem)
+def test_shipped_migrations_render(path: Path) -> None:
+    statements = Migration.from_path(path).statements({'retention_days': 365})
+
+    assert statements
+    assert all('${' not in statement for statement in statements)
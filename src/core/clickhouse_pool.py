@@ -0,0 +1,169 @@
+import os
+import threading
+import time
+from collections.abc import Callable, Generator
+from contextlib import contextmanager
+
+import clickhouse_connect
+import structlog
+from clickhouse_connect.driver import Client
+from clickhouse_connect.driver.exceptions import OperationalError
+from clickhouse_connect.driver.httputil import get_pool_manager
+from django.conf import settings
+
+logger = structlog.get_logger(__name__)
+
+
+class PoolTimeoutError(Exception):
+    pass
+
+
+class ClickHousePool:
+    """
+    A bounded pool of ClickHouse clients shared by everything in a process.
+
+    Clients are handed out one at a time (a clickhouse_connect client carries
+    its own session and must not be used concurrently), reused LIFO so the
+    warmest connection goes out first, pinged before reuse once they have
+    been idle for a while, and closed once idle for longer than the idle
+    timeout. Every client owns its HTTP connection pool, so after a fork the
+    child simply forgets the inherited clients instead of sharing sockets
+    with its parent.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Client],
+        size: int,
+        idle_timeout: float,
+        health_check_interval: float,
+        checkout_timeout: float,
+    ) -> None:
+        self._factory = factory
+        self._size = size
+        self._idle_timeout = idle_timeout
+        self._health_check_interval = health_check_interval
+        self._checkout_timeout = checkout_timeout
+        self._reset()
+
+    @contextmanager
+    def connection(self) -> Generator[Client]:
+        client = self._acquire()
+        try:
+            yield client
+        except OperationalError:
+            self._discard(client)
+            raise
+        except BaseException:
+            self._release(client)
+            raise
+        else:
+            self._release(client)
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+
+        for client, _ in idle:
+            client.close()
+
+    def _reset(self) -> None:
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self._size)
+        self._idle: list[tuple[Client, float]] = []
+
+    def _acquire(self) -> Client:
+        if self._pid != os.getpid():
+            self._reset()
+
+        if not self._slots.acquire(timeout=self._checkout_timeout):
+            raise PoolTimeoutError(f'no ClickHouse client available within {self._checkout_timeout}s')
+
+        try:
+            return self._checkout()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _checkout(self) -> Client:
+        while (entry := self._pop_idle()) is not None:
+            client, released_at = entry
+            if time.monotonic() - released_at < self._health_check_interval or client.ping():
+                return client
+
+            logger.warning('discarding unhealthy clickhouse client')
+            client.close()
+
+        return self._factory()
+
+    def _pop_idle(self) -> tuple[Client, float] | None:
+        now = time.monotonic()
+        with self._lock:
+            expired = [client for client, released_at in self._idle if now - released_at > self._idle_timeout]
+            self._idle = [entry for entry in self._idle if now - entry[1] <= self._idle_timeout]
+            entry = self._idle.pop() if self._idle else None
+
+        for client in expired:
+            client.close()
+
+        return entry
+
+    def _release(self, client: Client) -> None:
+        if self._pid != os.getpid():
+            return
+
+        with self._lock:
+            self._idle.append((client, time.monotonic()))
+        self._slots.release()
+
+    def _discard(self, client: Client) -> None:
+        client.close()
+        if self._pid == os.getpid():
+            self._slots.release()
+
+
+def create_client(send_receive_timeout: int | None = None) -> Client:
+    return clickhouse_connect.get_client(
+        host=settings.CLICKHOUSE_HOST,
+        port=settings.CLICKHOUSE_PORT,
+        user=settings.CLICKHOUSE_USER,
+        password=settings.CLICKHOUSE_PASSWORD,
+        database=settings.CLICKHOUSE_SCHEMA,
+        query_retries=2,
+        compress=settings.CLICKHOUSE_COMPRESSION,
+        connect_timeout=settings.CLICKHOUSE_CONNECT_TIMEOUT,
+        send_receive_timeout=send_receive_timeout or settings.CLICKHOUSE_SEND_RECEIVE_TIMEOUT,
+        pool_mgr=get_pool_manager(maxsize=1),
+    )
+
+
+_pool: ClickHousePool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ClickHousePool:
+    global _pool
+
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ClickHousePool(
+                    factory=create_client,
+                    size=settings.CLICKHOUSE_POOL_SIZE,
+                    idle_timeout=settings.CLICKHOUSE_POOL_IDLE_TIMEOUT,
+                    health_check_interval=settings.CLICKHOUSE_POOL_HEALTH_CHECK_INTERVAL,
+                    checkout_timeout=settings.CLICKHOUSE_POOL_CHECKOUT_TIMEOUT,
+                )
+
+    return _pool
+
+
+def _forget_pool_after_fork() -> None:
+    global _pool, _pool_lock
+
+    _pool = None
+    _pool_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_forget_pool_after_fork)
@@ -0,0 +1,89 @@
+import pytest
+from clickhouse_connect.driver.exceptions import OperationalError
+
+from core.clickhouse_pool import ClickHousePool, PoolTimeoutError
+
+
+class FakeClient:
+    def __init__(self, healthy: bool = True) -> None:
+        self.healthy = healthy
+        self.closed = False
+
+    def ping(self) -> bool:
+        return self.healthy
+
+    def close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture()
+def f_created() -> list[FakeClient]:
+    return []
+
+
+@pytest.fixture()
+def f_pool(f_created: list[FakeClient]) -> ClickHousePool:
+    def factory() -> FakeClient:
+        f_created.append(FakeClient())
+        return f_created[-1]
+
+    return ClickHousePool(
+        factory=factory, size=2, idle_timeout=60, health_check_interval=0, checkout_timeout=0.01,
+    )
+
+
+def test_client_is_reused(f_pool: ClickHousePool, f_created: list[FakeClient]) -> None:
+    with f_pool.connection() as first:
+        pass
+    with f_pool.connection() as second:
+        pass
+
+    assert first is second
+    assert len(f_created) == 1
+
+
+def test_checkout_is_bounded_by_pool_size(f_pool: ClickHousePool) -> None:
+    with f_pool.connection(), f_pool.connection(), pytest.raises(PoolTimeoutError), f_pool.connection():
+        pass
+
+
+def test_unhealthy_client_is_replaced(f_pool: ClickHousePool) -> None:
+    with f_pool.connection() as first:
+        first.healthy = False
+    with f_pool.connection() as second:
+        pass
+
+    assert second is not first
+    assert first.closed
+
+
+def test_client_is_discarded_after_connection_error(f_pool: ClickHousePool, f_created: list[FakeClient]) -> None:
+    with pytest.raises(OperationalError), f_pool.connection():
+        raise OperationalError
+    with f_pool.connection():
+        pass
+
+    assert f_created[0].closed
+    assert len(f_created) == 2
+
+
+def test_idle_clients_are_evicted(f_pool: ClickHousePool, f_created: list[FakeClient]) -> None:
+    f_pool._idle_timeout = 0
+    with f_pool.connection():
+        pass
+    with f_pool.connection():
+        pass
+
+    assert f_created[0].closed
+    assert len(f_created) == 2
+
+
+def test_inherited_clients_are_dropped_after_fork(f_pool: ClickHousePool, f_created: list[FakeClient]) -> None:
+    with f_pool.connection():
+        pass
+    f_pool._pid = -1
+    with f_pool.connection():
+        pass
+
+    assert not f_created[0].closed
+    assert len(f_created) == 2
@@ -1,84 +1,176 @@
-import re
-from collections.abc import Generator
+from collections.abc import Callable, Generator, Iterator, Sequence
 from contextlib import contextmanager
-from typing import Any
+from functools import partial
+from typing import Any, TypeVar
 
-import clickhouse_connect
 import structlog
+from clickhouse_connect.driver import Client
 from clickhouse_connect.driver.exceptions import DatabaseError
 from django.conf import settings
-from django.utils import timezone
 
 from core.base_model import Model
+from core.clickhouse_pool import get_pool
+from core.event_log_query import EventCount, EventCountQuery, EventLogQuery, EventLogRow
+from core.event_serializer import serialize_events
+from core.metrics import clickhouse_request
+from core.query_cache import get_query_cache
 
 logger = structlog.get_logger(__name__)
 
-EVENT_LOG_COLUMNS = [
-    'event_type',
-    'event_date_time',
-    'environment',
-    'event_context',
-]
+T = TypeVar('T')
+
+# Passing the column types up front spares every insert a DESCRIBE TABLE round trip.
+# They follow the layout of core/clickhouse_migrations/0002_event_log_layout.sql.
+EVENT_LOG_COLUMN_TYPES = {
+    'id': 'UUID',
+    'event_type': 'LowCardinality(String)',
+    'event_date_time': 'DateTime64(6)',
+    'environment': 'LowCardinality(String)',
+    'event_context': 'String',
+    'metadata_version': 'Int32',
+}
+
+
+def insert_settings(dedup_token: str | None) -> dict[str, Any] | None:
+    if not dedup_token:
+        return None
+    # The rollup materialized views must drop a replayed block just like event_log does.
+    return {'insert_deduplication_token': dedup_token, 'deduplicate_blocks_in_dependent_materialized_views': 1}
 
 
 class EventLogClient:
-    def __init__(self, client: clickhouse_connect.driver.Client) -> None:
+    def __init__(self, client: Client) -> None:
         self._client = client
 
     @classmethod
     @contextmanager
     def init(cls) -> Generator['EventLogClient']:
-        client = clickhouse_connect.get_client(
-            host=settings.CLICKHOUSE_HOST,
-            port=settings.CLICKHOUSE_PORT,
-            user=settings.CLICKHOUSE_USER,
-            password=settings.CLICKHOUSE_PASSWORD,
-            query_retries=2,
-            connect_timeout=30,
-            send_receive_timeout=10,
-        )
+        # Only errors raised inside the block are logged; failing to connect is the caller's to handle.
+        connected = False
         try:
-            yield cls(client)
+            with get_pool().connection() as client:
+                connected = True
+                yield cls(client)
         except Exception as e:
+            if not connected:
+                raise
             logger.error('error while executing clickhouse query', error=str(e))
-        finally:
-            client.close()
 
     def insert(
         self,
         data: list[Model],
     ) -> None:
         try:
+            self.insert_columns(serialize_events(data))
+        except DatabaseError as e:
+            logger.error('unable to insert data to clickhouse', error=str(e))
+
+    def insert_columns(self, columns: dict[str, Sequence[Any]], dedup_token: str | None = None) -> None:
+        """
+        Insert column-oriented data, one sequence per column name.
+
+        The block is sent in ClickHouse's Native format, compressed with
+        ``CLICKHOUSE_COMPRESSION``. A repeated insert with the same
+        ``dedup_token`` is acknowledged but not stored again. Errors are
+        raised to the caller.
+        """
+        with clickhouse_request('insert'):
             self._client.insert(
-                data=self._convert_data(data),
-                column_names=EVENT_LOG_COLUMNS,
+                data=list(columns.values()),
+                column_names=list(columns),
+                column_type_names=[EVENT_LOG_COLUMN_TYPES[name] for name in columns],
+                column_oriented=True,
                 database=settings.CLICKHOUSE_SCHEMA,
                 table=settings.CLICKHOUSE_EVENT_LOG_TABLE_NAME,
+                settings=insert_settings(dedup_token),
             )
-        except DatabaseError as e:
-            logger.error('unable to insert data to clickhouse', error=str(e))
 
-    def query(self, query: str) -> Any:  # noqa: ANN401
+    def stream(self, query: EventLogQuery) -> Iterator[EventLogRow]:
+        """
+        Rows matching ``query``, read block by block as ClickHouse sends them.
+
+        Memory use is bounded by one block whatever the size of the result.
+        Errors are raised to the caller.
+        """
+        sql, parameters = query.to_sql()
+        with self._client.query_row_block_stream(sql, parameters=parameters) as blocks:
+            for block in blocks:
+                yield from map(EventLogRow.from_result, block)
+
+    def fetch(self, query: EventLogQuery) -> list[EventLogRow]:
+        """
+        All rows matching ``query``, served from the query cache when it is on.
+
+        Ranges that ended in the past are cached for longer. Errors are
+        raised to the caller.
+        """
+        return self._cached_rows(query, EventLogRow.from_result)
+
+    def count_events(self, query: EventCountQuery) -> list[EventCount]:
+        """Event counts read from the coarsest rollup that can answer ``query``, cached like ``fetch``."""
+        return self._cached_rows(query, EventCount.from_result)
+
+    def query(
+        self,
+        query: str,
+        parameters: dict[str, Any] | None = None,
+        cache_ttl: float | None = None,
+    ) -> Any:  # noqa: ANN401
+        """
+        Run a query, binding ``{name:Type}`` placeholders from ``parameters``.
+
+        With the query cache on, results are cached for ``cache_ttl`` seconds
+        or ``EVENT_LOG_QUERY_CACHE_TTL``.
+        """
         logger.debug('executing clickhouse query', query=query)
+        cache = get_query_cache()
+        run = partial(self._query, query, parameters)
 
         try:
-            return self._client.query(query).result_rows
+            return run() if cache is None else cache.get_or_run(query, parameters, run, ttl=cache_ttl)
         except DatabaseError as e:
             logger.error('failed to execute clickhouse query', error=str(e))
             return
 
-    def _convert_data(self, data: list[Model]) -> list[tuple[Any]]:
-        return [
-            (
-                self._to_snake_case(event.__class__.__name__),
-                timezone.now(),
-                settings.ENVIRONMENT,
-                event.model_dump_json(),
-            )
-            for event in data
-        ]
+    def _query(self, query: str, parameters: dict[str, Any] | None) -> list[tuple]:
+        with clickhouse_request('query'):
+            return self._client.query(query, parameters=parameters).result_rows
+
+    def _cached_rows(self, query: EventLogQuery | EventCountQuery, convert: Callable[[tuple], T]) -> list[T]:
+        sql, parameters = query.to_sql()
+        run = partial(self._rows, sql, parameters, convert)
+        cache = get_query_cache()
+        if cache is None:
+            return run()
+        return cache.get_or_run(sql, parameters, run, ttl=cache.ttl_for(query.until))
+
+    def _rows(self, sql: str, parameters: dict[str, Any], convert: Callable[[tuple], T]) -> list[T]:
+        with clickhouse_request('query'):
+            return [convert(row) for row in self._client.query(sql, parameters=parameters).result_rows]
+
+
+def stream_events(query: EventLogQuery, page_size: int | None = None) -> Iterator[EventLogRow]:
+    """
+    Every row matching ``query``, fetched as keyset pages of ``page_size`` rows.
+
+    Each page is its own ClickHouse query on a pooled client, so a long
+    export never holds one query or one connection open for its whole run.
+    """
+    page_size = page_size or settings.EVENT_LOG_QUERY_PAGE_SIZE
+    remaining = query.limit
+    while remaining is None or remaining > 0:
+        limit = page_size if remaining is None else min(page_size, remaining)
+        rows = 0
+        for row in _stream_page(query.model_copy(update={'limit': limit})):
+            rows += 1
+            yield row
+        if rows < limit:
+            return
+
+        query = query.model_copy(update={'after': row.cursor})
+        remaining = None if remaining is None else remaining - rows
 
-    def _to_snake_case(self, event_name: str) -> str:
-        result = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', event_name)
-        return re.sub('([a-z0-9])([A-Z])', r'\1_\2', result).lower()
 
+def _stream_page(query: EventLogQuery) -> Iterator[EventLogRow]:
+    with get_pool().connection() as client:
+        yield from EventLogClient(client).stream(query)
@@ -0,0 +1,37 @@
+import pytest
+from clickhouse_connect.driver.exceptions import DatabaseError, OperationalError
+
+from core.clickhouse_pool import ClickHousePool
+from core.event_log_client import EventLogClient
+
+
+class FakeClient:
+    def ping(self) -> bool:
+        return True
+
+    def query(self, query: str, parameters: dict | None = None) -> None:  # noqa: ARG002
+        raise DatabaseError('Code: 60. Unknown table')
+
+    def close(self) -> None:
+        pass
+
+
+def _pool(factory: type) -> ClickHousePool:
+    return ClickHousePool(factory=factory, size=1, idle_timeout=60, health_check_interval=0, checkout_timeout=0.01)
+
+
+def test_connection_error_reaches_the_caller(monkeypatch: pytest.MonkeyPatch) -> None:
+    def refuse() -> FakeClient:
+        raise OperationalError('connection refused')
+
+    monkeypatch.setattr('core.event_log_client.get_pool', lambda: _pool(refuse))
+
+    with pytest.raises(OperationalError, match='connection refused'), EventLogClient.init():
+        pass
+
+
+def test_errors_inside_the_block_are_logged(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr('core.event_log_client.get_pool', lambda: _pool(FakeClient))
+
+    with EventLogClient.init() as event_log:
+        event_log._client.query('SELECT 1')
@@ -0,0 +1,213 @@
+"""
+Typed, parameterized reads from the ClickHouse event log.
+
+Every filter value is bound server-side as a ``{name:Type}`` parameter, so
+no caller input is ever spliced into SQL. Results are ordered by
+``(event_date_time, id)`` and paged with a keyset cursor on that pair:
+each page starts strictly after the last row of the previous one, which
+stays cheap however deep into the log a reader goes.
+"""
+import base64
+import datetime as dt
+import uuid
+from typing import Any, Literal, NamedTuple
+
+from django.conf import settings
+from pydantic import Field
+
+from core.base_model import Model
+
+EPOCH = dt.datetime(1970, 1, 1, tzinfo=dt.UTC)
+# Rollups from coarsest to finest, see core/clickhouse_migrations.
+ROLLUP_SECONDS = {'day': 86400, 'hour': 3600, 'minute': 60}
+BUCKET_FUNCTIONS = {'day': 'toStartOfDay', 'hour': 'toStartOfHour', 'minute': 'toStartOfMinute'}
+# Must stay identical to the expression of the event_context_pairs bloom filter
+# index (core/clickhouse_migrations/0002_event_log_layout.sql) for ClickHouse to use it.
+CONTEXT_PAIRS = (
+    "arrayMap((key, value) -> concat(key, '=', value), JSONExtractKeysAndValues(event_context, 'String'))"
+)
+EVENT_LOG_QUERY_COLUMNS = (
+    'id',
+    'event_type',
+    'toUnixTimestamp64Micro(event_date_time)',
+    'environment',
+    'event_context',
+    'metadata_version',
+)
+
+
+class EventLogCursor(NamedTuple):
+    event_time_us: int
+    id: uuid.UUID
+
+    def encode(self) -> str:
+        return base64.urlsafe_b64encode(f'{self.event_time_us}:{self.id}'.encode()).decode()
+
+    @classmethod
+    def decode(cls, token: str) -> 'EventLogCursor':
+        event_time_us, event_id = base64.urlsafe_b64decode(token.encode()).decode().split(':')
+        return cls(int(event_time_us), uuid.UUID(event_id))
+
+
+class EventLogRow(NamedTuple):
+    id: uuid.UUID
+    event_type: str
+    event_date_time: dt.datetime
+    environment: str
+    event_context: str
+    metadata_version: int
+
+    @classmethod
+    def from_result(cls, row: tuple) -> 'EventLogRow':
+        event_id, event_type, event_time_us, environment, event_context, metadata_version = row
+        event_date_time = EPOCH + dt.timedelta(microseconds=event_time_us)
+        return cls(event_id, event_type, event_date_time, environment, event_context, metadata_version)
+
+    @property
+    def cursor(self) -> EventLogCursor:
+        return EventLogCursor(_to_micros(self.event_date_time), self.id)
+
+
+class EventLogQuery(Model):
+    event_types: list[str] = Field(default_factory=list)
+    environment: str | None = None
+    since: dt.datetime | None = None
+    until: dt.datetime | None = None
+    # Top-level event_context keys and the string values they must equal.
+    context: dict[str, str] = Field(default_factory=dict)
+    after: EventLogCursor | None = None
+    limit: int | None = Field(default=None, gt=0)
+
+    def to_sql(self) -> tuple[str, dict[str, Any]]:
+        conditions, parameters = self._conditions()
+        sql = (
+            f'SELECT {", ".join(EVENT_LOG_QUERY_COLUMNS)} '  # noqa: S608
+            f'FROM {settings.CLICKHOUSE_SCHEMA}.{settings.CLICKHOUSE_EVENT_LOG_TABLE_NAME}'
+        )
+        if conditions:
+            sql += f' WHERE {" AND ".join(conditions)}'
+        sql += ' ORDER BY event_date_time, id'
+        if self.limit:
+            sql += ' LIMIT {limit:UInt64}'
+            parameters['limit'] = self.limit
+
+        return sql, parameters
+
+    def _conditions(self) -> tuple[list[str], dict[str, Any]]:
+        parameters = {}
+        conditions = _dimension_conditions(self.event_types, self.environment, parameters)
+        conditions.extend(self._time_conditions(parameters))
+        for index, (key, value) in enumerate(self.context.items()):
+            # The bloom filter narrows the granules, the exact match guards against '=' inside keys.
+            conditions.append(
+                f'has({CONTEXT_PAIRS}, {{pair_{index}:String}}) '
+                f'AND JSONExtractString(event_context, {{key_{index}:String}}) = {{value_{index}:String}}',
+            )
+            parameters.update({f'pair_{index}': f'{key}={value}', f'key_{index}': key, f'value_{index}': value})
+
+        return conditions, parameters
+
+    def _time_conditions(self, parameters: dict[str, Any]) -> list[str]:
+        # Times travel as epoch microseconds so neither side's time zone can shift them.
+        conditions = []
+        if self.since is not None:
+            conditions.append('event_date_time >= fromUnixTimestamp64Micro({since:Int64})')
+            parameters['since'] = _to_micros(self.since)
+        if self.until is not None:
+            conditions.append('event_date_time < fromUnixTimestamp64Micro({until:Int64})')
+            parameters['until'] = _to_micros(self.until)
+        if self.after is not None:
+            conditions.append('(event_date_time, id) > (fromUnixTimestamp64Micro({after_time:Int64}), {after_id:UUID})')
+            parameters.update(after_time=self.after.event_time_us, after_id=self.after.id)
+
+        return conditions
+
+
+class EventCount(NamedTuple):
+    # None when the counts are not split into time buckets.
+    bucket: dt.datetime | None
+    event_type: str
+    environment: str
+    events: int
+
+    @classmethod
+    def from_result(cls, row: tuple) -> 'EventCount':
+        bucket_start, event_type, environment, events = row
+        bucket = EPOCH + dt.timedelta(seconds=bucket_start) if bucket_start is not None else None
+        return cls(bucket, event_type, environment, events)
+
+
+class EventCountQuery(Model):
+    """
+    Event counts by event type and environment, optionally per UTC time bucket.
+
+    Counts are read from the coarsest rollup table whose buckets fit both
+    the requested granularity and the range bounds. Only bounds that do not
+    fall on a minute fall back to counting the raw event log.
+    """
+
+    event_types: list[str] = Field(default_factory=list)
+    environment: str | None = None
+    since: dt.datetime | None = None
+    until: dt.datetime | None = None
+    granularity: Literal['minute', 'hour', 'day'] | None = None
+
+    @property
+    def rollup(self) -> str | None:
+        return next((rollup for rollup in ROLLUP_SECONDS if self._fits(rollup)), None)
+
+    def to_sql(self) -> tuple[str, dict[str, Any]]:
+        rollup = self.rollup
+        table = settings.CLICKHOUSE_EVENT_LOG_TABLE_NAME
+        source, time_column, events = (
+            (f'{table}_counts_{rollup}', 'bucket', 'sum(events)') if rollup else (table, 'event_date_time', 'count()')
+        )
+        bucket = 'NULL'
+        if self.granularity:
+            bucket = f"toUnixTimestamp({BUCKET_FUNCTIONS[self.granularity]}({time_column}, 'UTC'))"
+        conditions, parameters = self._conditions(time_column)
+
+        sql = (
+            f'SELECT {bucket} AS bucket_start, event_type, environment, {events} '  # noqa: S608
+            f'FROM {settings.CLICKHOUSE_SCHEMA}.{source}'
+        )
+        if conditions:
+            sql += f' WHERE {" AND ".join(conditions)}'
+        sql += ' GROUP BY bucket_start, event_type, environment ORDER BY bucket_start, event_type, environment'
+        return sql, parameters
+
+    def _fits(self, rollup: str) -> bool:
+        bucket_seconds = ROLLUP_SECONDS[rollup]
+        if self.granularity and ROLLUP_SECONDS[self.granularity] < bucket_seconds:
+            return False
+        return all(
+            bound is None or _to_micros(bound) % (bucket_seconds * 1_000_000) == 0 for bound in (self.since, self.until)
+        )
+
+    def _conditions(self, time_column: str) -> tuple[list[str], dict[str, Any]]:
+        parameters = {}
+        conditions = _dimension_conditions(self.event_types, self.environment, parameters)
+        for name, operator, bound in (('since', '>=', self.since), ('until', '<', self.until)):
+            if bound is not None:
+                conditions.append(f'{time_column} {operator} fromUnixTimestamp64Micro({{{name}:Int64}})')
+                parameters[name] = _to_micros(bound)
+
+        return conditions, parameters
+
+
+def _dimension_conditions(event_types: list[str], environment: str | None, parameters: dict[str, Any]) -> list[str]:
+    conditions = []
+    if event_types:
+        conditions.append('event_type IN {event_types:Array(String)}')
+        parameters['event_types'] = event_types
+    if environment is not None:
+        conditions.append('environment = {environment:String}')
+        parameters['environment'] = environment
+
+    return conditions
+
+
+def _to_micros(value: dt.datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=dt.UTC)
+    return (value - EPOCH) // dt.timedelta(microseconds=1)
@@ -0,0 +1,72 @@
+import datetime as dt
+import uuid
+
+import pytest
+
+from core.event_log_query import EventCount, EventCountQuery, EventLogCursor, EventLogQuery, EventLogRow
+
+
+def test_filters_are_bound_as_parameters() -> None:
+    query = EventLogQuery(
+        event_types=['user_created'],
+        environment="Local'; DROP TABLE event_log; --",
+        context={'email': 'test@email.com'},
+        limit=10,
+    )
+
+    sql, parameters = query.to_sql()
+
+    assert "DROP TABLE" not in sql
+    assert 'event_type IN {event_types:Array(String)}' in sql
+    assert 'has(arrayMap(' in sql
+    assert 'JSONExtractString(event_context, {key_0:String}) = {value_0:String}' in sql
+    assert sql.endswith('ORDER BY event_date_time, id LIMIT {limit:UInt64}')
+    assert parameters == {
+        'event_types': ['user_created'],
+        'environment': "Local'; DROP TABLE event_log; --",
+        'pair_0': 'email=test@email.com',
+        'key_0': 'email',
+        'value_0': 'test@email.com',
+        'limit': 10,
+    }
+
+
+def test_time_range_and_cursor_are_sent_as_utc_microseconds() -> None:
+    since = dt.datetime(2024, 1, 1, 3, tzinfo=dt.timezone(dt.timedelta(hours=3)))
+    cursor = EventLogCursor(event_time_us=1_704_067_200_000_001, id=uuid.uuid4())
+
+    _, parameters = EventLogQuery(since=since, after=cursor).to_sql()
+
+    assert parameters['since'] == 1_704_067_200_000_000
+    assert parameters['after_time'] == cursor.event_time_us
+    assert parameters['after_id'] == cursor.id
+
+
+def test_row_cursor_round_trips() -> None:
+    event_id = uuid.uuid4()
+    row = EventLogRow.from_result((event_id, 'user_created', 1_704_067_200_000_001, 'Local', '{}', 1))
+
+    assert row.event_date_time == dt.datetime(2024, 1, 1, 0, 0, 0, 1, tzinfo=dt.UTC)
+    assert EventLogCursor.decode(row.cursor.encode()) == (1_704_067_200_000_001, event_id)
+
+
+@pytest.mark.parametrize(('since', 'granularity', 'table'), [
+    (dt.datetime(2024, 1, 1, tzinfo=dt.UTC), 'day', 'event_log_counts_day'),
+    (dt.datetime(2024, 1, 1, tzinfo=dt.UTC), 'hour', 'event_log_counts_hour'),
+    (dt.datetime(2024, 1, 1, 5, tzinfo=dt.UTC), 'day', 'event_log_counts_hour'),
+    (dt.datetime(2024, 1, 1, 5, 30, tzinfo=dt.UTC), None, 'event_log_counts_minute'),
+    (dt.datetime(2024, 1, 1, 5, 30, 15, tzinfo=dt.UTC), 'day', 'event_log'),
+])
+def test_count_reads_the_coarsest_fitting_rollup(since: dt.datetime, granularity: str | None, table: str) -> None:
+    query = EventCountQuery(since=since, until=dt.datetime(2024, 2, 1, tzinfo=dt.UTC), granularity=granularity)
+
+    sql, _ = query.to_sql()
+
+    assert f'FROM default.{table} ' in sql
+
+
+def test_count_rows_carry_utc_buckets() -> None:
+    assert EventCount.from_result((1_704_067_200, 'user_created', 'Local', 3)) == (
+        dt.datetime(2024, 1, 1, tzinfo=dt.UTC), 'user_created', 'Local', 3,
+    )
+    assert EventCount.from_result((None, 'user_created', 'Local', 3)).bucket is None
@@ -0,0 +1,26 @@
+import pytest
+
+from core.event_serializer import event_type_name, serialize_event, serialize_events
+from users.use_cases import UserCreated
+
+
+@pytest.fixture()
+def f_event() -> UserCreated:
+    return UserCreated(email='test@email.com', first_name='Test', last_name='Testovich')
+
+
+def test_event_type_name_is_snake_case() -> None:
+    assert event_type_name(UserCreated) == 'user_created'
+
+
+def test_serialized_event_matches_model_dump_json(f_event: UserCreated) -> None:
+    assert serialize_event(f_event).decode() == f_event.model_dump_json()
+
+
+def test_batch_shares_one_timestamp(f_event: UserCreated, settings) -> None:  # noqa: ANN001
+    columns = serialize_events([f_event, f_event])
+
+    assert columns['event_type'] == ['user_created', 'user_created']
+    assert columns['environment'] == [settings.ENVIRONMENT, settings.ENVIRONMENT]
+    assert columns['event_date_time'][0] is columns['event_date_time'][1]
+    assert columns['event_context'] == [serialize_event(f_event)] * 2
@@ -0,0 +1,113 @@
+"""
+Prometheus metrics and Sentry spans for the event log hot path.
+
+Metrics live in the default registry of each process. Under a prefork
+Celery worker or a multi-process web server set ``PROMETHEUS_MULTIPROC_DIR``
+and every process writes its samples there, and ``exposition_registry``
+merges them when scraped.
+"""
+import os
+import time
+from collections.abc import Generator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Histogram, multiprocess
+from prometheus_client.registry import Collector
+
+from core.sentry import sentry_enabled
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CLICKHOUSE_REQUEST_SECONDS = Histogram(
+    'clickhouse_request_seconds',
+    'Duration of event log requests to ClickHouse.',
+    ['operation'],
+    buckets=LATENCY_BUCKETS,
+)
+CLICKHOUSE_REQUEST_ERRORS = Counter(
+    'clickhouse_request_errors_total',
+    'Event log requests to ClickHouse that failed.',
+    ['operation'],
+)
+QUERY_CACHE_REQUESTS = Counter(
+    'event_log_query_cache_requests_total',
+    'Cached event log queries by outcome: hit, miss, or coalesced into a query already running.',
+    ['result'],
+)
+LOG_SHIPPING_RECORDS = Counter(
+    'log_shipping_records_total',
+    'Application log records offered to the event pipeline by outcome: shipped, failed, sampled_out or dropped.',
+    ['result'],
+)
+
+_collectors: list[Collector] = []
+
+
+def register_collector(collector: Collector) -> None:
+    """Register a collector computed at scrape time, such as a gauge read from the database."""
+    REGISTRY.register(collector)
+    _collectors.append(collector)
+
+
+def exposition_registry() -> CollectorRegistry:
+    if not os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        return REGISTRY
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    for collector in _collectors:
+        registry.register(collector)
+    return registry
+
+
+@contextmanager
+def timed(histogram: Histogram, op: str, **labels: str) -> Generator[None]:
+    """
+    Time a block into ``histogram`` and trace it as a Sentry span named ``op``.
+
+    Outside of a Sentry transaction (the relay command, the benchmarks) the
+    span is simply not recorded.
+    """
+    started_at = time.perf_counter()
+    with _span(op=op):
+        try:
+            yield
+        finally:
+            (histogram.labels(**labels) if labels else histogram).observe(time.perf_counter() - started_at)
+
+
+@contextmanager
+def clickhouse_request(operation: str) -> Generator[None]:
+    with timed(CLICKHOUSE_REQUEST_SECONDS, f'db.clickhouse.{operation}', operation=operation):
+        try:
+            yield
+        except Exception:
+            CLICKHOUSE_REQUEST_ERRORS.labels(operation=operation).inc()
+            raise
+
+
+@contextmanager
+def traced(op: str, name: str) -> Generator[None]:
+    """A Sentry span inside the current transaction, or a transaction of its own when there is none."""
+    if not sentry_enabled():
+        yield
+        return
+
+    import sentry_sdk
+
+    if sentry_sdk.get_current_span() is not None:
+        with sentry_sdk.start_span(op=op, description=name):
+            yield
+    else:
+        with sentry_sdk.start_transaction(op=op, name=name):
+            yield
+
+
+def _span(**kwargs: str) -> AbstractContextManager:
+    # Processes without Sentry never import the SDK, see core.sentry.
+    if not sentry_enabled():
+        return nullcontext()
+
+    import sentry_sdk
+
+    return sentry_sdk.start_span(**kwargs)
@@ -0,0 +1,176 @@
+"""
+Result cache in front of event log queries.
+
+Results are keyed on the whitespace-normalized SQL plus its bound
+parameters and stored pickled, either in a byte-bounded in-process LRU or
+in one of the Django caches (Redis, for a cache shared by every process,
+bounded by its own ``maxmemory`` policy). Identical queries arriving while
+one is already running wait for it instead of hitting ClickHouse again.
+"""
+import datetime as dt
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future
+from functools import cache
+from typing import Any, Protocol, TypeVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+from core.metrics import QUERY_CACHE_REQUESTS
+
+T = TypeVar('T')
+
+
+class CacheStore(Protocol):
+    def get(self, key: str) -> bytes | None:
+        ...
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        ...
+
+
+class MemoryStore:
+    """Least recently used entries are evicted once the pickled values exceed ``max_bytes``."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self._max_bytes = max_bytes
+        self._bytes = 0
+        self._entries: OrderedDict[str, tuple[bytes, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                self._remove(key)
+                return None
+
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        if len(value) > self._max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._bytes += len(value)
+            while self._bytes > self._max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str) -> None:
+        value, _ = self._entries.pop(key)
+        self._bytes -= len(value)
+
+
+class DjangoCacheStore:
+    def __init__(self, alias: str) -> None:
+        self._cache = caches[alias]
+
+    def get(self, key: str) -> bytes | None:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._cache.set(key, value, timeout=ttl)
+
+
+class QueryCache:
+    def __init__(self, store: CacheStore, ttl: float, past_ttl: float, settle: float) -> None:
+        self._store = store
+        self._ttl = ttl
+        self._past_ttl = past_ttl
+        self._settle = dt.timedelta(seconds=settle)
+        self._flights: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def get_or_run(
+        self,
+        sql: str,
+        parameters: dict[str, Any] | None,
+        run: Callable[[], T],
+        ttl: float | None = None,
+    ) -> T:
+        key = self.key(sql, parameters)
+        if (cached := self._store.get(key)) is not None:
+            QUERY_CACHE_REQUESTS.labels(result='hit').inc()
+            return pickle.loads(cached)  # noqa: S301
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = Future()
+
+        if not leader:
+            QUERY_CACHE_REQUESTS.labels(result='coalesced').inc()
+            return flight.result()
+        return self._lead(key, flight, run, self._ttl if ttl is None else ttl)
+
+    def ttl_for(self, until: dt.datetime | None) -> float:
+        """
+        The longer TTL once a time range is fully in the past.
+
+        A range counts as past once ``settle`` has gone by since its end, so
+        events still waiting in the outbox cannot be missing from a result
+        cached for long. Naive datetimes are taken as UTC, as in the query.
+        """
+        if until is not None and until.tzinfo is None:
+            until = until.replace(tzinfo=dt.UTC)
+        if until is not None and until <= timezone.now() - self._settle:
+            return self._past_ttl
+        return self._ttl
+
+    @staticmethod
+    def key(sql: str, parameters: dict[str, Any] | None) -> str:
+        normalized = ' '.join(sql.split())
+        bound = json.dumps(parameters or {}, sort_keys=True, default=str)
+        return 'event_log_query:' + hashlib.sha256(f'{normalized}\0{bound}'.encode()).hexdigest()
+
+    def _lead(self, key: str, flight: Future, run: Callable[[], T], ttl: float) -> T:
+        try:
+            QUERY_CACHE_REQUESTS.labels(result='miss').inc()
+            result = run()
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        else:
+            self._store.set(key, pickle.dumps(result), ttl)
+            flight.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._flights[key]
+
+
+@cache
+def get_query_cache() -> QueryCache | None:
+    """The process-wide cache configured by ``EVENT_LOG_QUERY_CACHE``, or None when caching is off."""
+    if not settings.EVENT_LOG_QUERY_CACHE:
+        return None
+
+    if settings.EVENT_LOG_QUERY_CACHE == 'memory':
+        store = MemoryStore(settings.EVENT_LOG_QUERY_CACHE_MAX_BYTES)
+    else:
+        store = DjangoCacheStore(settings.EVENT_LOG_QUERY_CACHE)
+
+    return QueryCache(
+        store,
+        ttl=settings.EVENT_LOG_QUERY_CACHE_TTL,
+        past_ttl=settings.EVENT_LOG_QUERY_CACHE_PAST_TTL,
+        settle=settings.EVENT_LOG_QUERY_CACHE_SETTLE,
+    )
+
+
+os.register_at_fork(after_in_child=get_query_cache.cache_clear)
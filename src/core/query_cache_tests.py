@@ -0,0 +1,104 @@
+import datetime as dt
+import threading
+import time
+
+import pytest
+from django.utils import timezone
+
+from core.query_cache import MemoryStore, QueryCache
+
+
+@pytest.fixture()
+def f_cache() -> QueryCache:
+    return QueryCache(MemoryStore(max_bytes=1024), ttl=60, past_ttl=3600, settle=300)
+
+
+def test_key_ignores_whitespace_and_parameter_order() -> None:
+    first = QueryCache.key('SELECT count()\n  FROM event_log', {'a': 1, 'b': 2})
+    second = QueryCache.key('SELECT count() FROM event_log', {'b': 2, 'a': 1})
+
+    assert first == second
+    assert first != QueryCache.key('SELECT count() FROM event_log', {'a': 1, 'b': 3})
+
+
+def test_repeated_query_is_served_from_cache(f_cache: QueryCache) -> None:
+    calls = []
+
+    for _ in range(3):
+        result = f_cache.get_or_run('SELECT 1', None, lambda: calls.append(1) or [(1,)])
+
+    assert result == [(1,)]
+    assert len(calls) == 1
+
+
+def test_memory_store_evicts_least_recently_used_by_bytes() -> None:
+    store = MemoryStore(max_bytes=10)
+    store.set('a', b'aaaa', ttl=60)
+    store.set('b', b'bbbb', ttl=60)
+    store.get('a')
+
+    store.set('c', b'cccc', ttl=60)
+
+    assert store.get('a') == b'aaaa'
+    assert store.get('b') is None
+    assert store.get('c') == b'cccc'
+
+
+def test_memory_store_expires_entries() -> None:
+    store = MemoryStore(max_bytes=10)
+    store.set('a', b'aaaa', ttl=0.01)
+
+    time.sleep(0.02)
+
+    assert store.get('a') is None
+
+
+def test_concurrent_identical_queries_run_once(f_cache: QueryCache) -> None:
+    started, release = threading.Event(), threading.Event()
+    calls, results = [], []
+
+    def slow_query() -> list[tuple]:
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return [(42,)]
+
+    leader = threading.Thread(target=lambda: results.append(f_cache.get_or_run('SELECT 42', None, slow_query)))
+    leader.start()
+    started.wait(5)
+    followers = [
+        threading.Thread(target=lambda: results.append(f_cache.get_or_run('SELECT 42', None, slow_query)))
+        for _ in range(3)
+    ]
+    for follower in followers:
+        follower.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results == [[(42,)]] * 4
+
+
+def test_failed_query_is_not_cached(f_cache: QueryCache) -> None:
+    def failing_query() -> list[tuple]:
+        raise ConnectionError
+
+    with pytest.raises(ConnectionError):
+        f_cache.get_or_run('SELECT 1', None, failing_query)
+
+    assert f_cache.get_or_run('SELECT 1', None, lambda: [(1,)]) == [(1,)]
+
+
+def test_settled_past_ranges_get_the_longer_ttl(f_cache: QueryCache) -> None:
+    assert f_cache.ttl_for(None) == 60
+    assert f_cache.ttl_for(timezone.now() - dt.timedelta(minutes=1)) == 60
+    assert f_cache.ttl_for(timezone.now() - dt.timedelta(hours=1)) == 3600
+
+
+def test_naive_until_is_taken_as_utc(f_cache: QueryCache) -> None:
+    now = dt.datetime.now(dt.UTC).replace(tzinfo=None)
+
+    assert f_cache.ttl_for(now - dt.timedelta(minutes=1)) == 60
+    assert f_cache.ttl_for(dt.datetime(2024, 1, 2)) == 3600  # noqa: DTZ001
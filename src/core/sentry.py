@@ -0,0 +1,36 @@
+"""
+Sentry setup for the processes that report to it.
+
+The web server (``core.wsgi``/``core.asgi``), Celery workers and the relay
+command call ``init_sentry``. Other ``manage.py`` commands, beat and the
+tests never import the SDK, which keeps their start-up fast.
+"""
+from django.conf import settings
+
+_enabled = False
+
+
+def init_sentry() -> None:
+    global _enabled
+    if _enabled or not settings.SENTRY_SETTINGS['dsn'] or settings.DEBUG:
+        return
+
+    import sentry_sdk
+    from sentry_sdk.integrations.celery import CeleryIntegration
+    from sentry_sdk.integrations.django import DjangoIntegration
+
+    sentry_sdk.init(
+        dsn=settings.SENTRY_SETTINGS['dsn'],
+        environment=settings.SENTRY_SETTINGS['environment'],
+        traces_sample_rate=settings.SENTRY_SETTINGS['traces_sample_rate'],
+        integrations=[
+            DjangoIntegration(),
+            CeleryIntegration(),
+        ],
+        default_integrations=False,
+    )
+    _enabled = True
+
+
+def sentry_enabled() -> bool:
+    return _enabled
@@ -2,7 +2,6 @@ import os
 from pathlib import Path
 
 import environ
-import sentry_sdk
 import structlog
 
 env = environ.Env(
@@ -68,7 +67,7 @@ DATABASES = {
 }
 
 CLICKHOUSE_HOST = env('CLICKHOUSE_HOST', default='clickhouse')
-CLICKHOUSE_PORT = env('CLICKHOUSE_HOST', default=8123)
+CLICKHOUSE_PORT = env.int('CLICKHOUSE_PORT', default=8123)
 CLICKHOUSE_USER = os.getenv('CLICKHOUSE_USER', default='')
 CLICKHOUSE_PASSWORD = os.getenv('CLICKHOUSE_PASSWORD', default='')
 CLICKHOUSE_SCHEMA = os.getenv('CLICKHOUSE_SCHEMA', default='default')
@@ -78,6 +77,70 @@ CLICKHOUSE_URI = (
     f'{CLICKHOUSE_PROTOCOL}'
 )
 CLICKHOUSE_EVENT_LOG_TABLE_NAME = 'event_log'
+CLICKHOUSE_EVENT_LOG_RETENTION_DAYS = env.int('CLICKHOUSE_EVENT_LOG_RETENTION_DAYS', default=365)
+CLICKHOUSE_COMPRESSION = env('CLICKHOUSE_COMPRESSION', default='lz4')
+CLICKHOUSE_CONNECT_TIMEOUT = env.int('CLICKHOUSE_CONNECT_TIMEOUT', default=30)
+CLICKHOUSE_SEND_RECEIVE_TIMEOUT = env.int('CLICKHOUSE_SEND_RECEIVE_TIMEOUT', default=10)
+# Migrations copy whole tables, far beyond the timeout of regular queries.
+CLICKHOUSE_MIGRATION_TIMEOUT = env.int('CLICKHOUSE_MIGRATION_TIMEOUT', default=6 * 60 * 60)
+CLICKHOUSE_POOL_SIZE = env.int('CLICKHOUSE_POOL_SIZE', default=4)
+CLICKHOUSE_POOL_IDLE_TIMEOUT = env.float('CLICKHOUSE_POOL_IDLE_TIMEOUT', default=300.0)
+CLICKHOUSE_POOL_HEALTH_CHECK_INTERVAL = env.float('CLICKHOUSE_POOL_HEALTH_CHECK_INTERVAL', default=30.0)
+CLICKHOUSE_POOL_CHECKOUT_TIMEOUT = env.float('CLICKHOUSE_POOL_CHECKOUT_TIMEOUT', default=10.0)
+
+# Port of the Prometheus exporter started by Celery workers, 0 disables it. Prefork
+# workers also need PROMETHEUS_MULTIPROC_DIR so the exporter sees every child.
+METRICS_PORT = env.int('METRICS_PORT', default=0)
+# Seconds a scrape reuses the outbox backlog read by the previous one, 0 reads it on every scrape.
+METRICS_OUTBOX_CACHE_TTL = env.float('METRICS_OUTBOX_CACHE_TTL', default=15.0)
+
+EVENT_LOG_PAGE_SIZE = env.int('EVENT_LOG_PAGE_SIZE', default=1000)
+EVENT_LOG_QUERY_PAGE_SIZE = env.int('EVENT_LOG_QUERY_PAGE_SIZE', default=100_000)
+# '' disables the query cache, 'memory' keeps it in process, anything else names a CACHES alias.
+EVENT_LOG_QUERY_CACHE = env('EVENT_LOG_QUERY_CACHE', default='')
+EVENT_LOG_QUERY_CACHE_MAX_BYTES = env.int('EVENT_LOG_QUERY_CACHE_MAX_BYTES', default=64 * 1024 * 1024)
+EVENT_LOG_QUERY_CACHE_TTL = env.float('EVENT_LOG_QUERY_CACHE_TTL', default=60.0)
+EVENT_LOG_QUERY_CACHE_PAST_TTL = env.float('EVENT_LOG_QUERY_CACHE_PAST_TTL', default=3600.0)
+EVENT_LOG_QUERY_CACHE_SETTLE = env.float('EVENT_LOG_QUERY_CACHE_SETTLE', default=300.0)
+EVENT_LOG_SINK = env('EVENT_LOG_SINK', default='logs.sinks.ClickHouseSink')
+EVENT_PROCESSING_BATCH_SIZE = env.int('EVENT_PROCESSING_BATCH_SIZE', default=1000)
+EVENT_RELAY_INTERVAL = env.float('EVENT_RELAY_INTERVAL', default=60.0)
+EVENT_RELAY_TIME_BUDGET = env.float('EVENT_RELAY_TIME_BUDGET', default=50.0)
+EVENT_RELAY_MIN_BATCH_SIZE = env.int('EVENT_RELAY_MIN_BATCH_SIZE', default=100)
+EVENT_RELAY_MAX_BATCH_SIZE = env.int('EVENT_RELAY_MAX_BATCH_SIZE', default=100_000)
+EVENT_RELAY_MAX_BATCH_BYTES = env.int('EVENT_RELAY_MAX_BATCH_BYTES', default=64 * 1024 * 1024)
+EVENT_RELAY_TARGET_INSERT_SECONDS = env.float('EVENT_RELAY_TARGET_INSERT_SECONDS', default=2.0)
+EVENT_RELAY_CHUNK_SIZE = env.int('EVENT_RELAY_CHUNK_SIZE', default=5000)
+EVENT_RELAY_MAX_REJECTED_ROWS = env.int('EVENT_RELAY_MAX_REJECTED_ROWS', default=100)
+EVENT_RELAY_LINGER = env.float('EVENT_RELAY_LINGER', default=0.05)
+EVENT_RELAY_POLL_INTERVAL = env.float('EVENT_RELAY_POLL_INTERVAL', default=5.0)
+EVENT_RELAY_CIRCUIT_FAILURE_THRESHOLD = env.int('EVENT_RELAY_CIRCUIT_FAILURE_THRESHOLD', default=3)
+EVENT_RELAY_CIRCUIT_RESET_TIMEOUT = env.float('EVENT_RELAY_CIRCUIT_RESET_TIMEOUT', default=30.0)
+EVENT_RELAY_CIRCUIT_RAMP_SECONDS = env.float('EVENT_RELAY_CIRCUIT_RAMP_SECONDS', default=120.0)
+# 'jsonb' keeps event contexts in event_context, 'payload' stores them pre-serialized, see logs.payloads.
+EVENT_OUTBOX_STORAGE = env('EVENT_OUTBOX_STORAGE', default='jsonb')
+EVENT_OUTBOX_COMPRESSION_THRESHOLD = env.int('EVENT_OUTBOX_COMPRESSION_THRESHOLD', default=4096)
+EVENT_OUTBOX_COMPRESSION_LEVEL = env.int('EVENT_OUTBOX_COMPRESSION_LEVEL', default=3)
+# Outbox lanes, see logs.lanes. Event types listed in EVENT_AUDIT_EVENT_TYPES get a lane of their own
+# that is relayed every EVENT_AUDIT_RELAY_INTERVAL seconds from a dedicated queue.
+EVENT_DEFAULT_LANE = 'default'
+EVENT_LANES = {
+    EVENT_DEFAULT_LANE: {
+        'queue': env('EVENT_RELAY_QUEUE', default='celery'),
+        'batch_size': EVENT_RELAY_MAX_BATCH_SIZE,
+        'interval': EVENT_RELAY_INTERVAL,
+    },
+}
+if EVENT_AUDIT_EVENT_TYPES := env.list('EVENT_AUDIT_EVENT_TYPES', default=[]):
+    EVENT_LANES['audit'] = {
+        'event_types': EVENT_AUDIT_EVENT_TYPES,
+        'queue': env('EVENT_AUDIT_RELAY_QUEUE', default='event_log_audit'),
+        'batch_size': env.int('EVENT_AUDIT_RELAY_BATCH_SIZE', default=1000),
+        'interval': env.float('EVENT_AUDIT_RELAY_INTERVAL', default=1.0),
+    }
+EVENT_OUTBOX_PARTITIONED = env.bool('EVENT_OUTBOX_PARTITIONED', default=False)
+EVENT_OUTBOX_PARTITIONS_AHEAD = env.int('EVENT_OUTBOX_PARTITIONS_AHEAD', default=3)
+EVENT_OUTBOX_PARTITION_MAINTENANCE_INTERVAL = env.float('EVENT_OUTBOX_PARTITION_MAINTENANCE_INTERVAL', default=3600.0)
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -113,9 +176,35 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 CELERY_BROKER = env("CELERY_BROKER", default="redis://localhost:6379/0")
 CELERY_ALWAYS_EAGER = env("CELERY_ALWAYS_EAGER", default=DEBUG)
+CELERY_BROKER_URL = CELERY_BROKER
+CELERY_TASK_ALWAYS_EAGER = CELERY_ALWAYS_EAGER
+CELERY_BEAT_SCHEDULE = {
+    f"drain-event-log-outbox-{lane}": {
+        "task": "logs.task.process_outbox_batch",
+        "schedule": config["interval"],
+        "args": (lane,),
+        "options": {"expires": config["interval"], "queue": config["queue"]},
+    }
+    for lane, config in EVENT_LANES.items()
+}
+if EVENT_OUTBOX_PARTITIONED:
+    CELERY_BEAT_SCHEDULE["maintain-event-log-outbox-partitions"] = {
+        "task": "logs.task.maintain_outbox_partitions",
+        "schedule": EVENT_OUTBOX_PARTITION_MAINTENANCE_INTERVAL,
+    }
 
 LOG_FORMATTER = env("LOG_FORMATTER", default="console")
 LOG_LEVEL = env("LOG_LEVEL", default="INFO")
+# Copies log records into the event pipeline as app_log events, see logs.shipping.
+LOG_SHIPPING = env.bool("LOG_SHIPPING", default=False)
+LOG_SHIPPING_LEVEL = env("LOG_SHIPPING_LEVEL", default="WARNING")
+LOG_SHIPPING_LOGGERS = env.list("LOG_SHIPPING_LOGGERS", default=[])
+LOG_SHIPPING_QUEUE_SIZE = env.int("LOG_SHIPPING_QUEUE_SIZE", default=10_000)
+LOG_SHIPPING_BATCH_SIZE = env.int("LOG_SHIPPING_BATCH_SIZE", default=500)
+LOG_SHIPPING_FLUSH_INTERVAL = env.float("LOG_SHIPPING_FLUSH_INTERVAL", default=1.0)
+LOG_SHIPPING_SAMPLE_RATE = env.float("LOG_SHIPPING_SAMPLE_RATE", default=0.1)
+# 'outbox' writes through LogService, 'sink' inserts into EVENT_LOG_SINK directly.
+LOG_SHIPPING_TARGET = env("LOG_SHIPPING_TARGET", default="outbox")
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -154,34 +243,41 @@ LOGGING = {
     },
 }
 
+LOG_PROCESSORS = [
+    structlog.contextvars.merge_contextvars,
+    structlog.stdlib.filter_by_level,
+    structlog.stdlib.add_logger_name,
+    structlog.stdlib.add_log_level,
+    structlog.stdlib.PositionalArgumentsFormatter(),
+    structlog.processors.StackInfoRenderer(),
+    structlog.processors.format_exc_info,
+    structlog.processors.UnicodeDecoder(),
+]
+if LOG_SHIPPING:
+    from logs.shipping import LogShipper
+
+    LOG_PROCESSORS.append(LogShipper(
+        level=LOG_SHIPPING_LEVEL,
+        loggers=LOG_SHIPPING_LOGGERS,
+        queue_size=LOG_SHIPPING_QUEUE_SIZE,
+        batch_size=LOG_SHIPPING_BATCH_SIZE,
+        flush_interval=LOG_SHIPPING_FLUSH_INTERVAL,
+        sample_rate=LOG_SHIPPING_SAMPLE_RATE,
+        target=LOG_SHIPPING_TARGET,
+    ))
+
 structlog.configure(
     processors=[
-        structlog.contextvars.merge_contextvars,
-        structlog.stdlib.filter_by_level,
-        structlog.stdlib.add_logger_name,
-        structlog.stdlib.add_log_level,
-        structlog.stdlib.PositionalArgumentsFormatter(),
-        structlog.processors.StackInfoRenderer(),
-        structlog.processors.format_exc_info,
-        structlog.processors.UnicodeDecoder(),
+        *LOG_PROCESSORS,
         structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
     ],
     logger_factory=structlog.stdlib.LoggerFactory(),
     cache_logger_on_first_use=True,
 )
 
+# Sentry is initialized by the processes that report to it, see core.sentry.
 SENTRY_SETTINGS = {
     "dsn": env("SENTRY_CONFIG_DSN"),
     "environment": env("SENTRY_CONFIG_ENVIRONMENT"),
+    "traces_sample_rate": env.float("SENTRY_TRACES_SAMPLE_RATE", default=0.0),
 }
-
-if SENTRY_SETTINGS.get("dsn") and not DEBUG:
-    sentry_sdk.init(
-        dsn=SENTRY_SETTINGS["dsn"],
-        environment=SENTRY_SETTINGS["environment"],
-        integrations=[
-            sentry_sdk.DjangoIntegration(),
-            sentry_sdk.CeleryIntegration(),
-        ],
-        default_integrations=False,
-    )
@@ -0,0 +1,10 @@
+import pytest
+
+from benchmarks.startup import LAZY_MODULES, TARGETS, import_times
+
+
+@pytest.mark.parametrize('target', TARGETS)
+def test_startup_leaves_heavy_clients_unimported(target: str) -> None:
+    imported = {time.module for time in import_times(TARGETS[target])}
+
+    assert imported.isdisjoint(LAZY_MODULES)
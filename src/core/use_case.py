@@ -1,9 +1,11 @@
+from contextlib import AbstractContextManager
 from typing import Any, Protocol
 
 import structlog
-from django.db import transaction
 
 from core.base_model import Model
+from core.event_serializer import outbox_event
+from logs.services import LogService
 
 
 class UseCaseRequest(Model):
@@ -17,11 +19,41 @@ class UseCaseResponse(Model):
 
 class UseCase(Protocol):
     def execute(self, request: UseCaseRequest) -> UseCaseResponse:
+        """
+        Run ``_execute`` in a transaction. Events published with ``_publish``
+        are written to the outbox in the same transaction, right before it
+        commits, and reach ClickHouse through the relay afterwards.
+        """
         with structlog.contextvars.bound_contextvars(
             **self._get_context_vars(request),
-        ):
+        ), self._atomic():
             return self._execute(request)
 
+    async def aexecute(self, request: UseCaseRequest) -> UseCaseResponse:
+        """
+        ``execute`` for async views. Django has no async transactions, so
+        ``_aexecute`` runs outside one, and events published with
+        ``_apublish`` are inserted into ClickHouse straight from the event
+        loop instead of going through the outbox.
+        """
+        with structlog.contextvars.bound_contextvars(**self._get_context_vars(request)):
+            return await self._aexecute(request)
+
+    def _atomic(self) -> AbstractContextManager:
+        """The transaction ``_execute`` runs in. Batch use cases commit per chunk instead."""
+        return LogService.atomic()
+
+    def _publish(self, *events: Model) -> None:
+        for event in events:
+            LogService.log_event(outbox_event(event))
+
+    async def _apublish(self, *events: Model) -> None:
+        # Imported here so that loading a use case does not load httpx and clickhouse_connect.
+        from core.async_event_log_client import AsyncEventLogClient
+
+        async with AsyncEventLogClient.init() as client:
+            await client.insert(list(events))
+
     def _get_context_vars(self, request: UseCaseRequest) -> dict[str, Any]:  # noqa: ARG002
         """
         !!! WARNING:
@@ -32,6 +64,8 @@ class UseCase(Protocol):
             'use_case': self.__class__.__name__,
         }
 
-    @transaction.atomic()
     def _execute(self, request: UseCaseRequest) -> UseCaseResponse:
         raise NotImplementedError()
+
+    async def _aexecute(self, request: UseCaseRequest) -> UseCaseResponse:
+        raise NotImplementedError()
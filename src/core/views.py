@@ -0,0 +1,10 @@
+from django.http import HttpRequest, HttpResponse
+from django.views.decorators.http import require_GET
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from core.metrics import exposition_registry
+
+
+@require_GET
+def metrics(request: HttpRequest) -> HttpResponse:  # noqa: ARG001
+    return HttpResponse(generate_latest(exposition_registry()), content_type=CONTENT_TYPE_LATEST)
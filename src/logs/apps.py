@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class LogsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'logs'
+
+    def ready(self) -> None:
+        from logs import metrics  # noqa: F401
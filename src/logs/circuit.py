@@ -0,0 +1,116 @@
+import datetime as dt
+import random
+from typing import NamedTuple
+
+import structlog
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from logs.models import RelayCircuit
+
+logger = structlog.get_logger(__name__)
+
+
+class Admission(NamedTuple):
+    allowed: bool
+    probe: bool = False
+    # Share of the usual batch size to relay while ramping up after an outage.
+    ramp: float = 1.0
+
+
+class CircuitBreaker:
+    """
+    Keeps relay workers off ClickHouse while it is known to be down.
+
+    The state lives in Postgres, so one worker's failures stop every worker.
+    After ``failure_threshold`` consecutive failed inserts the circuit opens
+    and relay runs are skipped. Once ``reset_timeout`` has passed, exactly
+    one worker wins the row lock and sends a single probe batch, or pings
+    ClickHouse when there is nothing to relay. A good probe closes the
+    circuit, and for ``ramp_seconds`` afterwards batches grow back from a
+    jittered fraction of their usual size so the backlog does not hit
+    ClickHouse all at once. A failed probe opens the circuit again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float, ramp_seconds: float) -> None:
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = dt.timedelta(seconds=reset_timeout)
+        self._ramp_seconds = ramp_seconds
+        self._healthy = False
+
+    @classmethod
+    def from_settings(cls, name: str = 'clickhouse') -> 'CircuitBreaker':
+        return cls(
+            name=name,
+            failure_threshold=settings.EVENT_RELAY_CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.EVENT_RELAY_CIRCUIT_RESET_TIMEOUT,
+            ramp_seconds=settings.EVENT_RELAY_CIRCUIT_RAMP_SECONDS,
+        )
+
+    def admit(self) -> Admission:
+        circuit, _ = RelayCircuit.objects.get_or_create(name=self.name)
+        now = timezone.now()
+        self._healthy = circuit.state == RelayCircuit.State.CLOSED and not circuit.failures
+
+        if circuit.state == RelayCircuit.State.CLOSED:
+            return Admission(allowed=True, ramp=self._ramp(circuit, now))
+        if self._probe_due(circuit, now) and self._claim_probe(now):
+            logger.info('clickhouse circuit half-open, probing', circuit=self.name)
+            return Admission(allowed=True, probe=True, ramp=0.0)
+
+        return Admission(allowed=False)
+
+    def record_success(self) -> None:
+        if self._healthy:
+            return
+
+        circuits = RelayCircuit.objects.filter(name=self.name)
+        if circuits.exclude(state=RelayCircuit.State.CLOSED).update(
+            state=RelayCircuit.State.CLOSED,
+            failures=0,
+            closed_at=timezone.now(),
+        ):
+            logger.info('clickhouse circuit closed', circuit=self.name)
+        else:
+            circuits.update(failures=0)
+        self._healthy = True
+
+    def record_failure(self) -> None:
+        self._healthy = False
+        with transaction.atomic():
+            circuit = RelayCircuit.objects.select_for_update().get(name=self.name)
+            circuit.failures += 1
+            if circuit.state == RelayCircuit.State.HALF_OPEN or circuit.failures >= self._failure_threshold:
+                if circuit.state != RelayCircuit.State.OPEN:
+                    logger.warning('clickhouse circuit opened', circuit=self.name, failures=circuit.failures)
+                circuit.state = RelayCircuit.State.OPEN
+                circuit.opened_at = timezone.now()
+            circuit.save(update_fields=['failures', 'state', 'opened_at'])
+
+    def _probe_due(self, circuit: RelayCircuit, now: dt.datetime) -> bool:
+        # A half-open circuit whose prober died is probed again after the same timeout.
+        since = circuit.probe_started_at if circuit.state == RelayCircuit.State.HALF_OPEN else circuit.opened_at
+        return since is None or now - since >= self._reset_timeout
+
+    def _claim_probe(self, now: dt.datetime) -> bool:
+        with transaction.atomic():
+            circuit = RelayCircuit.objects.select_for_update(skip_locked=True).filter(name=self.name).first()
+            if circuit is None or circuit.state == RelayCircuit.State.CLOSED or not self._probe_due(circuit, now):
+                return False
+
+            circuit.state = RelayCircuit.State.HALF_OPEN
+            circuit.probe_started_at = now
+            circuit.save(update_fields=['state', 'probe_started_at'])
+        return True
+
+    def _ramp(self, circuit: RelayCircuit, now: dt.datetime) -> float:
+        if circuit.closed_at is None or not self._ramp_seconds:
+            return 1.0
+
+        progress = (now - circuit.closed_at).total_seconds() / self._ramp_seconds
+        if progress >= 1:
+            return 1.0
+        # Jitter keeps workers that resumed together from sending equal batches in lockstep.
+        return progress * random.uniform(0.5, 1.0)  # noqa: S311
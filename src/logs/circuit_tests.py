@@ -0,0 +1,155 @@
+import datetime as dt
+from collections.abc import Callable, Sequence
+from typing import Any
+
+import pytest
+from django.utils import timezone
+
+from logs.circuit import CircuitBreaker
+from logs.models import EventLogOutbox, RelayCircuit
+from logs.relay import OutboxRelay, SinkError
+from logs.sinks import MemorySink, SinkUnavailableError
+
+
+class FailingSink:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def insert(self, columns: dict[str, Sequence[Any]], dedup_token: str) -> None:  # noqa: ARG002
+        self.calls += 1
+        raise SinkUnavailableError('clickhouse is down')
+
+    def ping(self) -> None:
+        self.calls += 1
+        raise SinkUnavailableError('clickhouse is down')
+
+
+@pytest.fixture()
+def f_breaker() -> CircuitBreaker:
+    return CircuitBreaker(name='test', failure_threshold=2, reset_timeout=30, ramp_seconds=60)
+
+
+def _expire_reset_timeout(breaker: CircuitBreaker) -> None:
+    RelayCircuit.objects.filter(name=breaker.name).update(opened_at=timezone.now() - dt.timedelta(seconds=31))
+
+
+@pytest.mark.django_db()
+def test_circuit_opens_after_consecutive_failures(f_breaker: CircuitBreaker) -> None:
+    assert f_breaker.admit().allowed
+
+    f_breaker.record_failure()
+    assert f_breaker.admit().allowed
+
+    f_breaker.record_failure()
+    assert not f_breaker.admit().allowed
+
+
+@pytest.mark.django_db()
+def test_single_probe_after_reset_timeout(f_breaker: CircuitBreaker) -> None:
+    f_breaker.admit()
+    f_breaker.record_failure()
+    f_breaker.record_failure()
+    _expire_reset_timeout(f_breaker)
+
+    first = f_breaker.admit()
+    second = CircuitBreaker(name='test', failure_threshold=2, reset_timeout=30, ramp_seconds=60).admit()
+
+    assert first.allowed
+    assert first.probe
+    assert not second.allowed
+
+
+@pytest.mark.django_db()
+def test_successful_probe_closes_and_ramps_up(f_breaker: CircuitBreaker) -> None:
+    f_breaker.admit()
+    f_breaker.record_failure()
+    f_breaker.record_failure()
+    _expire_reset_timeout(f_breaker)
+    f_breaker.admit()
+
+    f_breaker.record_success()
+    admission = f_breaker.admit()
+
+    assert RelayCircuit.objects.get(name='test').state == RelayCircuit.State.CLOSED
+    assert admission.allowed
+    assert 0 <= admission.ramp < 0.1
+
+
+@pytest.mark.django_db()
+def test_failed_probe_reopens(f_breaker: CircuitBreaker) -> None:
+    f_breaker.admit()
+    f_breaker.record_failure()
+    f_breaker.record_failure()
+    _expire_reset_timeout(f_breaker)
+    f_breaker.admit()
+
+    f_breaker.record_failure()
+
+    assert not f_breaker.admit().allowed
+
+
+@pytest.mark.django_db()
+def test_relay_stops_touching_clickhouse_once_open(
+    f_breaker: CircuitBreaker,
+    f_outbox_event: Callable[..., EventLogOutbox],
+) -> None:
+    f_outbox_event()
+    sink = FailingSink()
+    relay = OutboxRelay(sink=sink, breaker=f_breaker)
+
+    for _ in range(2):
+        with pytest.raises(SinkError):
+            relay.drain()
+    relayed = relay.drain()
+
+    assert relayed == 0
+    assert sink.calls == 2
+    assert EventLogOutbox.objects.count() == 1
+
+
+@pytest.mark.django_db()
+def test_relay_resumes_after_probe(
+    f_breaker: CircuitBreaker,
+    f_outbox_event: Callable[..., EventLogOutbox],
+) -> None:
+    for _ in range(3):
+        f_outbox_event()
+    f_breaker.admit()
+    f_breaker.record_failure()
+    f_breaker.record_failure()
+    _expire_reset_timeout(f_breaker)
+
+    relayed = OutboxRelay(sink=MemorySink(), breaker=f_breaker).drain()
+
+    assert relayed == 3
+    assert RelayCircuit.objects.get(name='test').state == RelayCircuit.State.CLOSED
+
+
+@pytest.mark.django_db()
+def test_probe_against_empty_outbox_closes_once_the_sink_answers(f_breaker: CircuitBreaker) -> None:
+    f_breaker.admit()
+    f_breaker.record_failure()
+    f_breaker.record_failure()
+    _expire_reset_timeout(f_breaker)
+
+    relayed = OutboxRelay(sink=MemorySink(), breaker=f_breaker).drain()
+
+    assert relayed == 0
+    assert RelayCircuit.objects.get(name='test').state == RelayCircuit.State.CLOSED
+
+
+@pytest.mark.django_db()
+def test_probe_against_empty_outbox_reopens_while_the_sink_is_down(f_breaker: CircuitBreaker) -> None:
+    f_breaker.admit()
+    f_breaker.record_failure()
+    f_breaker.record_failure()
+    _expire_reset_timeout(f_breaker)
+    sink = FailingSink()
+
+    with pytest.raises(SinkError):
+        OutboxRelay(sink=sink, breaker=f_breaker).drain()
+
+    circuit = RelayCircuit.objects.get(name='test')
+    assert (circuit.state, circuit.failures) == (RelayCircuit.State.OPEN, 3)
+    assert sink.calls == 1
+    assert not f_breaker.admit().allowed
@@ -0,0 +1,23 @@
+from collections.abc import Callable
+
+import pytest
+from django.utils import timezone
+
+from logs.models import EventLogOutbox
+
+
+@pytest.fixture()
+def f_outbox_event() -> Callable[..., EventLogOutbox]:
+    def create(**kwargs) -> EventLogOutbox:  # noqa: ANN003
+        return EventLogOutbox.objects.create(
+            **{
+                'event_type': 'user_created',
+                'event_date_time': timezone.now(),
+                'environment': 'Local',
+                'event_context': {'email': 'test@email.com'},
+                'metadata_version': 1,
+                **kwargs,
+            },
+        )
+
+    return create
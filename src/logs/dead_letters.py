@@ -0,0 +1,83 @@
+"""
+Dead letters: outbox events the event sink rejected.
+
+When the sink rejects a batch, the relay bisects it down to the offending
+rows, moves them to ``EventLogDeadLetter`` with the error and relays the
+rest. Replaying puts dead letters back into the outbox under their original
+id, so ClickHouse collapses any copy of them that did get through; a replayed
+event that is rejected again comes back with its attempt count raised.
+"""
+from collections.abc import Sequence
+from typing import Any
+
+import structlog
+from django.db import transaction
+from django.db.models import Count, Max, QuerySet
+from django.utils import timezone
+
+from logs.metrics import RELAY_DEAD_LETTERS
+from logs.models import EventLogDeadLetter, EventLogOutbox
+
+logger = structlog.get_logger(__name__)
+
+EVENT_FIELDS = (
+    'id',
+    'event_type',
+    'event_date_time',
+    'environment',
+    'event_context',
+    'event_payload',
+    'payload_encoding',
+    'metadata_version',
+    'lane',
+)
+
+
+def dead_letter(rejected: Sequence[tuple[dict[str, Any], str]]) -> None:
+    """Store rejected events, given as outbox fields with the error that rejected them."""
+    ids = [event['id'] for event, _ in rejected]
+    attempts = dict(EventLogDeadLetter.objects.filter(id__in=ids).values_list('id', 'attempts'))
+    EventLogDeadLetter.objects.bulk_create(
+        [
+            EventLogDeadLetter(**event, error=error, attempts=attempts.get(event['id'], 0) + 1)
+            for event, error in rejected
+        ],
+        update_conflicts=True,
+        unique_fields=['id'],
+        update_fields=['error', 'attempts', 'last_failed_at', 'replayed_at'],
+    )
+    RELAY_DEAD_LETTERS.inc(len(rejected))
+    logger.warning('outbox events dead-lettered', count=len(rejected), event_ids=[str(event_id) for event_id in ids])
+
+
+def pending() -> QuerySet[EventLogDeadLetter]:
+    return EventLogDeadLetter.objects.filter(replayed_at__isnull=True)
+
+
+def summarize(dead_letters: QuerySet[EventLogDeadLetter]) -> list[dict[str, Any]]:
+    """Dead letters grouped by event type and error, the most frequent first."""
+    return list(
+        dead_letters
+        .values('event_type', 'error')
+        .annotate(count=Count('id'), max_attempts=Max('attempts'), last_failed_at=Max('last_failed_at'))
+        .order_by('-count', 'event_type'),
+    )
+
+
+def replay(dead_letters: QuerySet[EventLogDeadLetter], chunk_size: int = 1000) -> int:
+    """Move pending ``dead_letters`` back into the outbox, ``chunk_size`` per transaction."""
+    to_replay = dead_letters.filter(replayed_at__isnull=True).order_by('first_failed_at', 'id')
+    replayed = 0
+    while chunk := _replay_chunk(to_replay, chunk_size):
+        replayed += chunk
+    if replayed:
+        logger.info('dead letters replayed', count=replayed)
+    return replayed
+
+
+def _replay_chunk(dead_letters: QuerySet[EventLogDeadLetter], chunk_size: int) -> int:
+    with transaction.atomic():
+        events = list(dead_letters.select_for_update(skip_locked=True).values(*EVENT_FIELDS)[:chunk_size])
+        EventLogOutbox.objects.bulk_create([EventLogOutbox(**event) for event in events])
+        EventLogDeadLetter.objects.filter(id__in=[event['id'] for event in events]).update(replayed_at=timezone.now())
+    return len(events)
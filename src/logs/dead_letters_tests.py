@@ -0,0 +1,115 @@
+import json
+import uuid
+from collections.abc import Callable, Sequence
+from typing import Any
+
+import pytest
+
+from logs import dead_letters
+from logs.models import EventLogDeadLetter, EventLogOutbox
+from logs.relay import OutboxRelay, SinkError
+from logs.sinks import SinkUnavailableError
+
+
+class PoisonSink:
+    """Rejects every batch holding an event whose context is marked as poison."""
+
+    def __init__(self) -> None:
+        self.ids: list[uuid.UUID] = []
+
+    def insert(self, columns: dict[str, Sequence[Any]], dedup_token: str) -> None:  # noqa: ARG002
+        if any(json.loads(context).get('poison') for context in columns['event_context']):
+            raise ValueError('Code: 27. Cannot parse input')
+        self.ids.extend(columns['id'])
+
+
+class UnavailableSink:
+    def insert(self, columns: dict[str, Sequence[Any]], dedup_token: str) -> None:  # noqa: ARG002
+        raise SinkUnavailableError('clickhouse is down')
+
+
+@pytest.mark.django_db()
+def test_rejected_rows_are_dead_lettered_and_the_rest_relayed(
+    f_outbox_event: Callable[..., EventLogOutbox],
+) -> None:
+    events = [f_outbox_event(event_context={'n': n}) for n in range(7)]
+    poison = f_outbox_event(event_context={'poison': True}, lane='audit')
+    sink = PoisonSink()
+
+    relayed = OutboxRelay(sink=sink).drain()
+
+    assert relayed == len(events)
+    assert sorted(sink.ids) == sorted(event.id for event in events)
+    assert not EventLogOutbox.objects.exists()
+    letter = EventLogDeadLetter.objects.get()
+    assert (letter.id, letter.lane, letter.attempts) == (poison.id, 'audit', 1)
+    assert letter.error == 'Code: 27. Cannot parse input'
+
+
+@pytest.mark.django_db()
+def test_replayed_dead_letter_that_fails_again_counts_attempts(
+    f_outbox_event: Callable[..., EventLogOutbox],
+) -> None:
+    poison = f_outbox_event(event_context={'poison': True})
+    relay = OutboxRelay(sink=PoisonSink())
+    relay.drain()
+
+    assert dead_letters.replay(dead_letters.pending()) == 1
+    assert EventLogOutbox.objects.get().event_context == poison.event_context
+    assert not dead_letters.pending().exists()
+
+    relay.drain()
+
+    letter = EventLogDeadLetter.objects.get()
+    assert letter.attempts == 2
+    assert letter.replayed_at is None
+
+
+@pytest.mark.django_db()
+def test_too_many_rejected_rows_fail_the_batch(settings, f_outbox_event: Callable[..., EventLogOutbox]) -> None:  # noqa: ANN001
+    settings.EVENT_RELAY_MAX_REJECTED_ROWS = 1
+    for _ in range(2):
+        f_outbox_event(event_context={'poison': True})
+
+    with pytest.raises(SinkError):
+        OutboxRelay(sink=PoisonSink()).relay_batch()
+
+    assert EventLogOutbox.objects.count() == 2
+    assert not EventLogDeadLetter.objects.exists()
+
+
+@pytest.mark.django_db()
+def test_unavailable_sink_is_not_bisected(f_outbox_event: Callable[..., EventLogOutbox]) -> None:
+    for _ in range(4):
+        f_outbox_event()
+
+    with pytest.raises(SinkError):
+        OutboxRelay(sink=UnavailableSink()).relay_batch()
+
+    assert EventLogOutbox.objects.count() == 4
+    assert not EventLogDeadLetter.objects.exists()
+
+
+@pytest.mark.django_db()
+def test_rows_taken_before_an_outage_mid_bisection_leave_the_outbox(
+    f_outbox_event: Callable[..., EventLogOutbox],
+) -> None:
+    first = f_outbox_event(event_context={'n': 0})
+    for context in ({'poison': True}, {'n': 1}, {'n': 2}):
+        f_outbox_event(event_context=context)
+    sink = PoisonSink()
+    insert = sink.insert
+
+    def insert_until_outage(columns: dict[str, Sequence[Any]], dedup_token: str) -> None:
+        if sink.ids:
+            raise SinkUnavailableError('clickhouse went away')
+        insert(columns, dedup_token)
+
+    sink.insert = insert_until_outage
+
+    with pytest.raises(SinkError):
+        OutboxRelay(sink=sink).relay_batch()
+
+    assert sink.ids == [first.id]
+    assert EventLogOutbox.objects.count() == 3
+    assert not EventLogDeadLetter.objects.exists()
@@ -0,0 +1,48 @@
+"""
+Priority lanes of the outbox.
+
+Every event is assigned a lane when it is published, from its event type
+(see ``EVENT_LANES``). Each lane is relayed by its own beat task on its own
+Celery queue, with its own batch size and interval, so a burst in a bulk
+lane never delays a latency-sensitive one. Event types no lane names go to
+``EVENT_DEFAULT_LANE``.
+"""
+from functools import cache
+from typing import NamedTuple
+
+from django.conf import settings
+
+
+class Lane(NamedTuple):
+    name: str
+    queue: str
+    batch_size: int
+    interval: float
+    event_types: frozenset[str] = frozenset()
+
+
+@cache
+def get_lanes() -> dict[str, Lane]:
+    return {
+        name: Lane(
+            name=name,
+            queue=config['queue'],
+            batch_size=config['batch_size'],
+            interval=config['interval'],
+            event_types=frozenset(config.get('event_types', ())),
+        )
+        for name, config in settings.EVENT_LANES.items()
+    }
+
+
+def get_lane(name: str) -> Lane:
+    return get_lanes()[name]
+
+
+@cache
+def _lanes_by_event_type() -> dict[str, str]:
+    return {event_type: lane.name for lane in get_lanes().values() for event_type in lane.event_types}
+
+
+def lane_for(event_type: str) -> str:
+    return _lanes_by_event_type().get(event_type, settings.EVENT_DEFAULT_LANE)
@@ -0,0 +1,58 @@
+from collections.abc import Callable, Iterator
+
+import pytest
+from django.utils import timezone
+
+from logs.lanes import _lanes_by_event_type, get_lanes, lane_for
+from logs.models import EventLogOutbox
+from logs.relay import OutboxRelay
+from logs.services import LogService
+from logs.sinks import MemorySink
+
+
+@pytest.fixture(autouse=True)
+def f_audit_lane(settings) -> Iterator[None]:  # noqa: ANN001
+    settings.EVENT_LANES = {
+        **settings.EVENT_LANES,
+        'audit': {'event_types': ['password_changed'], 'queue': 'event_log_audit', 'batch_size': 10, 'interval': 1.0},
+    }
+    get_lanes.cache_clear()
+    _lanes_by_event_type.cache_clear()
+    yield
+    get_lanes.cache_clear()
+    _lanes_by_event_type.cache_clear()
+
+
+def test_event_types_are_assigned_their_lane() -> None:
+    assert lane_for('password_changed') == 'audit'
+    assert lane_for('user_created') == 'default'
+
+
+@pytest.mark.django_db()
+def test_published_events_carry_their_lane() -> None:
+    event_data = {'timestamp': timezone.now(), 'env': 'Local', 'context': {}, 'version': 1}
+
+    with LogService.atomic():
+        LogService.log_event({**event_data, 'type': 'password_changed'})
+        LogService.log_event({**event_data, 'type': 'user_created'})
+        LogService.log_event({**event_data, 'type': 'user_created', 'lane': 'audit'})
+
+    assert sorted(EventLogOutbox.objects.values_list('event_type', 'lane')) == [
+        ('password_changed', 'audit'),
+        ('user_created', 'audit'),
+        ('user_created', 'default'),
+    ]
+
+
+@pytest.mark.django_db()
+def test_lane_relay_leaves_other_lanes_alone(f_outbox_event: Callable[..., EventLogOutbox]) -> None:
+    for _ in range(3):
+        f_outbox_event()
+    audit_event = f_outbox_event(event_type='password_changed', lane='audit')
+    sink = MemorySink()
+
+    relayed = OutboxRelay(sink=sink, lane='audit').drain()
+
+    assert relayed == sink.rows == 1
+    assert not EventLogOutbox.objects.filter(id=audit_event.id).exists()
+    assert EventLogOutbox.objects.filter(lane='default').count() == 3
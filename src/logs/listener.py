@@ -0,0 +1,71 @@
+import select
+import threading
+import time
+
+import structlog
+from django.db import DatabaseError, close_old_connections, connections
+
+from logs.notify import CHANNEL
+from logs.relay import OutboxRelay, SinkError
+
+logger = structlog.get_logger(__name__)
+
+
+class OutboxListener:
+    """
+    Relays the outbox as soon as new rows are committed.
+
+    A dedicated connection LISTENs for the insert trigger's notifications,
+    see logs.notify.
+    After the first one arrives the listener lingers briefly so that bursts
+    of commits are relayed as one batch, and when nothing arrives within the
+    poll interval it drains anyway, covering notifications missed while
+    reconnecting.
+    """
+
+    def __init__(self, relay: OutboxRelay, linger: float, poll_interval: float) -> None:
+        self._relay = relay
+        self._linger = linger
+        self._poll_interval = poll_interval
+
+    def run(self, stop: threading.Event | None = None) -> None:
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            try:
+                self._listen(stop)
+            except DatabaseError as e:
+                logger.error('outbox listener lost its connection', error=str(e))
+                close_old_connections()
+                stop.wait(self._poll_interval)
+
+    def _listen(self, stop: threading.Event) -> None:
+        listener = connections.create_connection('default')
+        try:
+            with listener.cursor() as cursor:
+                cursor.execute(f'LISTEN {CHANNEL}')
+            logger.info('listening for outbox inserts', channel=CHANNEL)
+
+            while not stop.is_set():
+                self._drain()
+                self._wait(listener.connection)
+        finally:
+            listener.close()
+
+    def _drain(self) -> None:
+        try:
+            relayed = self._relay.drain()
+        except SinkError as e:
+            # The circuit breaker keeps the next drains off ClickHouse while it is down.
+            logger.error('outbox relay failed', error=str(e))
+            return
+
+        if relayed:
+            logger.info('outbox drained', relayed=relayed)
+
+    def _wait(self, connection) -> None:  # noqa: ANN001
+        if not select.select([connection], [], [], self._poll_interval)[0]:
+            return
+
+        time.sleep(self._linger)
+        connection.poll()
+        connection.notifies.clear()
@@ -0,0 +1,191 @@
+import importlib
+import threading
+
+import pytest
+from django.core.management import call_command
+from django.db import OperationalError
+
+from logs import listener
+from logs.listener import OutboxListener
+from logs.models import EventLogOutbox
+from logs.notify import CHANNEL, DROP_NOTIFY_TRIGGER_SQL, NOTIFY_TRIGGER_SQL
+from logs.relay import SinkError
+
+
+class FakePgConnection:
+    def __init__(self) -> None:
+        self.notifies: list[str] = []
+        self.polls = 0
+
+    def poll(self) -> None:
+        self.polls += 1
+        self.notifies.append(CHANNEL)
+
+
+class FakeCursor:
+    def __init__(self, executed: list[str]) -> None:
+        self._executed = executed
+
+    def __enter__(self) -> 'FakeCursor':
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        pass
+
+    def execute(self, sql: str) -> None:
+        self._executed.append(sql)
+
+
+class FakeDatabaseWrapper:
+    def __init__(self) -> None:
+        self.connection = FakePgConnection()
+        self.executed: list[str] = []
+        self.closed = False
+
+    def cursor(self) -> FakeCursor:
+        return FakeCursor(self.executed)
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class FakeRelay:
+    """Relays one row per drain and stops the listener after ``drains`` drains."""
+
+    def __init__(self, stop: threading.Event, drains: int, error: Exception | None = None) -> None:
+        self.calls = 0
+        self._stop = stop
+        self._drains = drains
+        self._error = error
+
+    def drain(self) -> int:
+        self.calls += 1
+        if self.calls == self._drains:
+            self._stop.set()
+        if self._error is not None and self.calls == 1:
+            raise self._error
+        return 1
+
+
+@pytest.fixture()
+def f_database(monkeypatch: pytest.MonkeyPatch) -> FakeDatabaseWrapper:
+    database = FakeDatabaseWrapper()
+    monkeypatch.setattr(listener.connections, 'create_connection', lambda alias: database)  # noqa: ARG005
+    return database
+
+
+@pytest.fixture()
+def f_sleeps(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    sleeps = []
+    monkeypatch.setattr(listener.time, 'sleep', sleeps.append)
+    return sleeps
+
+
+def _notify(monkeypatch: pytest.MonkeyPatch, ready: bool) -> None:
+    def select(rlist: list, wlist: list, xlist: list, timeout: float) -> tuple[list, list, list]:  # noqa: ARG001
+        return rlist if ready else [], wlist, xlist
+
+    monkeypatch.setattr(listener.select, 'select', select)
+
+
+def _words(sql: str) -> list[str]:
+    return sql.split()
+
+
+def test_channel_is_the_outbox_table() -> None:
+    assert CHANNEL == EventLogOutbox._meta.db_table
+
+
+def test_trigger_matches_the_one_migration_0002_installs() -> None:
+    [operation] = importlib.import_module('logs.migrations.0002_outbox_notify_trigger').Migration.operations
+
+    assert (_words(operation.sql), _words(operation.reverse_sql)) == (
+        _words(NOTIFY_TRIGGER_SQL),
+        _words(DROP_NOTIFY_TRIGGER_SQL),
+    )
+
+
+def test_notification_is_lingered_on_then_drained(
+    monkeypatch: pytest.MonkeyPatch,
+    f_database: FakeDatabaseWrapper,
+    f_sleeps: list[float],
+) -> None:
+    _notify(monkeypatch, ready=True)
+    stop = threading.Event()
+    relay = FakeRelay(stop, drains=2)
+
+    OutboxListener(relay=relay, linger=0.05, poll_interval=5).run(stop)
+
+    assert f_database.executed == [f'LISTEN {CHANNEL}']
+    assert relay.calls == 2
+    assert f_sleeps == [0.05, 0.05]
+    assert f_database.connection.polls == 2
+    assert f_database.connection.notifies == []
+    assert f_database.closed
+
+
+def test_poll_interval_drains_without_lingering(
+    monkeypatch: pytest.MonkeyPatch,
+    f_database: FakeDatabaseWrapper,
+    f_sleeps: list[float],
+) -> None:
+    _notify(monkeypatch, ready=False)
+    stop = threading.Event()
+    relay = FakeRelay(stop, drains=3)
+
+    OutboxListener(relay=relay, linger=0.05, poll_interval=5).run(stop)
+
+    assert relay.calls == 3
+    assert f_sleeps == []
+    assert f_database.connection.polls == 0
+
+
+def test_failed_drain_keeps_listening(
+    monkeypatch: pytest.MonkeyPatch,
+    f_database: FakeDatabaseWrapper,  # noqa: ARG001
+    f_sleeps: list[float],  # noqa: ARG001
+) -> None:
+    _notify(monkeypatch, ready=True)
+    stop = threading.Event()
+    relay = FakeRelay(stop, drains=2, error=SinkError('clickhouse is down'))
+
+    OutboxListener(relay=relay, linger=0.05, poll_interval=5).run(stop)
+
+    assert relay.calls == 2
+
+
+def test_lost_connection_is_reopened(monkeypatch: pytest.MonkeyPatch, f_sleeps: list[float]) -> None:  # noqa: ARG001
+    _notify(monkeypatch, ready=True)
+    database = FakeDatabaseWrapper()
+    attempts = []
+
+    def connect(alias: str) -> FakeDatabaseWrapper:
+        attempts.append(alias)
+        if len(attempts) == 1:
+            raise OperationalError('server closed the connection unexpectedly')
+        return database
+
+    monkeypatch.setattr(listener.connections, 'create_connection', connect)
+    monkeypatch.setattr(listener, 'close_old_connections', lambda: None)
+    stop = threading.Event()
+    relay = FakeRelay(stop, drains=1)
+
+    OutboxListener(relay=relay, linger=0.05, poll_interval=0.01).run(stop)
+
+    assert attempts == ['default', 'default']
+    assert relay.calls == 1
+
+
+def test_command_runs_listener_for_lane(monkeypatch: pytest.MonkeyPatch) -> None:
+    listeners = []
+
+    def run(self: OutboxListener, stop: threading.Event | None = None) -> None:  # noqa: ARG001
+        listeners.append(self)
+
+    monkeypatch.setattr(OutboxListener, 'run', run)
+
+    call_command('run_outbox_relay', '--lane', 'default', '--linger', '0.2', '--metrics-port', '0')
+
+    [started] = listeners
+    assert started._relay._lane == 'default'
+    assert (started._linger, started._poll_interval) == (0.2, 5.0)
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandParser
+from django.db.models import QuerySet
+
+from logs import dead_letters
+from logs.models import EventLogDeadLetter
+
+
+class Command(BaseCommand):
+    help = 'Inspect outbox events the event sink rejected, or replay them into the outbox.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--event-type', help='Only dead letters of this event type.')
+        parser.add_argument('--id', action='append', dest='ids', default=[], help='Only this dead letter, repeatable.')
+        parser.add_argument('--limit', type=int, default=20, help='Recent dead letters to list.')
+        parser.add_argument(
+            '--replay',
+            action='store_true',
+            help='Move the selected dead letters back into the outbox; without a filter, all of them.',
+        )
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options) -> None:  # noqa: ANN002, ANN003, ARG002
+        selected = dead_letters.pending()
+        if options['event_type']:
+            selected = selected.filter(event_type=options['event_type'])
+        if options['ids']:
+            selected = selected.filter(id__in=options['ids'])
+
+        if options['replay']:
+            replayed = dead_letters.replay(selected, chunk_size=options['chunk_size'])
+            self.stdout.write(f'replayed: {replayed}')
+        else:
+            self._inspect(selected, options['limit'])
+
+    def _inspect(self, selected: QuerySet[EventLogDeadLetter], limit: int) -> None:
+        summary = dead_letters.summarize(selected)
+        if not summary:
+            self.stdout.write('no pending dead letters')
+            return
+
+        self.stdout.write(f'{"count":>7} {"attempts":>8}  {"event type":<24} error')
+        for group in summary:
+            error = _first_line(group['error'])
+            self.stdout.write(f'{group["count"]:>7} {group["max_attempts"]:>8}  {group["event_type"]:<24} {error}')
+
+        self.stdout.write('\nmost recent:')
+        for letter in selected.order_by('-last_failed_at')[:limit]:
+            self.stdout.write(
+                f'{letter.id}  {letter.event_type:<24} {letter.last_failed_at:%Y-%m-%d %H:%M:%S}  '
+                f'attempts={letter.attempts}',
+            )
+
+
+def _first_line(error: str, width: int = 100) -> str:
+    return error.splitlines()[0][:width] if error else ''
@@ -0,0 +1,125 @@
+import statistics
+import threading
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connection
+from django.utils import timezone
+
+from logs.relay import OutboxRelay
+from logs.services import LogService
+from logs.sinks import ClickHouseSink, MemorySink
+
+
+class QueryStats:
+    """Counts the queries of the threads it is installed in, via ``connection.execute_wrapper``."""
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):  # noqa: ANN001, ANN204
+        started_at = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            with self._lock:
+                self.queries += 1
+                self.seconds += time.perf_counter() - started_at
+
+
+class Command(BaseCommand):
+    help = (
+        'Publish synthetic events through the outbox while relay workers drain it, then report throughput, '
+        'publish-to-sink lag and database/CPU cost per event.'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--events', type=int, default=1_000_000)
+        parser.add_argument('--transaction-size', type=int, default=100, help='Events published per transaction.')
+        parser.add_argument('--relay-workers', type=int, default=1)
+        parser.add_argument('--sink', choices=['memory', 'clickhouse'], default='memory')
+        parser.add_argument('--sink-latency', type=float, default=0.0, help='Simulated insert latency in seconds.')
+
+    def handle(self, *args, **options) -> None:  # noqa: ANN002, ANN003, ARG002
+        sink = MemorySink(
+            latency=options['sink_latency'],
+            forward_to=ClickHouseSink() if options['sink'] == 'clickhouse' else None,
+        )
+        publish_stats, relay_stats = QueryStats(), QueryStats()
+        publishing = threading.Event()
+        publishing.set()
+        workers = [
+            threading.Thread(target=self._relay, args=(sink, relay_stats, publishing))
+            for _ in range(options['relay_workers'])
+        ]
+
+        started_at, cpu_started_at = time.perf_counter(), time.process_time()
+        for worker in workers:
+            worker.start()
+        with connection.execute_wrapper(publish_stats):
+            self._publish(options['events'], options['transaction_size'])
+        published_at = time.perf_counter()
+        publishing.clear()
+        for worker in workers:
+            worker.join()
+
+        self._report(
+            events=options['events'],
+            sink=sink,
+            publish_seconds=published_at - started_at,
+            total_seconds=time.perf_counter() - started_at,
+            cpu_seconds=time.process_time() - cpu_started_at,
+            stats={'publish': publish_stats, 'relay': relay_stats},
+        )
+
+    def _publish(self, events: int, transaction_size: int) -> None:
+        context = {'email': 'load@email.com', 'first_name': 'Load', 'last_name': 'Test'}
+        for start in range(0, events, transaction_size):
+            with LogService.atomic():
+                for _ in range(min(transaction_size, events - start)):
+                    LogService.log_event({
+                        'id': uuid.uuid4(),
+                        'type': 'load_generated',
+                        'timestamp': timezone.now(),
+                        'env': 'load',
+                        'context': context,
+                        'version': 1,
+                    })
+
+    def _relay(self, sink: MemorySink, stats: QueryStats, publishing: threading.Event) -> None:
+        relay = OutboxRelay(sink=sink)
+        try:
+            with connection.execute_wrapper(stats):
+                while relay.drain(time_budget=1.0) or publishing.is_set():
+                    time.sleep(0.01)
+        finally:
+            connection.close()
+
+    def _report(
+        self,
+        events: int,
+        sink: MemorySink,
+        publish_seconds: float,
+        total_seconds: float,
+        cpu_seconds: float,
+        stats: dict[str, QueryStats],
+    ) -> None:
+        lags = sorted(sink.lags) or [0.0]
+        percentiles = statistics.quantiles(lags, n=100) if len(lags) > 1 else lags * 99
+
+        self.stdout.write(f'events published      {events:>14,}')
+        self.stdout.write(f'events relayed        {sink.rows:>14,} in {sink.batches:,} batches')
+        self.stdout.write(f'publish throughput    {events / publish_seconds:>14,.0f} events/s')
+        self.stdout.write(f'end-to-end throughput {sink.rows / total_seconds:>14,.0f} events/s')
+        self.stdout.write(
+            f'lag p50 / p99 / max   {percentiles[49]:>10.3f} s / {percentiles[98]:.3f} s / {lags[-1]:.3f} s',
+        )
+        self.stdout.write(f'cpu per event         {cpu_seconds / events * 1_000_000:>14.1f} us')
+        for name, stat in stats.items():
+            self.stdout.write(
+                f'{name + " db per event":<21} {stat.queries / events:>14.4f} queries, '
+                f'{stat.seconds / events * 1_000_000:.1f} us',
+            )
@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from core.clickhouse_migrations import ClickHouseMigrator
+from core.clickhouse_pool import create_client
+
+
+class Command(BaseCommand):
+    help = 'Apply pending ClickHouse event log migrations from core/clickhouse_migrations.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('target', nargs='?', help='Migrate up to and including this version, e.g. 0002.')
+        parser.add_argument('--list', action='store_true', help='Show every migration and whether it is applied.')
+        parser.add_argument(
+            '--timeout',
+            type=int,
+            default=settings.CLICKHOUSE_MIGRATION_TIMEOUT,
+            help='Seconds a single migration statement may run, e.g. copying event_log into a new layout.',
+        )
+
+    def handle(self, *args, **options) -> None:  # noqa: ANN002, ANN003, ARG002
+        # A client of its own: the pooled ones time out long before a table copy is done.
+        client = create_client(send_receive_timeout=options['timeout'])
+        try:
+            migrator = ClickHouseMigrator(client)
+            if options['list']:
+                applied = migrator.applied()
+                for migration in migrator.migrations():
+                    self.stdout.write(f'[{"X" if migration.version in applied else " "}] {migration.path.stem}')
+                return
+
+            migrated = migrator.migrate(options['target'])
+        finally:
+            client.close()
+
+        self.stdout.write(f'applied: {", ".join(migration.path.stem for migration in migrated) or "-"}')
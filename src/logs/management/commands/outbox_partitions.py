@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from logs.partitions import convert_to_partitioned, create_partitions, drop_relayed_partitions
+
+
+class Command(BaseCommand):
+    help = 'Create upcoming outbox partitions and drop the ones that are fully relayed.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--convert',
+            action='store_true',
+            help='Turn the plain outbox table into a partitioned one first (run once, during a quiet period).',
+        )
+        parser.add_argument('--days-ahead', type=int, default=None)
+
+    def handle(self, *args, **options) -> None:  # noqa: ANN002, ANN003, ARG002
+        if not settings.EVENT_OUTBOX_PARTITIONED:
+            raise CommandError('Set EVENT_OUTBOX_PARTITIONED=true before managing outbox partitions.')
+
+        if options['convert']:
+            convert_to_partitioned()
+
+        created = create_partitions(days_ahead=options['days_ahead'])
+        dropped = drop_relayed_partitions()
+
+        self.stdout.write(f'created: {", ".join(created) or "-"}')
+        self.stdout.write(f'dropped: {", ".join(dropped) or "-"}')
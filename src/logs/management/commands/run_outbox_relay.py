@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+from prometheus_client import start_http_server
+
+from core.metrics import exposition_registry
+from core.sentry import init_sentry
+from logs.listener import OutboxListener
+from logs.relay import OutboxRelay
+
+
+class Command(BaseCommand):
+    help = 'Relay outbox events to ClickHouse as soon as they are committed, using Postgres LISTEN/NOTIFY.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--linger',
+            type=float,
+            default=settings.EVENT_RELAY_LINGER,
+            help='Seconds to wait after a notification so that a burst of commits is relayed as one batch.',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=settings.EVENT_RELAY_POLL_INTERVAL,
+            help='Seconds after which the outbox is drained even without a notification.',
+        )
+        parser.add_argument(
+            '--lane',
+            choices=sorted(settings.EVENT_LANES),
+            help='Relay only this lane of the outbox. By default every lane is relayed.',
+        )
+        parser.add_argument(
+            '--metrics-port',
+            type=int,
+            default=settings.METRICS_PORT,
+            help='Port to serve Prometheus metrics on, 0 disables the exporter.',
+        )
+
+    def handle(self, *args, **options) -> None:  # noqa: ANN002, ANN003, ARG002
+        init_sentry()
+        if options['metrics_port']:
+            start_http_server(options['metrics_port'], registry=exposition_registry())
+
+        OutboxListener(
+            relay=OutboxRelay(lane=options['lane']),
+            linger=options['linger'],
+            poll_interval=options['poll_interval'],
+        ).run()
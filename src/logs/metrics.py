@@ -0,0 +1,104 @@
+import threading
+import time
+from collections.abc import Iterator
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.models import Count, Min
+from django.utils import timezone
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import GaugeMetricFamily, Metric
+from prometheus_client.registry import Collector
+
+from core.metrics import LATENCY_BUCKETS, register_collector
+from logs.lanes import get_lanes
+from logs.models import EventLogOutbox
+
+RELAY_PHASE_SECONDS = Histogram(
+    'event_relay_phase_seconds',
+    'Time spent per relay batch in each phase: claim, serialize, insert and complete.',
+    ['phase'],
+    buckets=LATENCY_BUCKETS,
+)
+RELAY_BATCH_ROWS = Histogram(
+    'event_relay_batch_rows',
+    'Rows per relayed batch.',
+    buckets=(1, 10, 100, 500, 1000, 5000, 10_000, 50_000, 100_000),
+)
+RELAY_ROWS = Counter('event_relay_rows_total', 'Outbox rows relayed to the event sink.')
+RELAY_BYTES = Counter('event_relay_bytes_total', 'Serialized event context bytes relayed to the event sink.')
+RELAY_FAILURES = Counter('event_relay_failures_total', 'Relay runs that failed.')
+RELAY_RETRIES = Counter(
+    'event_relay_retries_total',
+    'Batches retried against ClickHouse after an outage, sent as half-open circuit probes.',
+)
+RELAY_DEAD_LETTERS = Counter(
+    'event_relay_dead_letters_total',
+    'Outbox rows the event sink rejected, moved to the dead-letter table.',
+)
+RELAY_SKIPPED = Counter('event_relay_skipped_total', 'Relay runs skipped because the ClickHouse circuit was open.')
+RELAY_TARGET_BATCH_SIZE = Gauge(
+    'event_relay_target_batch_size',
+    'Batch size the adaptive sizer will request next.',
+    multiprocess_mode='liveall',
+)
+
+
+class OutboxCollector(Collector):
+    """
+    Outbox depth and the age of the oldest unrelayed event per lane.
+
+    The backlog is a GROUP BY over the outbox, so scrapes within
+    ``METRICS_OUTBOX_CACHE_TTL`` seconds of the last read reuse it. Ages are
+    still measured at scrape time.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._backlog: dict[str, dict] = {}
+        self._read_at: float | None = None
+
+    def describe(self) -> Iterator[Metric]:
+        # Keeps registration from querying the database before it is ready.
+        return iter(self._families())
+
+    def collect(self) -> Iterator[Metric]:
+        try:
+            backlog = self._cached_backlog()
+        except DatabaseError:
+            return
+
+        now = timezone.now()
+        depth, oldest_age = self._families()
+        for lane in get_lanes().keys() | backlog.keys():
+            row = backlog.get(lane, {'depth': 0, 'oldest': None})
+            depth.add_metric([lane], row['depth'])
+            oldest_age.add_metric([lane], (now - row['oldest']).total_seconds() if row['oldest'] else 0.0)
+        yield depth
+        yield oldest_age
+
+    def _cached_backlog(self) -> dict[str, dict]:
+        with self._lock:
+            now = time.monotonic()
+            if self._read_at is None or now - self._read_at >= settings.METRICS_OUTBOX_CACHE_TTL:
+                self._backlog = {
+                    row['lane']: row
+                    for row in EventLogOutbox.objects.filter(processed=False)
+                    .values('lane')
+                    .annotate(depth=Count('id'), oldest=Min('created_at'))
+                }
+                self._read_at = now
+            return self._backlog
+
+    def _families(self) -> tuple[GaugeMetricFamily, GaugeMetricFamily]:
+        return (
+            GaugeMetricFamily('event_outbox_depth', 'Events waiting in the outbox to be relayed.', labels=['lane']),
+            GaugeMetricFamily(
+                'event_outbox_oldest_age_seconds',
+                'Age of the oldest event waiting in the outbox, zero when it is empty.',
+                labels=['lane'],
+            ),
+        )
+
+
+register_collector(OutboxCollector())
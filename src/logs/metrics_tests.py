@@ -0,0 +1,63 @@
+from collections.abc import Callable
+
+import pytest
+from django.test import Client
+from prometheus_client import REGISTRY
+
+from logs.metrics import OutboxCollector
+from logs.models import EventLogOutbox
+from logs.relay import OutboxRelay
+from logs.sinks import MemorySink
+
+
+@pytest.fixture(autouse=True)
+def _uncached_backlog(settings) -> None:  # noqa: ANN001
+    settings.METRICS_OUTBOX_CACHE_TTL = 0
+
+
+@pytest.mark.django_db()
+def test_metrics_endpoint_reports_outbox_backlog(
+    client: Client,
+    f_outbox_event: Callable[..., EventLogOutbox],
+) -> None:
+    for _ in range(3):
+        f_outbox_event()
+
+    response = client.get('/metrics')
+
+    assert response.status_code == 200
+    assert 'event_outbox_depth{lane="default"} 3.0' in response.content.decode()
+    assert 'event_outbox_oldest_age_seconds' in response.content.decode()
+
+
+@pytest.mark.django_db()
+def test_relay_records_rows_and_phase_timings(f_outbox_event: Callable[..., EventLogOutbox]) -> None:
+    for _ in range(3):
+        f_outbox_event()
+    rows_before = REGISTRY.get_sample_value('event_relay_rows_total') or 0.0
+
+    OutboxRelay(sink=MemorySink()).drain()
+
+    assert REGISTRY.get_sample_value('event_relay_rows_total') == rows_before + 3
+    for phase in ('claim', 'serialize', 'insert', 'complete'):
+        assert REGISTRY.get_sample_value('event_relay_phase_seconds_count', {'phase': phase})
+    assert REGISTRY.get_sample_value('event_outbox_depth', {'lane': 'default'}) == 0
+
+
+@pytest.mark.django_db()
+def test_backlog_is_read_once_per_cache_ttl(
+    settings,  # noqa: ANN001
+    django_assert_num_queries: Callable,
+    f_outbox_event: Callable[..., EventLogOutbox],
+) -> None:
+    settings.METRICS_OUTBOX_CACHE_TTL = 60
+    collector = OutboxCollector()
+    f_outbox_event()
+
+    with django_assert_num_queries(1):
+        list(collector.collect())
+    f_outbox_event()
+    with django_assert_num_queries(0):
+        depth, _ = collector.collect()
+
+    assert [sample.value for sample in depth.samples if sample.labels['lane'] == 'default'] == [1]
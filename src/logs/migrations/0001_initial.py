@@ -0,0 +1,33 @@
+# Generated by Django 5.1.2 on 2026-10-18 12:45
+
+import uuid
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventLogOutbox',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('event_type', models.CharField(max_length=255)),
+                ('event_date_time', models.DateTimeField()),
+                ('environment', models.CharField(max_length=50)),
+                ('event_context', models.JSONField()),
+                ('metadata_version', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('processed', models.BooleanField(default=False)),
+            ],
+            options={
+                'db_table': 'event_log_outbox',
+                'indexes': [models.Index(fields=['processed', 'created_at'], name='event_log_o_process_bf221b_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                CREATE OR REPLACE FUNCTION event_log_outbox_notify() RETURNS trigger AS $$
+                BEGIN
+                    PERFORM pg_notify('event_log_outbox', '');
+                    RETURN NULL;
+                END;
+                $$ LANGUAGE plpgsql;
+
+                CREATE TRIGGER event_log_outbox_notify
+                AFTER INSERT ON event_log_outbox
+                FOR EACH STATEMENT EXECUTE FUNCTION event_log_outbox_notify();
+            """,
+            reverse_sql="""
+                DROP TRIGGER IF EXISTS event_log_outbox_notify ON event_log_outbox;
+                DROP FUNCTION IF EXISTS event_log_outbox_notify();
+            """,
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.2 on 2026-10-18 12:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logs', '0002_outbox_notify_trigger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelayCircuit',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('state', models.CharField(
+                    choices=[('closed', 'Closed'), ('open', 'Open'), ('half_open', 'Half Open')],
+                    default='closed',
+                    max_length=10,
+                )),
+                ('failures', models.PositiveIntegerField(default=0)),
+                ('opened_at', models.DateTimeField(null=True)),
+                ('probe_started_at', models.DateTimeField(null=True)),
+                ('closed_at', models.DateTimeField(null=True)),
+            ],
+            options={
+                'db_table': 'event_log_relay_circuit',
+            },
+        ),
+    ]
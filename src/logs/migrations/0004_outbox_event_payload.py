@@ -0,0 +1,28 @@
+# Generated by Django 5.1.2 on 2026-10-18 13:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logs', '0003_relay_circuit'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventlogoutbox',
+            name='event_payload',
+            field=models.BinaryField(null=True),
+        ),
+        migrations.AddField(
+            model_name='eventlogoutbox',
+            name='payload_encoding',
+            field=models.CharField(blank=True, choices=[('json', 'Json'), ('zstd', 'Zstd')], default='', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='eventlogoutbox',
+            name='event_context',
+            field=models.JSONField(null=True),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.1.2 on 2026-10-18 13:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logs', '0004_outbox_event_payload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventlogoutbox',
+            name='lane',
+            field=models.CharField(default='default', max_length=32),
+        ),
+        migrations.AddIndex(
+            model_name='eventlogoutbox',
+            index=models.Index(
+                condition=models.Q(('processed', False)),
+                fields=['lane', 'created_at'],
+                name='event_log_outbox_lane_idx',
+            ),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.2 on 2026-10-18 13:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logs', '0005_outbox_lane'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventLogDeadLetter',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('event_type', models.CharField(max_length=255)),
+                ('event_date_time', models.DateTimeField()),
+                ('environment', models.CharField(max_length=50)),
+                ('event_context', models.JSONField(null=True)),
+                ('event_payload', models.BinaryField(null=True)),
+                ('payload_encoding', models.CharField(
+                    blank=True,
+                    choices=[('json', 'Json'), ('zstd', 'Zstd')],
+                    default='',
+                    max_length=10,
+                )),
+                ('metadata_version', models.PositiveIntegerField()),
+                ('lane', models.CharField(default='default', max_length=32)),
+                ('error', models.TextField()),
+                ('attempts', models.PositiveIntegerField(default=1)),
+                ('first_failed_at', models.DateTimeField(auto_now_add=True)),
+                ('last_failed_at', models.DateTimeField(auto_now=True)),
+                ('replayed_at', models.DateTimeField(null=True)),
+            ],
+            options={
+                'db_table': 'event_log_dead_letter',
+                'indexes': [
+                    models.Index(fields=['event_type', 'last_failed_at'], name='event_log_dead_letter_type_idx'),
+                ],
+            },
+        ),
+    ]
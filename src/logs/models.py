@@ -3,23 +3,79 @@ from django.db import models
 # Create your models here.
 import uuid
 from django.db import models
+from django.db.models import Q
 
 
 
 
 
 class EventLogOutbox(models.Model):
+    class PayloadEncoding(models.TextChoices):
+        JSON = 'json'
+        ZSTD = 'zstd'
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     event_type = models.CharField(max_length=255)
     event_date_time = models.DateTimeField()
     environment = models.CharField(max_length=50)
-    event_context = models.JSONField()
+    # Rows keep their context either as jsonb here or pre-serialized in event_payload, see logs.payloads.
+    event_context = models.JSONField(null=True)
+    event_payload = models.BinaryField(null=True)
+    payload_encoding = models.CharField(max_length=10, choices=PayloadEncoding.choices, blank=True, default='')
     metadata_version = models.PositiveIntegerField()
+    lane = models.CharField(max_length=32, default='default')
     created_at = models.DateTimeField(auto_now_add=True)
     processed = models.BooleanField(default=False)
 
     class Meta:
         indexes = [
             models.Index(fields=['processed', 'created_at']),
+            models.Index(fields=['lane', 'created_at'], name='event_log_outbox_lane_idx', condition=Q(processed=False)),
         ]
         db_table = 'event_log_outbox'
+
+
+class RelayCircuit(models.Model):
+    """Circuit breaker state shared by every relay worker, one row per downstream."""
+
+    class State(models.TextChoices):
+        CLOSED = 'closed'
+        OPEN = 'open'
+        HALF_OPEN = 'half_open'
+
+    name = models.CharField(max_length=50, primary_key=True)
+    state = models.CharField(max_length=10, choices=State.choices, default=State.CLOSED)
+    failures = models.PositiveIntegerField(default=0)
+    opened_at = models.DateTimeField(null=True)
+    probe_started_at = models.DateTimeField(null=True)
+    closed_at = models.DateTimeField(null=True)
+
+    class Meta:
+        db_table = 'event_log_relay_circuit'
+
+
+class EventLogDeadLetter(models.Model):
+    """An outbox event the event sink rejected, kept with the error until it is replayed, see logs.dead_letters."""
+
+    id = models.UUIDField(primary_key=True, editable=False)
+    event_type = models.CharField(max_length=255)
+    event_date_time = models.DateTimeField()
+    environment = models.CharField(max_length=50)
+    event_context = models.JSONField(null=True)
+    event_payload = models.BinaryField(null=True)
+    payload_encoding = models.CharField(
+        max_length=10, choices=EventLogOutbox.PayloadEncoding.choices, blank=True, default='',
+    )
+    metadata_version = models.PositiveIntegerField()
+    lane = models.CharField(max_length=32, default='default')
+    error = models.TextField()
+    attempts = models.PositiveIntegerField(default=1)
+    first_failed_at = models.DateTimeField(auto_now_add=True)
+    last_failed_at = models.DateTimeField(auto_now=True)
+    replayed_at = models.DateTimeField(null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['event_type', 'last_failed_at'], name='event_log_dead_letter_type_idx'),
+        ]
+        db_table = 'event_log_dead_letter'
@@ -0,0 +1,28 @@
+"""
+The insert trigger behind ``logs.listener``: every statement that inserts
+into the outbox raises one notification on ``CHANNEL``.
+
+Migration 0002 installs it with its own frozen copy of this SQL, and
+``logs.partitions`` installs it again on the partitioned table from here. It
+is statement-level, so a ``bulk_create`` of a whole transaction raises one
+notification.
+"""
+CHANNEL = 'event_log_outbox'
+
+NOTIFY_TRIGGER_SQL = f"""
+CREATE OR REPLACE FUNCTION {CHANNEL}_notify() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('{CHANNEL}', '');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER {CHANNEL}_notify
+AFTER INSERT ON {CHANNEL}
+FOR EACH STATEMENT EXECUTE FUNCTION {CHANNEL}_notify();
+"""
+
+DROP_NOTIFY_TRIGGER_SQL = f"""
+DROP TRIGGER IF EXISTS {CHANNEL}_notify ON {CHANNEL};
+DROP FUNCTION IF EXISTS {CHANNEL}_notify();
+"""
@@ -0,0 +1,179 @@
+"""
+Daily range partitioning of the outbox table by ``created_at``.
+
+With ``EVENT_OUTBOX_PARTITIONED`` enabled the relay marks rows as processed
+instead of deleting them, and whole days are detached and dropped once every
+row in them has been relayed. Dropping a partition is a metadata operation,
+so the table never accumulates the dead tuples and index churn of row-level
+DELETEs. Rows that land in the DEFAULT partition, because their day had no
+partition yet, are deleted row by row once relayed, or moved into their
+day's partition when it is created.
+"""
+import datetime as dt
+
+import structlog
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.db.backends.utils import CursorWrapper
+from django.utils import timezone
+
+from logs.models import EventLogOutbox
+from logs.notify import NOTIFY_TRIGGER_SQL
+
+logger = structlog.get_logger(__name__)
+
+TABLE = EventLogOutbox._meta.db_table
+INDEX = EventLogOutbox._meta.indexes[0].name
+LANE_INDEX = EventLogOutbox._meta.indexes[1].name
+PARTITION_PREFIX = f'{TABLE}_p'
+PARTITION_DATE_FORMAT = '%Y%m%d'
+DEFAULT_PARTITION = f'{TABLE}_default'
+# How long a plain DETACH may wait for its lock on the outbox before it is left for the next run.
+DETACH_LOCK_TIMEOUT = '2s'
+
+
+def convert_to_partitioned() -> None:
+    """
+    Replace the plain outbox table with a partitioned one, keeping its rows.
+
+    Partitioned tables need the partition key in the primary key, so the
+    key becomes ``(id, created_at)``. Rows outside the pre-created daily
+    partitions land in a DEFAULT partition that is never dropped, see
+    ``drop_relayed_partitions``.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE')
+        cursor.execute(f'ALTER TABLE {TABLE} RENAME TO {TABLE}_legacy')
+        cursor.execute(f'ALTER INDEX {TABLE}_pkey RENAME TO {TABLE}_legacy_pkey')
+        cursor.execute(f'ALTER INDEX {INDEX} RENAME TO {INDEX}_legacy')
+        cursor.execute(f'ALTER INDEX {LANE_INDEX} RENAME TO {LANE_INDEX}_legacy')
+        cursor.execute(
+            f'CREATE TABLE {TABLE} (LIKE {TABLE}_legacy INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)',
+        )
+        cursor.execute(f'ALTER TABLE {TABLE} ADD PRIMARY KEY (id, created_at)')
+        cursor.execute(f'CREATE INDEX {INDEX} ON {TABLE} (processed, created_at)')
+        cursor.execute(f'CREATE INDEX {LANE_INDEX} ON {TABLE} (lane, created_at) WHERE NOT processed')
+        cursor.execute(f'CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {TABLE} DEFAULT')
+        cursor.execute(NOTIFY_TRIGGER_SQL)
+        cursor.execute(f'SELECT min(created_at) FROM {TABLE}_legacy')  # noqa: S608
+        oldest = cursor.fetchone()[0] or timezone.now()
+
+        create_partitions(start=timezone.localdate(oldest))
+
+        cursor.execute(f'INSERT INTO {TABLE} SELECT * FROM {TABLE}_legacy')  # noqa: S608
+        cursor.execute(f'DROP TABLE {TABLE}_legacy')
+
+    logger.info('outbox converted to a partitioned table')
+
+
+def create_partitions(start: dt.date | None = None, days_ahead: int | None = None) -> list[str]:
+    start = start or timezone.localdate()
+    days_ahead = settings.EVENT_OUTBOX_PARTITIONS_AHEAD if days_ahead is None else days_ahead
+    end = timezone.localdate() + dt.timedelta(days=days_ahead)
+    existing = set(_partitions())
+    created = []
+
+    day = start
+    while day <= end:
+        name = f'{PARTITION_PREFIX}{day.strftime(PARTITION_DATE_FORMAT)}'
+        if name not in existing and _create_partition(name, day):
+            created.append(name)
+        day += dt.timedelta(days=1)
+
+    if created:
+        logger.info('outbox partitions created', partitions=created)
+    return created
+
+
+def _create_partition(name: str, day: dt.date) -> bool:
+    bounds = [_day_start(day), _day_start(day + dt.timedelta(days=1))]
+    try:
+        with transaction.atomic(), connection.cursor() as cursor:
+            # Postgres refuses a partition whose rows already sit in the DEFAULT partition, so they move over with it.
+            cursor.execute(f'CREATE TEMPORARY TABLE {name}_moved (LIKE {TABLE}) ON COMMIT DROP')
+            cursor.execute(
+                f'WITH moved AS (DELETE FROM {DEFAULT_PARTITION} '  # noqa: S608
+                'WHERE created_at >= %s AND created_at < %s RETURNING *) '
+                f'INSERT INTO {name}_moved SELECT * FROM moved',
+                bounds,
+            )
+            cursor.execute(f'CREATE TABLE {name} PARTITION OF {TABLE} FOR VALUES FROM (%s) TO (%s)', bounds)
+            cursor.execute(f'INSERT INTO {TABLE} SELECT * FROM {name}_moved')  # noqa: S608
+    except DatabaseError as e:
+        logger.error('unable to create outbox partition', partition=name, error=str(e))
+        return False
+
+    return True
+
+
+def drop_relayed_partitions() -> list[str]:
+    """
+    Detach and drop past daily partitions that hold no unprocessed rows, and
+    delete the relayed rows of the DEFAULT partition, which is never dropped.
+    """
+    today = timezone.localdate()
+    past = [name for name, day in _partitions().items() if day < today]
+    dropped = [name for name in past if _drop_if_relayed(name)]
+    if dropped:
+        logger.info('relayed outbox partitions dropped', partitions=dropped)
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {DEFAULT_PARTITION} WHERE processed')  # noqa: S608
+        if cursor.rowcount:
+            logger.info('relayed outbox rows purged from the default partition', rows=cursor.rowcount)
+    return dropped
+
+
+def _drop_if_relayed(name: str) -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT EXISTS (SELECT 1 FROM {name} WHERE NOT processed)')  # noqa: S608
+        if cursor.fetchone()[0]:
+            return False
+
+        try:
+            _detach(cursor, name)
+        except DatabaseError as e:
+            logger.warning('unable to detach outbox partition', partition=name, error=str(e))
+            return False
+
+        cursor.execute(f'DROP TABLE {name}')
+    return True
+
+
+def _detach(cursor: CursorWrapper, name: str) -> None:
+    # CONCURRENTLY keeps inserts into the outbox flowing, but Postgres only allows it outside a transaction
+    # and without a DEFAULT partition. Otherwise the detach gives up after DETACH_LOCK_TIMEOUT, as the
+    # lock it waits for would hold up every insert queued behind it.
+    if not connection.in_atomic_block and not _has_default_partition(cursor):
+        cursor.execute(f'ALTER TABLE {TABLE} DETACH PARTITION {name} CONCURRENTLY')
+        return
+
+    with transaction.atomic():
+        cursor.execute(f"SET LOCAL lock_timeout = '{DETACH_LOCK_TIMEOUT}'")
+        cursor.execute(f'ALTER TABLE {TABLE} DETACH PARTITION {name}')
+
+
+def _has_default_partition(cursor: CursorWrapper) -> bool:
+    cursor.execute('SELECT partdefid <> 0 FROM pg_partitioned_table WHERE partrelid = %s::regclass', [TABLE])
+    return cursor.fetchone()[0]
+
+
+def _partitions() -> dict[str, dt.date]:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT child.relname FROM pg_inherits '
+            'JOIN pg_class parent ON parent.oid = pg_inherits.inhparent '
+            'JOIN pg_class child ON child.oid = pg_inherits.inhrelid '
+            'WHERE parent.relname = %s AND child.relname LIKE %s',
+            [TABLE, f'{PARTITION_PREFIX}%'],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    return {
+        name: dt.datetime.strptime(name.removeprefix(PARTITION_PREFIX), PARTITION_DATE_FORMAT).date()  # noqa: DTZ007
+        for name in sorted(names)
+    }
+
+
+def _day_start(day: dt.date) -> dt.datetime:
+    return timezone.make_aware(dt.datetime.combine(day, dt.time.min))
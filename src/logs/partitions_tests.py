@@ -0,0 +1,106 @@
+import datetime as dt
+from collections.abc import Callable
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.utils import timezone
+
+from logs.models import EventLogOutbox
+from logs.partitions import (
+    DEFAULT_PARTITION,
+    PARTITION_DATE_FORMAT,
+    PARTITION_PREFIX,
+    convert_to_partitioned,
+    create_partitions,
+    drop_relayed_partitions,
+)
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture()
+def f_partitioned(settings) -> None:  # noqa: ANN001
+    settings.EVENT_OUTBOX_PARTITIONED = True
+    convert_to_partitioned()
+
+
+@pytest.fixture()
+def f_event_on(f_outbox_event: Callable[..., EventLogOutbox]) -> Callable[..., EventLogOutbox]:
+    def create(day: dt.date, processed: bool = False) -> EventLogOutbox:
+        event = f_outbox_event(processed=processed)
+        noon = timezone.make_aware(dt.datetime.combine(day, dt.time(12)))
+        EventLogOutbox.objects.filter(id=event.id).update(created_at=noon)
+        return event
+
+    return create
+
+
+def _days_from_today(days: int) -> dt.date:
+    return timezone.localdate() + dt.timedelta(days=days)
+
+
+def _partition(day: dt.date) -> str:
+    return f'{PARTITION_PREFIX}{day.strftime(PARTITION_DATE_FORMAT)}'
+
+
+def _rows_in(table: str) -> int:
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT count(*) FROM {table}')  # noqa: S608
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.usefixtures('f_partitioned')
+def test_only_fully_relayed_partitions_are_dropped(f_event_on: Callable[..., EventLogOutbox]) -> None:
+    create_partitions(start=_days_from_today(-2))
+    f_event_on(_days_from_today(-2), processed=True)
+    pending = f_event_on(_days_from_today(-1))
+
+    dropped = drop_relayed_partitions()
+
+    assert dropped == [_partition(_days_from_today(-2))]
+    assert list(EventLogOutbox.objects.values_list('id', flat=True)) == [pending.id]
+
+
+@pytest.mark.usefixtures('f_partitioned')
+def test_relayed_rows_are_purged_from_the_default_partition(f_event_on: Callable[..., EventLogOutbox]) -> None:
+    f_event_on(_days_from_today(-30), processed=True)
+    pending = f_event_on(_days_from_today(-30))
+
+    drop_relayed_partitions()
+
+    assert list(EventLogOutbox.objects.values_list('id', flat=True)) == [pending.id]
+    assert _rows_in(DEFAULT_PARTITION) == 1
+
+
+@pytest.mark.usefixtures('f_partitioned')
+def test_new_partition_takes_over_its_rows_from_the_default_partition(
+    f_event_on: Callable[..., EventLogOutbox],
+) -> None:
+    day = _days_from_today(10)
+    event = f_event_on(day)
+    assert _rows_in(DEFAULT_PARTITION) == 1
+
+    created = create_partitions(days_ahead=10)
+
+    assert _partition(day) in created
+    assert _rows_in(DEFAULT_PARTITION) == 0
+    assert _rows_in(_partition(day)) == 1
+    assert EventLogOutbox.objects.get().id == event.id
+
+
+def test_command_requires_partitioned_outbox(settings) -> None:  # noqa: ANN001
+    settings.EVENT_OUTBOX_PARTITIONED = False
+
+    with pytest.raises(CommandError):
+        call_command('outbox_partitions')
+
+
+@pytest.mark.usefixtures('f_partitioned')
+def test_command_reports_created_and_dropped_partitions(capsys: pytest.CaptureFixture) -> None:
+    # Converting created the partitions up to EVENT_OUTBOX_PARTITIONS_AHEAD, three days by default.
+    call_command('outbox_partitions', days_ahead=5)
+
+    created, dropped = capsys.readouterr().out.splitlines()
+    assert created == f'created: {_partition(_days_from_today(4))}, {_partition(_days_from_today(5))}'
+    assert dropped == 'dropped: -'
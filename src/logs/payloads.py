@@ -0,0 +1,64 @@
+"""
+Pre-serialized event payloads for the outbox.
+
+With ``EVENT_OUTBOX_STORAGE = 'payload'`` an event's context is stored as
+the JSON bytes ClickHouse receives, in ``event_payload``, instead of as
+jsonb in ``event_context``. Postgres then neither parses nor re-renders it,
+and the relay hands the bytes to ClickHouse as they are. Payloads of at
+least ``EVENT_OUTBOX_COMPRESSION_THRESHOLD`` bytes are zstd-compressed,
+which cuts table, WAL and network volume for large contexts.
+"""
+import json
+import threading
+from typing import Protocol
+
+import zstandard
+from django.conf import settings
+
+from logs.models import EventLogOutbox
+
+_codecs = threading.local()
+
+
+class StoredContext(Protocol):
+    """An outbox row as a model instance or as the relay's lean ``OutboxRow``."""
+
+    event_context: dict | None
+    event_payload: bytes | memoryview | None
+    payload_encoding: str
+
+
+def encode_payload(context: dict | bytes) -> tuple[bytes, str]:
+    """The stored payload and its ``payload_encoding`` for an event context."""
+    payload = context if isinstance(context, bytes) else json.dumps(context).encode()
+    threshold = settings.EVENT_OUTBOX_COMPRESSION_THRESHOLD
+    if threshold and len(payload) >= threshold:
+        return _compressor().compress(payload), EventLogOutbox.PayloadEncoding.ZSTD
+    return payload, EventLogOutbox.PayloadEncoding.JSON
+
+
+def decode_payload(payload: bytes | memoryview, encoding: str) -> bytes:
+    """The JSON bytes of a stored payload."""
+    if encoding == EventLogOutbox.PayloadEncoding.ZSTD:
+        return _decompressor().decompress(payload)
+    return bytes(payload)
+
+
+def event_context_json(event: StoredContext) -> bytes | str:
+    """An outbox row's context as the JSON ClickHouse stores, whichever way the row keeps it."""
+    if event.payload_encoding:
+        return decode_payload(event.event_payload, event.payload_encoding)
+    return json.dumps(event.event_context)
+
+
+# zstd contexts are not thread-safe, so each thread keeps its own.
+def _compressor() -> zstandard.ZstdCompressor:
+    if not hasattr(_codecs, 'compressor'):
+        _codecs.compressor = zstandard.ZstdCompressor(level=settings.EVENT_OUTBOX_COMPRESSION_LEVEL)
+    return _codecs.compressor
+
+
+def _decompressor() -> zstandard.ZstdDecompressor:
+    if not hasattr(_codecs, 'decompressor'):
+        _codecs.decompressor = zstandard.ZstdDecompressor()
+    return _codecs.decompressor
@@ -0,0 +1,72 @@
+import json
+from collections.abc import Callable, Sequence
+from typing import Any
+
+import pytest
+from django.utils import timezone
+
+from logs.models import EventLogOutbox
+from logs.payloads import decode_payload, encode_payload, event_context_json
+from logs.relay import OutboxRelay
+from logs.services import LogService
+
+
+class CapturingSink:
+    def __init__(self) -> None:
+        self.contexts: list[bytes | str] = []
+
+    def insert(self, columns: dict[str, Sequence[Any]], dedup_token: str) -> None:  # noqa: ARG002
+        self.contexts.extend(columns['event_context'])
+
+
+def test_small_payloads_are_stored_as_json(settings) -> None:  # noqa: ANN001
+    settings.EVENT_OUTBOX_COMPRESSION_THRESHOLD = 4096
+
+    payload, encoding = encode_payload({'email': 'test@email.com'})
+
+    assert encoding == EventLogOutbox.PayloadEncoding.JSON
+    assert payload == b'{"email": "test@email.com"}'
+
+
+def test_large_payloads_are_compressed(settings) -> None:  # noqa: ANN001
+    settings.EVENT_OUTBOX_COMPRESSION_THRESHOLD = 64
+    context = json.dumps({'items': ['x' * 16] * 100}).encode()
+
+    payload, encoding = encode_payload(context)
+
+    assert encoding == EventLogOutbox.PayloadEncoding.ZSTD
+    assert len(payload) < len(context)
+    assert decode_payload(memoryview(payload), encoding) == context
+
+
+@pytest.mark.django_db()
+def test_relay_sends_payload_and_jsonb_rows_alike(
+    settings,  # noqa: ANN001
+    f_outbox_event: Callable[..., EventLogOutbox],
+) -> None:
+    settings.EVENT_OUTBOX_STORAGE = 'payload'
+    settings.EVENT_OUTBOX_COMPRESSION_THRESHOLD = 64
+    context = {'items': ['x' * 16] * 100}
+    f_outbox_event(event_context=context)
+    with LogService.atomic():
+        LogService.log_event(
+            {'type': 'user_created', 'timestamp': timezone.now(), 'env': 'Local', 'context': context, 'version': 1},
+        )
+    assert EventLogOutbox.objects.filter(payload_encoding=EventLogOutbox.PayloadEncoding.ZSTD).count() == 1
+    sink = CapturingSink()
+
+    OutboxRelay(sink=sink).drain()
+
+    assert [json.loads(row) for row in sink.contexts] == [context, context]
+
+
+@pytest.mark.django_db()
+def test_payload_rows_keep_no_jsonb(settings) -> None:  # noqa: ANN001
+    settings.EVENT_OUTBOX_STORAGE = 'payload'
+    event_data = {'type': 'user_created', 'timestamp': timezone.now(), 'env': 'Local', 'version': 1}
+
+    LogService.log_event({**event_data, 'context': b'{"email": "test@email.com"}'})
+
+    event = EventLogOutbox.objects.get()
+    assert event.event_context is None
+    assert event_context_json(event) == b'{"email": "test@email.com"}'
@@ -0,0 +1,376 @@
+import hashlib
+import time
+import uuid
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from functools import cache
+from typing import NamedTuple
+
+import structlog
+from django.conf import settings
+from django.db import transaction
+
+from core.metrics import timed, traced
+from logs.circuit import CircuitBreaker
+from logs.dead_letters import dead_letter
+from logs.lanes import get_lane
+from logs.metrics import (
+    RELAY_BATCH_ROWS,
+    RELAY_BYTES,
+    RELAY_PHASE_SECONDS,
+    RELAY_RETRIES,
+    RELAY_ROWS,
+    RELAY_SKIPPED,
+    RELAY_TARGET_BATCH_SIZE,
+)
+from logs.models import EventLogOutbox
+from logs.payloads import event_context_json
+from logs.sinks import EventSink, SinkUnavailableError, get_sink
+
+logger = structlog.get_logger(__name__)
+
+
+class SinkError(Exception):
+    """The event sink could not take a batch; the rows stay in the outbox."""
+
+
+class RejectedRowsError(Exception):
+    """The event sink refused a batch because of rows in it, see ``OutboxRelay._deliver``."""
+
+
+class BatchStats(NamedTuple):
+    rows: int
+    bytes: int
+    insert_seconds: float
+
+    def combined(self, other: 'BatchStats') -> 'BatchStats':
+        return BatchStats(self.rows + other.rows, self.bytes + other.bytes, self.insert_seconds + other.insert_seconds)
+
+
+class OutboxRow(NamedTuple):
+    """The outbox columns the relay needs, fetched as a plain tuple instead of a model instance."""
+
+    id: uuid.UUID
+    event_type: str
+    event_date_time: datetime
+    environment: str
+    event_context: dict | None
+    event_payload: bytes | memoryview | None
+    payload_encoding: str
+    metadata_version: int
+    lane: str
+
+
+class ChunkDelivery:
+    """What the sink made of one chunk so far: the rows it took and the rows it rejected."""
+
+    def __init__(self) -> None:
+        self.stats = BatchStats(rows=0, bytes=0, insert_seconds=0.0)
+        self.delivered: list[uuid.UUID] = []
+        self.rejected: list[tuple[OutboxRow, str]] = []
+
+
+class BatchSizer:
+    """
+    Picks the next relay batch size from what the previous batches showed.
+
+    Full batches mean there is a backlog, so the size doubles while ClickHouse
+    inserts stay under the target latency. Slow inserts shrink the size in
+    proportion to how far over target they were. The result is always kept
+    within the row limits and within the byte limit, using the running
+    average row size.
+    """
+
+    def __init__(
+        self,
+        initial_rows: int,
+        min_rows: int,
+        max_rows: int,
+        max_bytes: int,
+        target_insert_seconds: float,
+    ) -> None:
+        self._min_rows = min_rows
+        self._max_rows = max_rows
+        self._max_bytes = max_bytes
+        self._target_insert_seconds = target_insert_seconds
+        self._avg_row_bytes = 0.0
+        self.size = self._clamp(initial_rows)
+
+    @classmethod
+    def from_settings(cls, max_rows: int | None = None) -> 'BatchSizer':
+        max_rows = max_rows or settings.EVENT_RELAY_MAX_BATCH_SIZE
+        return cls(
+            initial_rows=min(settings.EVENT_PROCESSING_BATCH_SIZE, max_rows),
+            min_rows=min(settings.EVENT_RELAY_MIN_BATCH_SIZE, max_rows),
+            max_rows=max_rows,
+            max_bytes=settings.EVENT_RELAY_MAX_BATCH_BYTES,
+            target_insert_seconds=settings.EVENT_RELAY_TARGET_INSERT_SECONDS,
+        )
+
+    def observe(self, stats: BatchStats, requested_rows: int) -> None:
+        if not stats.rows:
+            return
+
+        row_bytes = stats.bytes / stats.rows
+        self._avg_row_bytes = row_bytes if not self._avg_row_bytes else 0.8 * self._avg_row_bytes + 0.2 * row_bytes
+
+        if stats.insert_seconds > self._target_insert_seconds:
+            self.size = self._clamp(int(self.size * max(0.5, self._target_insert_seconds / stats.insert_seconds)))
+        elif stats.rows >= requested_rows:
+            self.size = self._clamp(self.size * 2)
+        else:
+            self.size = self._clamp(self.size)
+
+    def ramped(self, factor: float) -> int:
+        return self._clamp(int(self.size * factor))
+
+    def _clamp(self, rows: int) -> int:
+        if self._avg_row_bytes:
+            rows = min(rows, int(self._max_bytes / self._avg_row_bytes))
+        return max(self._min_rows, min(rows, self._max_rows))
+
+
+def batch_dedup_token(event_ids: Iterable[uuid.UUID]) -> str:
+    """
+    The same token for the same set of events, whatever their order.
+
+    A batch replayed after a crash between the ClickHouse insert and the
+    outbox cleanup is claimed again as the same rows, so ClickHouse drops
+    the repeated insert instead of storing it twice.
+    """
+    digest = hashlib.sha256()
+    for event_id in sorted(event_ids):
+        digest.update(event_id.bytes)
+    return digest.hexdigest()
+
+
+@cache
+def get_batch_sizer(lane: str | None = None) -> BatchSizer:
+    """Process-wide sizer per lane, so what one beat tick learned carries over to the next."""
+    if lane is None:
+        return BatchSizer.from_settings()
+    return BatchSizer.from_settings(max_rows=get_lane(lane).batch_size)
+
+
+class OutboxRelay:
+    """
+    Moves events from the Postgres outbox to ClickHouse.
+
+    Rows are claimed with ``SELECT ... FOR UPDATE SKIP LOCKED`` in the same
+    transaction that deletes them, so any number of relay workers can drain
+    the outbox in parallel without picking up each other's rows. Draining
+    goes through a shared circuit breaker, so while ClickHouse is down the
+    workers leave the outbox alone instead of retrying into the outage.
+
+    A batch is claimed and relayed in chunks of ``EVENT_RELAY_CHUNK_SIZE``
+    rows, so a worker holds one chunk in memory however large the batch
+    grows. Every chunk is a separate ClickHouse insert with its own dedup
+    token, and its own transaction: when a chunk fails, the chunks before it
+    have already left the outbox, so they are not sent again under tokens
+    that a differently sized retry would not reproduce.
+
+    A chunk the sink rejects because of its rows, rather than because the
+    sink is unavailable, is bisected until the rows to blame are isolated.
+    Those move to the dead-letter table, see logs.dead_letters, and the rest
+    of the chunk is relayed. More than ``EVENT_RELAY_MAX_REJECTED_ROWS``
+    rejected rows in one chunk points at the sink rather than at the events,
+    so the batch fails instead, like it does when the sink becomes
+    unavailable halfway through a bisection. Either way the rows the sink
+    took by then leave the outbox and the rest of the chunk stays in it.
+
+    A relay created for a lane only claims that lane's rows, see logs.lanes.
+    """
+
+    def __init__(
+        self,
+        batch_size: int | None = None,
+        sizer: BatchSizer | None = None,
+        sink: EventSink | None = None,
+        breaker: CircuitBreaker | None = None,
+        chunk_size: int | None = None,
+        lane: str | None = None,
+    ) -> None:
+        self._lane = lane
+        self._batch_size = batch_size or settings.EVENT_PROCESSING_BATCH_SIZE
+        self._sizer = sizer or get_batch_sizer(lane)
+        self._sink = sink or get_sink()
+        self._breaker = breaker or CircuitBreaker.from_settings()
+        self._chunk_size = chunk_size or settings.EVENT_RELAY_CHUNK_SIZE
+        self._max_rejected_rows = settings.EVENT_RELAY_MAX_REJECTED_ROWS
+
+    def relay_batch(self) -> int:
+        return self._relay_batch(self._batch_size).rows
+
+    def drain(self, time_budget: float | None = None) -> int:
+        """
+        Relay batches until the outbox is empty or the time budget is spent.
+
+        A new batch is only started if the previous one would still fit into
+        the remaining budget, so a drain never runs past the worker's limits.
+        """
+        time_budget = settings.EVENT_RELAY_TIME_BUDGET if time_budget is None else time_budget
+        deadline = time.monotonic() + time_budget
+        relayed = 0
+
+        with traced('queue.process', 'event_relay.drain'):
+            while True:
+                admission = self._breaker.admit()
+                if not admission.allowed:
+                    RELAY_SKIPPED.inc()
+                    logger.info('clickhouse circuit open, relay skipped', circuit=self._breaker.name)
+                    return relayed
+
+                batch_size = self._sizer.ramped(admission.ramp)
+                started_at = time.monotonic()
+                stats = self._relay_guarded(batch_size, probe=admission.probe)
+                self._sizer.observe(stats, requested_rows=batch_size)
+                RELAY_TARGET_BATCH_SIZE.set(self._sizer.size)
+                relayed += stats.rows
+
+                now = time.monotonic()
+                if admission.probe or stats.rows < batch_size or now + (now - started_at) >= deadline:
+                    return relayed
+
+    def _relay_guarded(self, batch_size: int, probe: bool) -> BatchStats:
+        if probe:
+            RELAY_RETRIES.inc()
+        try:
+            stats = self._relay_batch(batch_size)
+        except SinkError:
+            # Recorded outside the chunk transaction, which has ended by now.
+            self._breaker.record_failure()
+            raise
+
+        if stats.rows or probe and self._sink_answers():
+            self._breaker.record_success()
+        return stats
+
+    def _sink_answers(self) -> bool:
+        """Ping the sink for a probe that found the outbox empty and had nothing to insert into it."""
+        try:
+            self._sink.ping()
+        except SinkUnavailableError as e:
+            self._breaker.record_failure()
+            raise SinkError(str(e)) from e
+        return True
+
+    def _relay_batch(self, batch_size: int) -> BatchStats:
+        stats = BatchStats(rows=0, bytes=0, insert_seconds=0.0)
+        claimed = 0
+        while claimed < batch_size:
+            limit = min(self._chunk_size, batch_size - claimed)
+            chunk_stats, chunk_rows = self._relay_chunk(limit)
+            stats = stats.combined(chunk_stats)
+            claimed += chunk_rows
+            if chunk_rows < limit:
+                break
+        if not stats.rows:
+            return stats
+
+        RELAY_BATCH_ROWS.observe(stats.rows)
+        logger.debug('outbox batch relayed', **stats._asdict())
+        return stats
+
+    def _relay_chunk(self, limit: int) -> tuple[BatchStats, int]:
+        """Claim, relay and complete up to ``limit`` rows in one transaction. Returns the stats and rows claimed."""
+        with transaction.atomic():
+            with timed(RELAY_PHASE_SECONDS, 'event_relay.claim', phase='claim'):
+                chunk = list(self._claim(limit))
+            delivery, error = ChunkDelivery(), None
+            try:
+                self._deliver(chunk, delivery)
+            except SinkError as e:
+                # Committing what the sink took keeps those rows from going out again under another dedup token.
+                error = e
+            with timed(RELAY_PHASE_SECONDS, 'event_relay.complete', phase='complete'):
+                self._settle(delivery, failed=error is not None)
+
+        RELAY_ROWS.inc(delivery.stats.rows)
+        RELAY_BYTES.inc(delivery.stats.bytes)
+        if error is not None:
+            raise error
+        return delivery.stats, len(chunk)
+
+    def _deliver(self, rows: list[OutboxRow], delivery: ChunkDelivery) -> None:
+        """Insert ``rows``; when the sink rejects them, retry each half until the rows to blame are found."""
+        if not rows:
+            return
+        try:
+            with timed(RELAY_PHASE_SECONDS, 'event_relay.serialize', phase='serialize'):
+                columns = self._serialize(rows)
+            with timed(RELAY_PHASE_SECONDS, 'event_relay.insert', phase='insert'):
+                stats = self._insert(columns)
+        except RejectedRowsError as e:
+            self._bisect(rows, str(e), delivery)
+        else:
+            delivery.stats = delivery.stats.combined(stats)
+            delivery.delivered.extend(columns['id'])
+
+    def _bisect(self, rows: list[OutboxRow], error: str, delivery: ChunkDelivery) -> None:
+        if len(rows) > 1:
+            middle = len(rows) // 2
+            self._deliver(rows[:middle], delivery)
+            self._deliver(rows[middle:], delivery)
+            return
+
+        delivery.rejected.append((rows[0], error))
+        if len(delivery.rejected) > self._max_rejected_rows:
+            raise SinkError(f'more than {self._max_rejected_rows} rows of one chunk rejected, last: {error}')
+
+    def _settle(self, delivery: ChunkDelivery, failed: bool) -> None:
+        """Complete the delivered rows, and unless the chunk failed, dead-letter and complete the rejected ones."""
+        completed = delivery.delivered
+        if delivery.rejected and not failed:
+            dead_letter([(row._asdict(), error) for row, error in delivery.rejected])
+            completed = [*completed, *(row.id for row, _ in delivery.rejected)]
+        self._complete(completed)
+
+    def _claim(self, batch_size: int | None = None) -> Iterator[OutboxRow]:
+        pending = EventLogOutbox.objects.filter(processed=False)
+        if self._lane is not None:
+            pending = pending.filter(lane=self._lane)
+        rows = (
+            pending
+            .select_for_update(skip_locked=True)
+            .order_by('created_at', 'id')
+            .values_list(*OutboxRow._fields)[:batch_size or self._batch_size]
+        )
+        return map(OutboxRow._make, rows)
+
+    def _complete(self, event_ids: list[uuid.UUID]) -> None:
+        relayed = EventLogOutbox.objects.filter(id__in=event_ids)
+        if settings.EVENT_OUTBOX_PARTITIONED:
+            # Relayed partitions are dropped as a whole by logs.partitions.
+            relayed.update(processed=True)
+        else:
+            relayed.delete()
+
+    def _serialize(self, events: list[OutboxRow]) -> dict[str, list]:
+        try:
+            contexts = [event_context_json(event) for event in events]
+        except Exception as e:
+            raise RejectedRowsError(f'unreadable event payload: {e}') from e
+
+        return {
+            'id': [event.id for event in events],
+            'event_type': [event.event_type for event in events],
+            'event_date_time': [event.event_date_time for event in events],
+            'environment': [event.environment for event in events],
+            'event_context': contexts,
+            'metadata_version': [event.metadata_version for event in events],
+        }
+
+    def _insert(self, columns: dict[str, list]) -> BatchStats:
+        started_at = time.monotonic()
+        try:
+            self._sink.insert(columns, dedup_token=batch_dedup_token(columns['id']))
+        except SinkUnavailableError as e:
+            raise SinkError(str(e)) from e
+        except Exception as e:
+            raise RejectedRowsError(str(e)) from e
+
+        return BatchStats(
+            rows=len(columns['id']),
+            bytes=sum(map(len, columns['event_context'])),
+            insert_seconds=time.monotonic() - started_at,
+        )
@@ -0,0 +1,169 @@
+import threading
+import uuid
+from collections.abc import Callable
+
+import pytest
+from django.db import connection, transaction
+from django.utils import timezone
+
+from logs.models import EventLogOutbox
+from logs.relay import BatchSizer, BatchStats, OutboxRelay, SinkError, batch_dedup_token
+from logs.sinks import MemorySink, SinkUnavailableError
+
+
+@pytest.fixture()
+def f_sizer() -> BatchSizer:
+    return BatchSizer(
+        initial_rows=1000, min_rows=100, max_rows=10_000, max_bytes=1_000_000, target_insert_seconds=1.0,
+    )
+
+
+def _observe_full_batch(sizer: BatchSizer, insert_seconds: float) -> None:
+    stats = BatchStats(rows=sizer.size, bytes=sizer.size, insert_seconds=insert_seconds)
+    sizer.observe(stats, requested_rows=sizer.size)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_claims_are_disjoint(f_outbox_event: Callable[..., EventLogOutbox]) -> None:
+    for _ in range(4):
+        f_outbox_event()
+    claimed, release = threading.Event(), threading.Event()
+    first_batch = []
+
+    def hold_claim() -> None:
+        with transaction.atomic():
+            first_batch.extend(OutboxRelay(batch_size=2)._claim())
+            claimed.set()
+            release.wait(timeout=5)
+        connection.close()
+
+    worker = threading.Thread(target=hold_claim)
+    worker.start()
+    claimed.wait(timeout=5)
+
+    with transaction.atomic():
+        second_batch = list(OutboxRelay(batch_size=2)._claim())
+
+    release.set()
+    worker.join()
+
+    assert len(first_batch) == len(second_batch) == 2
+    assert {event.id for event in first_batch}.isdisjoint({event.id for event in second_batch})
+
+
+def test_sizer_grows_while_batches_are_full_and_fast(f_sizer: BatchSizer) -> None:
+    f_sizer.observe(BatchStats(rows=1000, bytes=10_000, insert_seconds=0.1), requested_rows=1000)
+
+    assert f_sizer.size == 2000
+
+
+def test_sizer_keeps_size_when_outbox_runs_dry(f_sizer: BatchSizer) -> None:
+    f_sizer.observe(BatchStats(rows=10, bytes=100, insert_seconds=0.1), requested_rows=1000)
+
+    assert f_sizer.size == 1000
+
+
+def test_sizer_shrinks_on_slow_inserts(f_sizer: BatchSizer) -> None:
+    f_sizer.observe(BatchStats(rows=1000, bytes=10_000, insert_seconds=1.6), requested_rows=1000)
+
+    assert f_sizer.size == 625
+
+
+def test_sizer_respects_byte_limit(f_sizer: BatchSizer) -> None:
+    f_sizer.observe(BatchStats(rows=1000, bytes=500_000, insert_seconds=0.1), requested_rows=1000)
+
+    assert f_sizer.size == 2000
+    f_sizer.observe(BatchStats(rows=2000, bytes=1_000_000, insert_seconds=0.1), requested_rows=2000)
+
+    assert f_sizer.size == 2000
+
+
+def test_sizer_stays_within_row_limits(f_sizer: BatchSizer) -> None:
+    for _ in range(10):
+        _observe_full_batch(f_sizer, insert_seconds=0.1)
+
+    assert f_sizer.size == 10_000
+
+    for _ in range(10):
+        _observe_full_batch(f_sizer, insert_seconds=100)
+
+    assert f_sizer.size == 100
+
+
+@pytest.mark.django_db()
+def test_partitioned_outbox_marks_rows_instead_of_deleting(
+    f_outbox_event: Callable[..., EventLogOutbox],
+    settings,  # noqa: ANN001
+) -> None:
+    settings.EVENT_OUTBOX_PARTITIONED = True
+    event = f_outbox_event()
+
+    OutboxRelay()._complete([event.id])
+
+    event.refresh_from_db()
+    assert event.processed
+
+
+def test_dedup_token_depends_on_events_not_their_order() -> None:
+    event_ids = [uuid.uuid4() for _ in range(3)]
+
+    assert batch_dedup_token(event_ids) == batch_dedup_token(reversed(event_ids))
+    assert batch_dedup_token(event_ids) != batch_dedup_token(event_ids[:2])
+
+
+@pytest.mark.django_db()
+def test_drain_moves_outbox_to_sink(f_outbox_event: Callable[..., EventLogOutbox]) -> None:
+    for _ in range(5):
+        f_outbox_event()
+    sink = MemorySink()
+
+    relayed = OutboxRelay(sink=sink, sizer=BatchSizer(2, 2, 2, 1_000_000, 1.0)).drain()
+
+    assert relayed == sink.rows == 5
+    assert sink.batches == 3
+    assert not EventLogOutbox.objects.exists()
+
+
+@pytest.mark.django_db()
+def test_batch_is_relayed_in_chunks(f_outbox_event: Callable[..., EventLogOutbox]) -> None:
+    for _ in range(5):
+        f_outbox_event()
+    sink = MemorySink()
+
+    stats = OutboxRelay(sink=sink, chunk_size=2)._relay_batch(batch_size=5)
+
+    assert stats.rows == sink.rows == 5
+    assert sink.batches == 3
+    assert not EventLogOutbox.objects.exists()
+
+
+@pytest.mark.django_db()
+def test_chunks_relayed_before_a_failure_leave_the_outbox(f_outbox_event: Callable[..., EventLogOutbox]) -> None:
+    for _ in range(5):
+        f_outbox_event()
+    sink = MemorySink()
+    inserts = []
+
+    def insert_once(columns: dict, dedup_token: str) -> None:
+        if inserts:
+            raise SinkUnavailableError('clickhouse went away')
+        inserts.append(dedup_token)
+        MemorySink.insert(sink, columns, dedup_token)
+
+    sink.insert = insert_once
+
+    with pytest.raises(SinkError):
+        OutboxRelay(sink=sink, chunk_size=2)._relay_batch(batch_size=5)
+
+    assert sink.rows == 2
+    assert EventLogOutbox.objects.count() == 3
+
+
+def test_memory_sink_ignores_repeated_dedup_token() -> None:
+    sink = MemorySink()
+    columns = {'event_type': ['user_created'], 'event_date_time': [timezone.now()], 'event_context': ['{}']}
+
+    sink.insert(columns, 'batch-1')
+    sink.insert(columns, 'batch-1')
+
+    assert sink.rows == 1
@@ -1,22 +1,156 @@
+import contextvars
+import json
+from collections.abc import Callable, Generator
+from contextlib import contextmanager
+
 import structlog
+from django.conf import settings
 from django.db import transaction
+
+from .lanes import lane_for
 from .models import EventLogOutbox
+from .payloads import encode_payload
 
 logger = structlog.get_logger(__name__)
 
+# The savepoints open when an event was logged, outermost first.
+Savepoints = tuple[str | None, ...]
+
+
+class Buffer:
+    """Events logged inside a ``LogService.atomic`` block, keyed by the savepoints they were logged in."""
+
+    def __init__(self) -> None:
+        self.entries: list[tuple[Savepoints, EventLogOutbox]] = []
+        self.markers: dict[Savepoints, Callable[[], None]] = {}
+
+    def extend(self, other: 'Buffer') -> None:
+        self.entries.extend(other.entries)
+        self.markers.update(other.markers)
+
+
+_event_buffer: contextvars.ContextVar[Buffer | None] = contextvars.ContextVar('event_buffer', default=None)
+
+
 class LogService:
     @staticmethod
-    def log_event(event_data: dict):
+    def log_event(event_data: dict) -> None:
+        entry = LogService._build_entry(event_data)
+        if LogService._buffer(entry):
+            return
+
         try:
             with transaction.atomic():
-                EventLogOutbox.objects.create(
-                    event_type=event_data['type'],
-                    event_date_time=event_data['timestamp'],
-                    environment=event_data['env'],
-                    event_context=event_data['context'],
-                    metadata_version=event_data['version']
-                )
+                entry.save(force_insert=True)
                 logger.info("Event logged to outbox", event_id=event_data.get('id'))
         except Exception as e:
             logger.error("Failed to log event", error=str(e))
-            raise
\ No newline at end of file
+            raise
+
+    @staticmethod
+    async def alog_event(event_data: dict) -> None:
+        """
+        Async ``log_event`` for async views and use cases.
+
+        The event is written to the outbox with the async ORM, which in
+        Django 5.1 still runs the query on a worker thread. ``LogService.atomic``
+        is synchronous, so there is no buffer to join here; async code that
+        must not leave the event loop publishes through
+        ``core.async_event_log_client`` instead, without the outbox, the way
+        ``UseCase.aexecute`` does.
+        """
+        entry = LogService._build_entry(event_data)
+        try:
+            await entry.asave(force_insert=True)
+            logger.info("Event logged to outbox", event_id=event_data.get('id'))
+        except Exception as e:
+            logger.error("Failed to log event", error=str(e))
+            raise
+
+    @staticmethod
+    @contextmanager
+    def atomic() -> Generator[None]:
+        """
+        Open a ``transaction.atomic`` block that collects every event logged
+        inside it and writes them with one ``bulk_create`` right before the
+        block commits. If the block raises, the collected events are dropped
+        together with the rest of the transaction.
+
+        Nested blocks hand their events to the enclosing one on success, so
+        the outermost block always issues a single INSERT. Events logged in
+        a nested ``transaction.atomic`` block that rolls back are dropped
+        with it, even when the enclosing block goes on to commit.
+        """
+        parent = _event_buffer.get()
+        buffer = Buffer()
+        token = _event_buffer.set(buffer)
+        try:
+            with transaction.atomic():
+                yield
+                if parent is None:
+                    LogService._flush(buffer)
+        finally:
+            _event_buffer.reset(token)
+
+        if parent is not None:
+            parent.extend(buffer)
+
+    @staticmethod
+    def _buffer(entry: EventLogOutbox) -> bool:
+        """Add ``entry`` to the enclosing ``LogService.atomic`` block's buffer, if there is one."""
+        buffer = _event_buffer.get()
+        if buffer is None:
+            return False
+
+        savepoints = tuple(transaction.get_connection().savepoint_ids)
+        if savepoints not in buffer.markers:
+            # Django forgets the on_commit callbacks registered inside a savepoint that is rolled back,
+            # so one marker per savepoint tells _flush whether the events logged in it survived.
+            buffer.markers[savepoints] = marker = _savepoint_marker()
+            transaction.on_commit(marker)
+        buffer.entries.append((savepoints, entry))
+        return True
+
+    @staticmethod
+    def _flush(buffer: Buffer) -> None:
+        # Django has no public list of pending callbacks, so look for the markers in its entries, whatever their layout.
+        pending = {id(item) for registered in transaction.get_connection().run_on_commit for item in registered}
+        survived = {savepoints for savepoints, marker in buffer.markers.items() if id(marker) in pending}
+        entries = [entry for savepoints, entry in buffer.entries if savepoints in survived]
+        if not entries:
+            return
+
+        try:
+            EventLogOutbox.objects.bulk_create(entries)
+            logger.info("Events logged to outbox", count=len(entries))
+        except Exception as e:
+            logger.error("Failed to log events", error=str(e), count=len(entries))
+            raise
+
+    @staticmethod
+    def _build_entry(event_data: dict) -> EventLogOutbox:
+        """
+        The outbox row for an event. ``context`` is a dict, or the event's
+        JSON bytes when the caller has serialized it already. The lane comes
+        from the event type unless ``lane`` names one explicitly.
+        """
+        entry = EventLogOutbox(
+            event_type=event_data['type'],
+            event_date_time=event_data['timestamp'],
+            environment=event_data['env'],
+            metadata_version=event_data['version'],
+            lane=event_data.get('lane') or lane_for(event_data['type']),
+        )
+        context = event_data['context']
+        if settings.EVENT_OUTBOX_STORAGE == 'payload':
+            entry.event_payload, entry.payload_encoding = encode_payload(context)
+        else:
+            entry.event_context = json.loads(context) if isinstance(context, bytes) else context
+        return entry
+
+
+def _savepoint_marker() -> Callable[[], None]:
+    def marker() -> None:
+        """Registered with on_commit only to find out whether its savepoint is rolled back; nothing to do."""
+
+    return marker
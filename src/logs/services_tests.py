@@ -0,0 +1,108 @@
+from collections.abc import Callable
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from logs.models import EventLogOutbox
+from logs.services import LogService
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _event_data(**kwargs) -> dict:  # noqa: ANN003
+    return {
+        'type': 'user_created',
+        'timestamp': timezone.now(),
+        'env': 'Local',
+        'context': {'email': 'test@email.com'},
+        'version': 1,
+        **kwargs,
+    }
+
+
+def test_events_are_written_once_on_commit() -> None:
+    with CaptureQueriesContext(connection) as queries, LogService.atomic():
+        for _ in range(50):
+            LogService.log_event(_event_data())
+
+        assert EventLogOutbox.objects.count() == 0
+
+    inserts = [query for query in queries.captured_queries if query['sql'].startswith('INSERT')]
+    assert len(inserts) == 1
+    assert EventLogOutbox.objects.count() == 50
+
+
+def test_events_are_dropped_on_rollback() -> None:
+    with pytest.raises(RuntimeError), LogService.atomic():
+        LogService.log_event(_event_data())
+        raise RuntimeError
+
+    assert EventLogOutbox.objects.count() == 0
+
+
+def test_nested_block_hands_events_to_outer_block() -> None:
+    with LogService.atomic():
+        LogService.log_event(_event_data(type='outer'))
+
+        with LogService.atomic():
+            LogService.log_event(_event_data(type='committed'))
+
+        with pytest.raises(RuntimeError), LogService.atomic():
+            LogService.log_event(_event_data(type='rolled_back'))
+            raise RuntimeError
+
+    assert set(EventLogOutbox.objects.values_list('event_type', flat=True)) == {'outer', 'committed'}
+
+
+def test_events_of_a_rolled_back_savepoint_are_dropped() -> None:
+    with LogService.atomic():
+        LogService.log_event(_event_data(type='outer'))
+
+        with pytest.raises(RuntimeError), transaction.atomic():
+            LogService.log_event(_event_data(type='rolled_back'))
+            raise RuntimeError
+
+        with transaction.atomic():
+            LogService.log_event(_event_data(type='committed'))
+
+    assert set(EventLogOutbox.objects.values_list('event_type', flat=True)) == {'outer', 'committed'}
+
+
+def test_events_nested_in_a_rolled_back_savepoint_are_dropped() -> None:
+    with LogService.atomic():
+        with pytest.raises(RuntimeError), transaction.atomic():
+            with transaction.atomic():
+                LogService.log_event(_event_data(type='inner'))
+            LogService.log_event(_event_data(type='rolled_back'))
+            raise RuntimeError
+
+        LogService.log_event(_event_data(type='outer'))
+
+    assert list(EventLogOutbox.objects.values_list('event_type', flat=True)) == ['outer']
+
+
+def test_one_commit_callback_per_savepoint(django_capture_on_commit_callbacks: Callable) -> None:
+    with django_capture_on_commit_callbacks() as callbacks, LogService.atomic():
+        for _ in range(100):
+            LogService.log_event(_event_data())
+        with transaction.atomic():
+            for _ in range(100):
+                LogService.log_event(_event_data())
+
+    assert len(callbacks) == 2
+    assert EventLogOutbox.objects.count() == 200
+
+
+def test_event_outside_block_is_written_immediately() -> None:
+    LogService.log_event(_event_data())
+
+    assert EventLogOutbox.objects.count() == 1
+
+
+def test_async_event_is_written_immediately() -> None:
+    async_to_sync(LogService.alog_event)(_event_data(type='async'))
+
+    assert EventLogOutbox.objects.get().event_type == 'async'
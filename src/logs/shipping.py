@@ -0,0 +1,181 @@
+"""
+Ship selected application log records into the event pipeline.
+
+``LogShipper`` is a structlog processor: records at or above its level, from
+the chosen loggers, are copied into a bounded in-memory queue together with
+the contextvars bound at the call site (``UseCase.execute`` binds the use
+case and its request). A background thread writes the queue in batches as
+``app_log`` events, to the outbox or straight to the event sink. The calling
+thread never blocks: once the queue is half full records below ERROR are
+sampled, and records that do not fit are dropped and counted.
+
+The module is imported from ``core.settings``, so Django is only touched from
+the background thread.
+"""
+import datetime as dt
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from collections.abc import Iterable, MutableMapping
+from typing import Any
+
+from core.metrics import LOG_SHIPPING_RECORDS
+
+EVENT_TYPE = 'app_log'
+
+_LEVELS = logging.getLevelNamesMapping()
+
+Record = tuple[dt.datetime, dict[str, Any]]
+
+
+class LogShipper:
+    def __init__(
+        self,
+        level: str = 'WARNING',
+        loggers: Iterable[str] = (),
+        queue_size: int = 10_000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        sample_rate: float = 0.1,
+        target: str = 'outbox',
+    ) -> None:
+        self._level = _LEVELS[level.upper()]
+        self._loggers = tuple(loggers)
+        self._queue_size = queue_size
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._sample_rate = sample_rate
+        self._target = target
+        self._lock = threading.Lock()
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+
+    def __call__(
+        self,
+        logger: Any,  # noqa: ANN401, ARG002
+        method_name: str,
+        event_dict: MutableMapping[str, Any],
+    ) -> MutableMapping[str, Any]:
+        level = _LEVELS.get(str(event_dict.get('level', method_name)).upper(), logging.NOTSET)
+        if self._wants(level, event_dict.get('logger', '')):
+            self._enqueue(level, event_dict)
+        return event_dict
+
+    def flush(self) -> None:
+        """Ship whatever is queued right now, from the calling thread."""
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self._ship(batch)
+
+    def _wants(self, level: int, logger_name: str) -> bool:
+        # Records logged while shipping would otherwise feed themselves back into the queue.
+        if level < self._level or threading.current_thread() is self._thread:
+            return False
+        return not self._loggers or logger_name.startswith(self._loggers)
+
+    def _enqueue(self, level: int, event_dict: MutableMapping[str, Any]) -> None:
+        if level < logging.ERROR and self._under_pressure() and random.random() >= self._sample_rate:  # noqa: S311
+            LOG_SHIPPING_RECORDS.labels('sampled_out').inc()
+            return
+
+        try:
+            self._queue.put_nowait((dt.datetime.now(dt.UTC), dict(event_dict)))
+        except queue.Full:
+            LOG_SHIPPING_RECORDS.labels('dropped').inc()
+            return
+
+        if self._thread is None:
+            self._start()
+
+    def _under_pressure(self) -> bool:
+        return self._queue.qsize() * 2 >= self._queue_size
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='log-shipper', daemon=True)
+                self._thread.start()
+
+    def _reset(self) -> None:
+        self._queue: queue.Queue[Record] = queue.Queue(self._queue_size)
+        self._thread: threading.Thread | None = None
+
+    def _run(self) -> None:
+        while True:
+            self._ship(self._next_batch())
+
+    def _next_batch(self) -> list[Record]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self._flush_interval
+        while len(batch) < self._batch_size and (timeout := deadline - time.monotonic()) > 0:
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _ship(self, batch: list[Record]) -> None:
+        from django.db import connection
+
+        try:
+            self._write([_event_data(logged_at, event_dict) for logged_at, event_dict in batch])
+        except Exception:
+            # Losing log records is acceptable, taking the application down with them is not.
+            LOG_SHIPPING_RECORDS.labels('failed').inc(len(batch))
+            connection.close()
+            return
+
+        LOG_SHIPPING_RECORDS.labels('shipped').inc(len(batch))
+
+    def _write(self, events: list[dict[str, Any]]) -> None:
+        if self._target == 'outbox':
+            _write_to_outbox(events)
+        else:
+            _write_to_sink(events)
+
+
+def _event_data(logged_at: dt.datetime, event_dict: dict[str, Any]) -> dict[str, Any]:
+    from django.conf import settings
+
+    context = {key: value for key, value in event_dict.items() if not key.startswith('_')}
+    return {
+        'id': uuid.uuid4(),
+        'type': EVENT_TYPE,
+        'timestamp': logged_at,
+        'env': settings.ENVIRONMENT,
+        'context': json.dumps(context, default=str).encode(),
+        'version': 1,
+    }
+
+
+def _write_to_outbox(events: list[dict[str, Any]]) -> None:
+    from logs.services import LogService
+
+    with LogService.atomic():
+        for event in events:
+            LogService.log_event(event)
+
+
+def _write_to_sink(events: list[dict[str, Any]]) -> None:
+    from logs.relay import batch_dedup_token
+    from logs.sinks import get_sink
+
+    columns = {
+        'id': [event['id'] for event in events],
+        'event_type': [event['type'] for event in events],
+        'event_date_time': [event['timestamp'] for event in events],
+        'environment': [event['env'] for event in events],
+        'event_context': [event['context'] for event in events],
+        'metadata_version': [event['version'] for event in events],
+    }
+    get_sink().insert(columns, dedup_token=batch_dedup_token(columns['id']))
@@ -0,0 +1,48 @@
+import json
+
+import pytest
+import structlog
+
+from logs.models import EventLogOutbox
+from logs.payloads import event_context_json
+from logs.shipping import EVENT_TYPE, LogShipper
+
+
+@pytest.fixture()
+def f_shipper(monkeypatch: pytest.MonkeyPatch) -> LogShipper:
+    shipper = LogShipper(level='WARNING', loggers=['users'], queue_size=4, sample_rate=0.0)
+    # Tests ship with flush() instead of the background thread.
+    monkeypatch.setattr(shipper, '_start', lambda: None)
+    return shipper
+
+
+def _log(shipper: LogShipper, level: str, logger: str = 'users.use_cases', **event_dict) -> None:  # noqa: ANN003
+    shipper(None, level, {'event': 'something happened', 'logger': logger, 'level': level, **event_dict})
+
+
+@pytest.mark.django_db()
+def test_selected_records_are_shipped_with_bound_contextvars(f_shipper: LogShipper) -> None:
+    with structlog.contextvars.bound_contextvars(use_case='CreateUser'):
+        event_dict = structlog.contextvars.merge_contextvars(None, 'error', {'logger': 'users.use_cases'})
+    _log(f_shipper, 'error', **event_dict)
+    _log(f_shipper, 'info')
+    _log(f_shipper, 'error', logger='logs.relay')
+
+    f_shipper.flush()
+
+    event = EventLogOutbox.objects.get()
+    assert event.event_type == EVENT_TYPE
+    assert json.loads(event_context_json(event)) == {
+        'event': 'something happened', 'logger': 'users.use_cases', 'level': 'error', 'use_case': 'CreateUser',
+    }
+
+
+def test_records_are_sampled_then_dropped_under_pressure(f_shipper: LogShipper) -> None:
+    for _ in range(3):
+        _log(f_shipper, 'warning')
+    for _ in range(3):
+        _log(f_shipper, 'error')
+
+    queued = [f_shipper._queue.get_nowait()[1]['level'] for _ in range(f_shipper._queue.qsize())]
+
+    assert queued == ['warning', 'warning', 'error', 'error']
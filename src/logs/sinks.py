@@ -0,0 +1,122 @@
+import re
+import threading
+import time
+from array import array
+from collections.abc import Sequence
+from typing import Any, Protocol
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+# ClickHouse server errors about the rows themselves (parse, type and size errors). Anything
+# else the server answers with is treated as the sink being unavailable.
+REJECTED_ROWS_ERROR_CODES = frozenset({6, 26, 27, 38, 41, 53, 69, 70, 72, 117, 131})
+_ERROR_CODE = re.compile(r'Code: (\d+)')
+
+
+class SinkUnavailableError(Exception):
+    """The sink could not take the batch right now, whatever rows it holds."""
+
+
+class EventSink(Protocol):
+    """
+    Where the relay delivers outbox batches.
+
+    ``insert`` raises ``SinkUnavailableError`` when the sink itself is failing.
+    Any other exception means the batch was rejected, and the relay looks
+    for the rows to blame. ``ping`` raises ``SinkUnavailableError`` too, and
+    lets a circuit probe check the sink when there is nothing to insert.
+    """
+
+    def insert(self, columns: dict[str, Sequence[Any]], dedup_token: str) -> None:
+        ...
+
+    def ping(self) -> None:
+        ...
+
+
+class ClickHouseSink:
+    def insert(self, columns: dict[str, Sequence[Any]], dedup_token: str) -> None:
+        # Imported here so that workers and commands start without loading clickhouse_connect and pydantic.
+        from clickhouse_connect.driver.exceptions import DatabaseError, OperationalError
+
+        from core.clickhouse_pool import PoolTimeoutError, get_pool
+        from core.event_log_client import EventLogClient
+
+        try:
+            with get_pool().connection() as client:
+                EventLogClient(client).insert_columns(columns, dedup_token=dedup_token)
+        except (OperationalError, PoolTimeoutError) as e:
+            raise SinkUnavailableError(str(e)) from e
+        except DatabaseError as e:
+            if not _rejects_rows(e):
+                raise SinkUnavailableError(str(e)) from e
+            raise
+
+    def ping(self) -> None:
+        from clickhouse_connect.driver.exceptions import OperationalError
+
+        from core.clickhouse_pool import PoolTimeoutError, get_pool
+
+        try:
+            with get_pool().connection() as client:
+                healthy = client.ping()
+        except (OperationalError, PoolTimeoutError) as e:
+            raise SinkUnavailableError(str(e)) from e
+        if not healthy:
+            raise SinkUnavailableError('clickhouse did not answer the ping')
+
+
+def _rejects_rows(error: Exception) -> bool:
+    from clickhouse_connect.driver.exceptions import DataError, ProgrammingError
+
+    code = _ERROR_CODE.search(str(error))
+    return isinstance(error, DataError | ProgrammingError) or bool(code) and int(code[1]) in REJECTED_ROWS_ERROR_CODES
+
+
+class MemorySink:
+    """
+    In-process stand-in for ClickHouse, for benchmarks and offline runs.
+
+    It keeps counters and the publish-to-insert lag of every row rather than
+    the rows themselves, so it can absorb millions of events. Repeated dedup
+    tokens are ignored the way ClickHouse ignores them, and ``latency``
+    simulates the insert round trip. With ``forward_to`` it measures the
+    batches on their way to a real sink instead.
+    """
+
+    def __init__(self, latency: float = 0.0, forward_to: EventSink | None = None) -> None:
+        self.latency = latency
+        self.forward_to = forward_to
+        self.rows = 0
+        self.bytes = 0
+        self.batches = 0
+        self.lags = array('d')
+        self._tokens: set[str] = set()
+        self._lock = threading.Lock()
+
+    def insert(self, columns: dict[str, Sequence[Any]], dedup_token: str) -> None:
+        if self.forward_to:
+            self.forward_to.insert(columns, dedup_token)
+        elif self.latency:
+            time.sleep(self.latency)
+
+        now = timezone.now()
+        with self._lock:
+            if dedup_token in self._tokens:
+                return
+
+            self._tokens.add(dedup_token)
+            self.batches += 1
+            self.rows += len(columns['event_type'])
+            self.bytes += sum(map(len, columns['event_context']))
+            self.lags.extend((now - published_at).total_seconds() for published_at in columns['event_date_time'])
+
+    def ping(self) -> None:
+        if self.forward_to:
+            self.forward_to.ping()
+
+
+def get_sink() -> EventSink:
+    return import_string(settings.EVENT_LOG_SINK)()
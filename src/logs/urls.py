@@ -0,0 +1,10 @@
+from django.urls import path
+
+from logs import views
+
+app_name = 'logs'
+
+urlpatterns = [
+    path('events', views.events, name='events'),
+    path('events/export', views.export_events, name='export_events'),
+]
@@ -1,3 +1,140 @@
-from django.shortcuts import render
+"""
+Event log read API.
 
-# Create your views here.
+The ClickHouse client and the pydantic query models are imported when a view
+runs, not with this module: Django's system checks load every URLconf, and
+with it this module, in each ``manage.py`` command.
+"""
+import csv
+import io
+import json
+from collections.abc import Iterable, Iterator
+from typing import TYPE_CHECKING, Any
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import (
+    HttpRequest,
+    HttpResponse,
+    HttpResponseBadRequest,
+    JsonResponse,
+    QueryDict,
+    StreamingHttpResponse,
+)
+from django.views.decorators.http import require_GET
+
+if TYPE_CHECKING:
+    from core.event_log_query import EventLogQuery, EventLogRow
+
+EXPORT_CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+
+@staff_member_required
+@require_GET
+def events(request: HttpRequest) -> HttpResponse:
+    """One keyset page of events, with the cursor to pass as ``after`` for the next one."""
+    from core.clickhouse_pool import get_pool
+    from core.event_log_client import EventLogClient
+
+    # pydantic's ValidationError and a bad cursor's binascii.Error are both ValueErrors.
+    try:
+        query = _parse_query(request.GET)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+
+    limit = min(query.limit or settings.EVENT_LOG_PAGE_SIZE, settings.EVENT_LOG_PAGE_SIZE)
+    with get_pool().connection() as client:
+        rows = EventLogClient(client).fetch(query.model_copy(update={'limit': limit}))
+
+    return JsonResponse({
+        'events': [_as_record(row) for row in rows],
+        'next': rows[-1].cursor.encode() if len(rows) == limit else None,
+    })
+
+
+@staff_member_required
+@require_GET
+def export_events(request: HttpRequest) -> HttpResponse:
+    """Every matching event as NDJSON or CSV, streamed with constant memory."""
+    export_format = request.GET.get('format', 'ndjson')
+    if export_format not in EXPORT_CONTENT_TYPES:
+        return HttpResponseBadRequest(f'format must be one of {", ".join(EXPORT_CONTENT_TYPES)}')
+    try:
+        query = _parse_query(request.GET)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+
+    from core.event_log_client import stream_events
+
+    render = _render_csv if export_format == 'csv' else _render_ndjson
+    response = StreamingHttpResponse(
+        _chunked(render(stream_events(query))),
+        content_type=EXPORT_CONTENT_TYPES[export_format],
+    )
+    response['Content-Disposition'] = f'attachment; filename="events.{export_format}"'
+    return response
+
+
+def _parse_query(params: QueryDict) -> 'EventLogQuery':
+    from core.event_log_query import EventLogCursor, EventLogQuery
+
+    return EventLogQuery(
+        event_types=params.getlist('event_type'),
+        environment=params.get('environment'),
+        since=params.get('since'),
+        until=params.get('until'),
+        context={key.removeprefix('context.'): value for key, value in params.items() if key.startswith('context.')},
+        after=EventLogCursor.decode(params['after']) if params.get('after') else None,
+        limit=params.get('limit'),
+    )
+
+
+def _as_record(row: 'EventLogRow') -> dict[str, Any]:
+    return {
+        'id': str(row.id),
+        'event_type': row.event_type,
+        'event_date_time': row.event_date_time.isoformat(),
+        'environment': row.environment,
+        'event_context': json.loads(row.event_context),
+        'metadata_version': row.metadata_version,
+    }
+
+
+def _render_ndjson(rows: Iterable['EventLogRow']) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(_as_record(row)) + '\n'
+
+
+def _render_csv(rows: Iterable['EventLogRow']) -> Iterator[str]:
+    from core.event_log_query import EventLogRow
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EventLogRow._fields)
+    yield _take(buffer)
+    for row in rows:
+        writer.writerow(row._replace(event_date_time=row.event_date_time.isoformat()))
+        yield _take(buffer)
+
+
+def _take(buffer: io.StringIO) -> str:
+    value = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return value
+
+
+def _chunked(lines: Iterable[str]) -> Iterator[bytes]:
+    """Join rendered rows into chunks of about ``EXPORT_CHUNK_BYTES`` so each write to the client is worth it."""
+    chunk, size = [], 0
+    for line in lines:
+        chunk.append(line)
+        size += len(line)
+        if size >= EXPORT_CHUNK_BYTES:
+            yield ''.join(chunk).encode()
+            chunk, size = [], 0
+    yield ''.join(chunk).encode()
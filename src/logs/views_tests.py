@@ -0,0 +1,60 @@
+import json
+from collections.abc import Generator
+
+import pytest
+from clickhouse_connect.driver import Client
+from django.conf import settings
+from django.test import Client as HttpClient
+
+from core.event_log_client import EventLogClient
+from users.use_cases import UserCreated
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture()
+def f_event_log(f_ch_client: Client) -> Generator[list[UserCreated]]:
+    f_ch_client.query(f'TRUNCATE TABLE {settings.CLICKHOUSE_EVENT_LOG_TABLE_NAME}')
+    events = [UserCreated(email=f'test_{i}@email.com', first_name='Test', last_name='Testovich') for i in range(5)]
+    with EventLogClient.init() as event_log:
+        event_log.insert(events)
+    yield events
+
+
+def test_export_requires_staff(client: HttpClient, django_user_model: type) -> None:
+    client.force_login(django_user_model.objects.create_user(username='test'))
+
+    response = client.get('/logs/events/export')
+
+    assert response.status_code == 302
+
+
+@pytest.mark.parametrize('params', [{'since': 'yesterday'}, {'after': 'not-a-cursor'}, {'format': 'xml'}])
+def test_export_rejects_invalid_filters(admin_client: HttpClient, params: dict[str, str]) -> None:
+    response = admin_client.get('/logs/events/export', params)
+
+    assert response.status_code == 400
+
+
+@pytest.mark.usefixtures('f_event_log')
+def test_export_streams_every_page_as_ndjson(admin_client: HttpClient, settings) -> None:  # noqa: ANN001
+    settings.EVENT_LOG_QUERY_PAGE_SIZE = 2
+
+    response = admin_client.get('/logs/events/export', {'event_type': 'user_created'})
+    records = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+
+    assert response['Content-Type'] == 'application/x-ndjson'
+    assert sorted(record['event_context']['email'] for record in records) == [
+        f'test_{i}@email.com' for i in range(5)
+    ]
+
+
+@pytest.mark.usefixtures('f_event_log')
+def test_events_pages_with_cursor(admin_client: HttpClient) -> None:
+    first = admin_client.get('/logs/events', {'limit': 3}).json()
+    second = admin_client.get('/logs/events', {'limit': 3, 'after': first['next']}).json()
+
+    assert len(first['events']) == 3
+    assert len(second['events']) == 2
+    assert second['next'] is None
+    assert not {e['id'] for e in first['events']} & {e['id'] for e in second['events']}
@@ -1,3 +1,13 @@
 from .create_user import CreateUser, CreateUserRequest, CreateUserResponse, UserCreated
+from .create_users import CreatedUser, CreateUsers, CreateUsersRequest, CreateUsersResponse
 
-__all__ = ['CreateUser', 'CreateUserRequest', 'CreateUserResponse', 'UserCreated']
+__all__ = [
+    'CreateUser',
+    'CreateUserRequest',
+    'CreateUserResponse',
+    'CreatedUser',
+    'CreateUsers',
+    'CreateUsersRequest',
+    'CreateUsersResponse',
+    'UserCreated',
+]
@@ -3,7 +3,6 @@ from typing import Any
 import structlog
 
 from core.base_model import Model
-from core.event_log_client import EventLogClient
 from core.use_case import UseCase, UseCaseRequest, UseCaseResponse
 from users.models import User
 
@@ -47,21 +46,26 @@ class CreateUser(UseCase):
 
         if created:
             logger.info('user has been created')
-            self._log(user)
+            self._publish(UserCreated(email=user.email, first_name=user.first_name, last_name=user.last_name))
             return CreateUserResponse(result=user)
 
         logger.error('unable to create a new user')
         return CreateUserResponse(error='User with this email already exists')
 
-    def _log(self, user: User) -> None:
-        with EventLogClient.init() as client:
-            client.insert(
-                data=[
-                    UserCreated(
-                        email=user.email,
-                        first_name=user.first_name,
-                        last_name=user.last_name,
-                    ),
-                ],
-            )
+    async def _aexecute(self, request: CreateUserRequest) -> CreateUserResponse:
+        logger.info('creating a new user')
+
+        user, created = await User.objects.aget_or_create(
+            email=request.email,
+            defaults={
+                'first_name': request.first_name, 'last_name': request.last_name,
+            },
+        )
 
+        if created:
+            logger.info('user has been created')
+            await self._apublish(UserCreated(email=user.email, first_name=user.first_name, last_name=user.last_name))
+            return CreateUserResponse(result=user)
+
+        logger.error('unable to create a new user')
+        return CreateUserResponse(error='User with this email already exists')
@@ -1,11 +1,16 @@
+import json
 import uuid
 from collections.abc import Generator
 from unittest.mock import ANY
 
 import pytest
+from asgiref.sync import async_to_sync
 from clickhouse_connect.driver import Client
 from django.conf import settings
 
+from logs.models import EventLogOutbox
+from logs.payloads import event_context_json
+from logs.relay import OutboxRelay
 from users.use_cases import CreateUser, CreateUserRequest, UserCreated
 
 pytestmark = [pytest.mark.django_db]
@@ -45,6 +50,29 @@ def test_emails_are_unique(f_use_case: CreateUser) -> None:
     assert response.error == 'User with this email already exists'
 
 
+def test_event_is_published_to_the_outbox(f_use_case: CreateUser, f_ch_client: Client) -> None:
+    request = CreateUserRequest(email='test@email.com', first_name='Test', last_name='Testovich')
+
+    f_use_case.execute(request)
+
+    event = EventLogOutbox.objects.get()
+    assert event.event_type == 'user_created'
+    assert json.loads(event_context_json(event)) == {
+        'email': 'test@email.com', 'first_name': 'Test', 'last_name': 'Testovich',
+    }
+    assert f_ch_client.query('SELECT count() FROM default.event_log').result_rows == [(0,)]
+
+
+def test_no_event_is_published_for_existing_user(f_use_case: CreateUser) -> None:
+    request = CreateUserRequest(email='test@email.com', first_name='Test', last_name='Testovich')
+    f_use_case.execute(request)
+    EventLogOutbox.objects.all().delete()
+
+    f_use_case.execute(request)
+
+    assert not EventLogOutbox.objects.exists()
+
+
 def test_event_log_entry_published(
     f_use_case: CreateUser,
     f_ch_client: Client,
@@ -55,7 +83,11 @@ def test_event_log_entry_published(
     )
 
     f_use_case.execute(request)
-    log = f_ch_client.query("SELECT * FROM default.event_log WHERE event_type = 'user_created'")
+    OutboxRelay().drain()
+    log = f_ch_client.query(
+        'SELECT event_type, event_date_time, environment, event_context, metadata_version '
+        "FROM default.event_log WHERE event_type = 'user_created'",
+    )
 
     assert log.result_rows == [
         (
@@ -66,3 +98,19 @@ def test_event_log_entry_published(
             1,
         ),
     ]
+
+
+def test_async_use_case_publishes_straight_to_clickhouse(f_use_case: CreateUser, f_ch_client: Client) -> None:
+    email = f'test_{uuid.uuid4()}@email.com'
+    request = CreateUserRequest(email=email, first_name='Test', last_name='Testovich')
+
+    response = async_to_sync(f_use_case.aexecute)(request)
+    log = f_ch_client.query(
+        "SELECT event_type, event_context FROM default.event_log WHERE event_type = 'user_created'",
+    )
+
+    assert response.result.email == email
+    assert not EventLogOutbox.objects.exists()
+    assert log.result_rows == [
+        ('user_created', UserCreated(email=email, first_name='Test', last_name='Testovich').model_dump_json()),
+    ]
@@ -0,0 +1,108 @@
+from contextlib import AbstractContextManager, nullcontext
+from typing import Any
+
+import structlog
+from django.db import connection
+from pydantic import Field
+
+from core.base_model import Model
+from core.use_case import UseCase, UseCaseRequest, UseCaseResponse
+from logs.services import LogService
+from users.models import User
+from users.use_cases.create_user import CreateUserRequest, UserCreated
+
+logger = structlog.get_logger(__name__)
+
+CHUNK_SIZE = 1000
+
+# Every inserted user binds one parameter per column, and Postgres takes at most 65535 per statement.
+_INSERTED_FIELDS = [field for field in User._meta.local_concrete_fields if not field.primary_key]
+MAX_CHUNK_SIZE = 65_535 // len(_INSERTED_FIELDS)
+
+
+class CreateUsersRequest(UseCaseRequest):
+    users: list[CreateUserRequest]
+    chunk_size: int = Field(default=CHUNK_SIZE, gt=0, le=MAX_CHUNK_SIZE)
+
+
+class CreatedUser(Model):
+    email: str
+    created: bool
+    id: int | None = None
+
+
+class CreateUsersResponse(UseCaseResponse):
+    result: list[CreatedUser] = []
+    error: str = ''
+
+
+class CreateUsers(UseCase):
+    """
+    Create many users at once, e.g. for a partner import.
+
+    Every chunk is one ``INSERT ... ON CONFLICT (email) DO NOTHING RETURNING``
+    round trip in its own transaction, together with one outbox write for the
+    chunk's ``UserCreated`` events. Emails that already exist, in the table or
+    earlier in the same request, are reported as not created.
+    """
+
+    def _get_context_vars(self, request: CreateUsersRequest) -> dict[str, Any]:
+        return {
+            'use_case': self.__class__.__name__,
+            'users': len(request.users),
+        }
+
+    def _atomic(self) -> AbstractContextManager:
+        return nullcontext()
+
+    def _execute(self, request: CreateUsersRequest) -> CreateUsersResponse:
+        logger.info('creating users')
+
+        results = []
+        for start in range(0, len(request.users), request.chunk_size):
+            with LogService.atomic():
+                results.extend(self._create_chunk(request.users[start:start + request.chunk_size]))
+
+        created = sum(result.created for result in results)
+        logger.info('users have been created', created=created, duplicates=len(results) - created)
+        return CreateUsersResponse(result=results)
+
+    def _create_chunk(self, requests: list[CreateUserRequest]) -> list[CreatedUser]:
+        users = [
+            User(email=request.email, first_name=request.first_name, last_name=request.last_name)
+            for request in requests
+        ]
+        ids = _insert_ignoring_duplicates(users)
+
+        results = []
+        for user in users:
+            user.pk = ids.pop(user.email, None)
+            results.append(CreatedUser(email=user.email, created=user.pk is not None, id=user.pk))
+        self._publish(*(
+            UserCreated(email=user.email, first_name=user.first_name, last_name=user.last_name)
+            for user in users if user.pk is not None
+        ))
+        return results
+
+
+def _insert_ignoring_duplicates(users: list[User]) -> dict[str, int]:
+    """Insert ``users`` in one statement, skipping taken emails. Returns the ids of the inserted ones by email."""
+    meta = User._meta
+    fields = _INSERTED_FIELDS
+    quote = connection.ops.quote_name
+    row = f'({", ".join(["%s"] * len(fields))})'
+    sql = (
+        f'INSERT INTO {quote(meta.db_table)} ({", ".join(quote(field.column) for field in fields)}) '  # noqa: S608
+        f'VALUES {", ".join([row] * len(users))} '
+        f'ON CONFLICT ({quote(meta.get_field("email").column)}) DO NOTHING '
+        f'RETURNING {quote(meta.pk.column)}, {quote(meta.get_field("email").column)}'
+    )
+    params = [
+        field.get_db_prep_save(field.pre_save(user, add=True), connection)
+        for user in users
+        for field in fields
+    ]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return {email: user_id for user_id, email in cursor.fetchall()}
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from pydantic import ValidationError
+
+from logs.models import EventLogOutbox
+from logs.payloads import event_context_json
+from users.models import User
+from users.use_cases import CreatedUser, CreateUserRequest, CreateUsers, CreateUsersRequest
+from users.use_cases.create_users import MAX_CHUNK_SIZE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _request(*emails: str, chunk_size: int = 1000) -> CreateUsersRequest:
+    return CreateUsersRequest(
+        users=[CreateUserRequest(email=email, first_name='Test', last_name='Testovich') for email in emails],
+        chunk_size=chunk_size,
+    )
+
+
+def test_users_are_created_and_duplicates_reported() -> None:
+    User.objects.create(email='taken@email.com')
+
+    response = CreateUsers().execute(_request('new@email.com', 'taken@email.com', 'new@email.com'))
+
+    new_user = User.objects.get(email='new@email.com')
+    assert response.result == [
+        CreatedUser(email='new@email.com', created=True, id=new_user.id),
+        CreatedUser(email='taken@email.com', created=False),
+        CreatedUser(email='new@email.com', created=False),
+    ]
+    assert (new_user.first_name, new_user.last_name) == ('Test', 'Testovich')
+
+
+def test_each_chunk_is_one_insert_and_one_outbox_batch() -> None:
+    emails = [f'user_{i}@email.com' for i in range(5)]
+
+    with CaptureQueriesContext(connection) as queries:
+        CreateUsers().execute(_request(*emails, chunk_size=2))
+
+    user_inserts = [query for query in queries.captured_queries if 'INSERT INTO "users_user"' in query['sql']]
+    outbox_inserts = [query for query in queries.captured_queries if 'INSERT INTO "event_log_outbox"' in query['sql']]
+    assert len(user_inserts) == len(outbox_inserts) == 3
+    assert User.objects.count() == 5
+
+
+def test_created_users_are_published() -> None:
+    User.objects.create(email='taken@email.com')
+
+    CreateUsers().execute(_request('new@email.com', 'taken@email.com'))
+
+    event = EventLogOutbox.objects.get()
+    assert event.event_type == 'user_created'
+    assert json.loads(event_context_json(event))['email'] == 'new@email.com'
+
+
+@pytest.mark.parametrize('chunk_size', [0, MAX_CHUNK_SIZE + 1])
+def test_chunk_size_stays_within_postgres_bind_parameter_limit(chunk_size: int) -> None:
+    with pytest.raises(ValidationError):
+        _request('new@email.com', chunk_size=chunk_size)